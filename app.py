@@ -6,22 +6,53 @@ Descripción: Sistema web para gestionar asignaciones de peritos con validación
 de disponibilidad, búsqueda avanzada y exportación de reportes.
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
-import sqlite3
+from flask import Flask, Response, render_template, request, jsonify, send_file, url_for
+import click
 import json
+import base64
 from datetime import datetime, timedelta
 import os
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
+import tempfile
+import zipfile
+
+from migraciones import aplicar_migraciones, verificar_planes
+from consultas import (COLUMNAS_ASIGNACION, CAMPOS_BUSQUEDA, CAMPOS_DETALLE,
+                       CAMPOS_LISTADO, CAMPOS_RECIENTES, FILTROS_ASIGNACIONES,
+                       columnas_asignacion, filtros_asignaciones, objeto_asignacion,
+                       construir_consulta_asignaciones)
+from exportacion import (CAMPOS_EXCEL, CAMPOS_PDF, generar_excel, generar_pdf,
+                         init_app as init_exportacion)
+import estadisticas
+import fechas
+import ocupacion
+import sugerencias
+import importacion
+import lotes
+import plantel
+import cambios
+import filas
+from cache import CacheVersionada
+from respuestas import condicional
+from busqueda import (CAMPOS_FTS, construir_match, construir_consulta_busqueda,
+                      reconstruir_indice)
+from conexion import (abrir_conexion, get_db, transaccion, estadisticas_conexiones,
+                      version_datos, init_app as init_conexion)
+from trabajos import ColaLlena, get_gestor, init_app as init_trabajos
+from compresion import init_app as init_compresion
+from estaticos import init_app as init_estaticos
+from eventos import CanalLleno, get_canal, init_app as init_eventos
+from instrumentacion import fase, init_app as init_instrumentacion
 
 # Inicializar aplicación Flask
 app = Flask(__name__)
 app.config['JSON_AS_ASCII'] = False  # Para caracteres especiales en español
+init_instrumentacion(app)  # Server-Timing y /debug/metrics si SISTEMAPERITO_INSTRUMENTACION=1
+init_conexion(app)  # Pool de conexiones SQLite (ruta en app.config['DATABASE'])
+init_trabajos(app)  # Exportaciones en segundo plano (caché en app.config['EXPORTS_DIR'])
+init_exportacion(app)  # openpyxl/reportlab al primer reporte (SISTEMAPERITO_PRECARGAR=1: al iniciar)
+init_compresion(app)  # gzip / brotli para JSON, HTML, CSS y JS
+init_estaticos(app)  # static/ con huella de contenido en /assets
+init_eventos(app)  # Server-Sent Events de asignaciones y contadores (/api/eventos)
 
 # ============================================================================
 # CONFIGURACIÓN DE BASE DE DATOS
@@ -32,7 +63,7 @@ def init_db():
     Inicializa la base de datos SQLite creando las tablas necesarias
     si no existen. Se ejecuta al iniciar la aplicación.
     """
-    conn = sqlite3.connect('database.db')
+    conn = abrir_conexion(app.config['DATABASE'])
     cursor = conn.cursor()
     
     # Tabla de peritos con información básica
@@ -110,8 +141,154 @@ def init_db():
         )
         conn.commit()
     
+    # Índices y cambios de esquema posteriores a la versión inicial
+    aplicar_migraciones(conn)
+    
     conn.close()
 
+# ============================================================================
+# CONSULTAS FRECUENTES
+# ============================================================================
+
+# Dos intervalos se solapan si cada uno empieza antes de que termine el otro.
+# Con esta forma el índice (perito_id, dia_inicio, dia_fin, estado)
+# resuelve la consulta completa comparando números de día (ver fechas.py).
+SQL_DISPONIBILIDAD = '''
+    SELECT id, expediente, fecha_inicio, fecha_fin, observaciones
+    FROM asignaciones
+    WHERE perito_id = ?
+    AND dia_inicio <= ?
+    AND dia_fin >= ?
+    AND estado != 'Cancelado'
+'''
+
+# Tamaño de página de /api/asignaciones
+LIMITE_PAGINA = 100
+LIMITE_PAGINA_MAX = 1000
+
+# Resultados de /api/buscar por defecto
+LIMITE_BUSQUEDA = 200
+
+# Calendarios calculados recientemente (clave: ventana y filtros)
+CACHE_CALENDARIO = CacheVersionada(max_entradas=64)
+
+# Plantel de peritos (se lee en casi todas las páginas)
+CACHE_PLANTEL = CacheVersionada(max_entradas=8)
+
+# Tamaño a partir del cual un archivo exportado pasa de memoria a disco
+EXPORTACION_MAX_MEMORIA = 16 * 1024 * 1024
+
+SQL_RECIENTES = f'''
+    SELECT {columnas_asignacion(CAMPOS_RECIENTES)}
+    FROM asignaciones a
+    LEFT JOIN peritos p ON a.perito_id = p.id
+    ORDER BY a.fecha_registro DESC
+    LIMIT 10
+'''
+
+def contar_asignaciones(filtros):
+    """
+    Cuenta las asignaciones que cumplen los filtros. No necesita JOIN ni
+    ORDER BY, por lo que se resuelve recorriendo solo índices.
+    """
+    condiciones, params = filtros_asignaciones(filtros)
+    cursor = get_db().execute(
+        f'SELECT COUNT(*) FROM asignaciones a WHERE 1=1{condiciones}', params
+    )
+    return cursor.fetchone()[0]
+
+def codificar_cursor(fecha_inicio, id):
+    """
+    Codifica la clave (fecha_inicio, id) como cursor opaco para la URL.
+    """
+    crudo = json.dumps([fecha_inicio, id]).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii')
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica un cursor generado por codificar_cursor.
+    
+    Returns:
+        tuple: (fecha_inicio, id) o None si el cursor no es válido
+    """
+    try:
+        fecha_inicio, id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(fecha_inicio, str) or not isinstance(id, int):
+        return None
+    return fecha_inicio, id
+
+def consultas_criticas():
+    """
+    Consultas más frecuentes de la aplicación con parámetros de ejemplo.
+    Se usan para verificar que ninguna recorra tablas completas.
+    """
+    consultas = [
+        ('verificar_disponibilidad', SQL_DISPONIBILIDAD,
+         (1, fechas.dia('2025-01-31'), fechas.dia('2025-01-01'))),
+        ('dashboard_por_estado', estadisticas.SQL_CONTADORES, ('estado',)),
+        ('dashboard_recientes', SQL_RECIENTES, ()),
+        ('plantel', plantel.SQL_PLANTEL, {'hoy': fechas.dia('2025-01-01')}),
+        ('historial_asignacion',
+         'SELECT * FROM historial WHERE asignacion_id = ?', (1,)),
+        ('cambios_desde', cambios.SQL_CAMBIOS, (100, cambios.LIMITE_CAMBIOS + 1)),
+    ]
+    
+    filtros_ejemplo = [
+        ('asignaciones_por_estado', {'estado': 'Pendiente'}),
+        ('asignaciones_por_perito', {'perito_id': 1}),
+        ('asignaciones_por_fechas', {'fecha_desde': '2025-01-01', 'fecha_hasta': '2025-01-31'}),
+    ]
+    for nombre, filtros in filtros_ejemplo:
+        query, params = construir_consulta_asignaciones(filtros)
+        consultas.append((nombre, query, params))
+    
+    # Ventana de ejemplo en números de día (ver fechas.py), con 30 días de
+    # duración máxima
+    inicio, fin = fechas.dia('2025-01-01'), fechas.dia('2025-01-31')
+    ventana = [fin, inicio, inicio - 30]
+    query, params = ocupacion.consulta_solapadas(['a.id'])
+    consultas.append(('calendario_solapadas', query, ventana))
+    query, params = ocupacion.consulta_solapadas(
+        ['a.id'], incluir_canceladas=False, peritos=[1, 2, 3]
+    )
+    consultas.append(('disponibilidad_peritos', query, [*ventana, *params]))
+    consultas.append((
+        'lote_conflictos', lotes.consulta_conflictos(2),
+        [0, 1, inicio, fin, 1, 2, fin + 1, fin + 10, 30]
+    ))
+    consultas.append((
+        'duracion_maxima', f'SELECT MAX({ocupacion.SQL_DURACION}) FROM asignaciones', ()
+    ))
+    
+    condiciones, params = filtros_asignaciones(
+        {'fecha_desde': '2025-01-01', 'fecha_hasta': '2025-06-30'}
+    )
+    consultas.append((
+        'estadisticas_por_dependencia',
+        estadisticas.consulta_agrupada(
+            [estadisticas.AGRUPACIONES['dependencia'], estadisticas.AGRUPACIONES['estado']],
+            condiciones
+        ),
+        params
+    ))
+    
+    consultas.append((
+        'estadisticas_por_mes',
+        estadisticas.consulta_agrupada(
+            [estadisticas.AGRUPACIONES['mes'], estadisticas.AGRUPACIONES['estado']], ''
+        ),
+        ()
+    ))
+    
+    query, params = construir_consulta_asignaciones(
+        {}, despues_de=('2025-01-01', 100), limite=LIMITE_PAGINA + 1
+    )
+    consultas.append(('asignaciones_pagina_siguiente', query, params))
+    
+    return consultas
+
 # ============================================================================
 # FUNCIONES AUXILIARES
 # ============================================================================
@@ -128,33 +305,16 @@ def verificar_disponibilidad(perito_id, fecha_inicio, fecha_fin, asignacion_id=N
     
     Returns:
         tuple: (disponible: bool, conflictos: list)
+    
+    Raises:
+        ValueError: Si alguna fecha no tiene el formato AAAA-MM-DD
     """
-    conn = sqlite3.connect('database.db')
+    conn = get_db()
     cursor = conn.cursor()
     
-    # Convertir fechas a formato comparable
-    fecha_inicio_obj = datetime.strptime(fecha_inicio, '%Y-%m-%d')
-    fecha_fin_obj = datetime.strptime(fecha_fin, '%Y-%m-%d')
-    
     # Buscar asignaciones que se solapen en fechas
-    query = '''
-        SELECT id, expediente, fecha_inicio, fecha_fin, observaciones
-        FROM asignaciones
-        WHERE perito_id = ?
-        AND estado != 'Cancelado'
-        AND (
-            (fecha_inicio <= ? AND fecha_fin >= ?) OR
-            (fecha_inicio <= ? AND fecha_fin >= ?) OR
-            (fecha_inicio >= ? AND fecha_fin <= ?)
-        )
-    '''
-    
-    params = [
-        perito_id,
-        fecha_fin, fecha_inicio,
-        fecha_fin, fecha_fin,
-        fecha_inicio, fecha_fin
-    ]
+    query = SQL_DISPONIBILIDAD
+    params = [perito_id, fechas.dia(fecha_fin), fechas.dia(fecha_inicio)]
     
     # Excluir la asignación actual si estamos editando
     if asignacion_id:
@@ -163,31 +323,66 @@ def verificar_disponibilidad(perito_id, fecha_inicio, fecha_fin, asignacion_id=N
     
     cursor.execute(query, params)
     conflictos = cursor.fetchall()
-    conn.close()
     
     disponible = len(conflictos) == 0
     
     return disponible, conflictos
 
+def fechas_validas(data):
+    """
+    Comprueba el formato de las fechas presentes en los datos recibidos
+    (la base de datos también rechaza las mal formadas, ver fechas.py).
+    """
+    try:
+        for campo in ('fecha_inicio', 'fecha_fin'):
+            if campo in data:
+                fechas.dia(data[campo])
+    except ValueError:
+        return False
+    return True
+
+def obtener_plantel(activos=False):
+    """
+    Plantel de peritos desde la caché; se recalcula tras cualquier
+    escritura sobre peritos o asignaciones (cambia la versión de datos).
+    
+    Args:
+        activos: True para la lista simple de peritos activos (sin contadores)
+    
+    Returns:
+        list: Ver plantel.plantel y plantel.peritos_activos
+    """
+    conn = get_db()
+    version = version_datos(conn)
+    hoy = datetime.now().date()
+    clave = ('activos',) if activos else ('plantel', hoy)
+    
+    peritos = CACHE_PLANTEL.obtener(clave, version)
+    if peritos is None:
+        peritos = CACHE_PLANTEL.guardar(
+            clave, version,
+            plantel.peritos_activos(conn) if activos else plantel.plantel(conn, hoy)
+        )
+    return peritos
+
 def registrar_historial(asignacion_id, accion, detalles=''):
     """
     Registra una acción en el historial para auditoría.
+    No confirma: se ejecuta dentro de la transacción del llamador para que
+    el cambio y su registro de historial se guarden en el mismo commit.
     
     Args:
         asignacion_id: ID de la asignación relacionada
         accion: Tipo de acción (Creado, Modificado, Completado, etc.)
         detalles: Información adicional sobre la acción
     """
-    conn = sqlite3.connect('database.db')
+    conn = get_db()
     cursor = conn.cursor()
     
     cursor.execute(
         'INSERT INTO historial (asignacion_id, accion, detalles) VALUES (?, ?, ?)',
         (asignacion_id, accion, detalles)
     )
-    
-    conn.commit()
-    conn.close()
 
 # ============================================================================
 # RUTAS PRINCIPALES
@@ -198,51 +393,19 @@ def index():
     """
     Página principal - Dashboard con estadísticas generales
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Obtener estadísticas generales
-    cursor.execute('SELECT COUNT(*) FROM asignaciones')
-    total_asignaciones = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM asignaciones WHERE estado = "Pendiente"')
-    pendientes = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM asignaciones WHERE estado = "En Proceso"')
-    en_proceso = cursor.fetchone()[0]
+    conn = get_db()
     
-    cursor.execute('SELECT COUNT(*) FROM asignaciones WHERE estado = "Completado"')
-    completados = cursor.fetchone()[0]
-    
-    # Obtener asignaciones recientes (últimas 10)
-    cursor.execute('''
-        SELECT a.*, p.nombre_completo
-        FROM asignaciones a
-        LEFT JOIN peritos p ON a.perito_id = p.id
-        ORDER BY a.fecha_registro DESC
-        LIMIT 10
-    ''')
+    # Estadísticas generales (contadores mantenidos por triggers)
+    resumen = estadisticas.resumen_dashboard(conn)
     
-    asignaciones_recientes = []
-    for row in cursor.fetchall():
-        asignaciones_recientes.append({
-            'id': row[0],
-            'hoja_envio': row[1],
-            'expediente': row[2],
-            'fecha_inicio': row[8],
-            'fecha_fin': row[9],
-            'perito': row[16],
-            'estado': row[14],
-            'lugar': row[7]
-        })
-    
-    conn.close()
+    # Asignaciones recientes (últimas 10), con acceso por nombre de campo
+    asignaciones_recientes = filas.consultar(conn, CAMPOS_RECIENTES, SQL_RECIENTES).fetchall()
     
     return render_template('index.html',
-                         total=total_asignaciones,
-                         pendientes=pendientes,
-                         en_proceso=en_proceso,
-                         completados=completados,
+                         total=resumen['total'],
+                         pendientes=resumen['pendientes'],
+                         en_proceso=resumen['en_proceso'],
+                         completados=resumen['completados'],
                          asignaciones=asignaciones_recientes)
 
 @app.route('/nuevo')
@@ -250,27 +413,8 @@ def nuevo():
     """
     Página para registrar nueva asignación
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Obtener lista de peritos activos
-    cursor.execute('SELECT id, nombre_completo, tipo FROM peritos WHERE estado = "Activo" ORDER BY tipo, nombre_completo')
-    peritos = cursor.fetchall()
-    conn.close()
-    
-    # Organizar peritos por tipo
-    peritos_por_tipo = {
-        'Informático': [],
-        'Acústico': [],
-        'Antropólogo': [],
-        'Contable': []
-    }
-    
-    for perito in peritos:
-        peritos_por_tipo[perito[2]].append({
-            'id': perito[0],
-            'nombre': perito[1]
-        })
+    # Peritos activos organizados por tipo
+    peritos_por_tipo = plantel.por_tipo(obtener_plantel(activos=True))
     
     return render_template('nuevo.html', peritos=peritos_por_tipo)
 
@@ -293,26 +437,8 @@ def peritos():
     """
     Gestión de peritos
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT * FROM peritos ORDER BY tipo, nombre_completo')
-    peritos_list = []
-    
-    for row in cursor.fetchall():
-        # Contar asignaciones del perito
-        cursor.execute('SELECT COUNT(*) FROM asignaciones WHERE perito_id = ?', (row[0],))
-        total_asignaciones = cursor.fetchone()[0]
-        
-        peritos_list.append({
-            'id': row[0],
-            'nombre': row[1],
-            'tipo': row[2],
-            'estado': row[3],
-            'total_asignaciones': total_asignaciones
-        })
-    
-    conn.close()
+    # Totales por estado, próximas y en curso de todos los peritos en una consulta
+    peritos_list = obtener_plantel()
     
     return render_template('peritos.html', peritos=peritos_list)
 
@@ -328,110 +454,157 @@ def reportes():
 # ============================================================================
 
 @app.route('/api/asignaciones', methods=['GET'])
+@condicional()
 def get_asignaciones():
     """
-    Obtiene todas las asignaciones con filtros opcionales
-    Query params: estado, perito_id, fecha_desde, fecha_hasta
+    Obtiene las asignaciones con filtros opcionales, paginadas por cursor
+    Query params: estado, perito_id, fecha_desde, fecha_hasta,
+                  campos (o fields): lista separada por comas,
+                  limite (por defecto 100, máximo 1000), cursor,
+                  todo=1 para devolver el listado completo sin paginar
+    Headers: X-Total-Count (primera página), X-Next-Cursor y Link
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Construir query con filtros
-    query = '''
-        SELECT a.*, p.nombre_completo
-        FROM asignaciones a
-        LEFT JOIN peritos p ON a.perito_id = p.id
-        WHERE 1=1
-    '''
-    params = []
-    
-    # Filtro por estado
-    if request.args.get('estado'):
-        query += ' AND a.estado = ?'
-        params.append(request.args.get('estado'))
-    
-    # Filtro por perito
-    if request.args.get('perito_id'):
-        query += ' AND a.perito_id = ?'
-        params.append(request.args.get('perito_id'))
-    
-    # Filtro por rango de fechas
-    if request.args.get('fecha_desde'):
-        query += ' AND a.fecha_inicio >= ?'
-        params.append(request.args.get('fecha_desde'))
-    
-    if request.args.get('fecha_hasta'):
-        query += ' AND a.fecha_fin <= ?'
-        params.append(request.args.get('fecha_hasta'))
-    
-    query += ' ORDER BY a.fecha_inicio DESC'
-    
-    cursor.execute(query, params)
+    # Proyección de campos
+    campos_param = request.args.get('campos') or request.args.get('fields')
+    if campos_param:
+        campos = [c.strip() for c in campos_param.split(',') if c.strip()]
+        invalidos = [c for c in campos if c not in COLUMNAS_ASIGNACION]
+        if invalidos or not campos:
+            return jsonify({'error': f'Campos no válidos: {", ".join(invalidos)}'}), 400
+    else:
+        campos = CAMPOS_LISTADO
+    
+    todo = request.args.get('todo') == '1'
+    
+    despues_de = None
+    if request.args.get('cursor') and not todo:
+        despues_de = decodificar_cursor(request.args['cursor'])
+        if despues_de is None:
+            return jsonify({'error': 'Cursor no válido'}), 400
+    
+    limite = None
+    if not todo:
+        try:
+            limite = min(max(int(request.args.get('limite', LIMITE_PAGINA)), 1), LIMITE_PAGINA_MAX)
+        except ValueError:
+            return jsonify({'error': 'Límite no válido'}), 400
+    
+    # Cada fila llega como objeto JSON armado por SQLite, seguido de la
+    # clave de paginación (fecha_inicio, id)
+    query, params = construir_consulta_asignaciones(
+        request.args, campos, despues_de,
+        limite + 1 if limite else None,  # Una fila extra indica si hay más
+        como_json=True
+    )
     
-    asignaciones = []
-    for row in cursor.fetchall():
-        asignaciones.append({
-            'id': row[0],
-            'hoja_envio': row[1],
-            'expediente': row[2],
-            'dependencia': row[3],
-            'tipo_perito': row[4],
-            'carpeta_fiscal': row[5],
-            'observaciones': row[6],
-            'lugar': row[7],
-            'fecha_inicio': row[8],
-            'fecha_fin': row[9],
-            'perito_asignado': row[10],
-            'desginacion': row[12],
-            'oficio_desplazamiento': row[13],
-            'estado': row[14],
-            'perito_nombre': row[16]
-        })
+    cursor = get_db().execute(query, params)
     
-    conn.close()
-    return jsonify(asignaciones)
+    hay_mas = False
+    if todo:
+        # Listado completo: se lee y se une por lotes
+        cuerpo, total = filas.array_json(cursor)
+    else:
+        pagina = cursor.fetchall()
+        hay_mas = len(pagina) > limite
+        if hay_mas:
+            pagina = pagina[:limite]
+        cuerpo, total = filas.array_json(pagina)
+    
+    response = Response(cuerpo, mimetype='application/json')
+    
+    if todo:
+        response.headers['X-Total-Count'] = str(total)
+    elif despues_de is None:
+        response.headers['X-Total-Count'] = str(contar_asignaciones(request.args))
+    
+    if hay_mas:
+        _, fecha_inicio, ultimo_id = pagina[-1]
+        siguiente = codificar_cursor(fecha_inicio, ultimo_id)
+        args = request.args.to_dict()
+        args['cursor'] = siguiente
+        response.headers['X-Next-Cursor'] = siguiente
+        response.headers['Link'] = f'<{url_for("get_asignaciones", **args)}>; rel="next"'
+    
+    return response
 
 @app.route('/api/asignacion/<int:id>', methods=['GET'])
+@condicional()
 def get_asignacion(id):
     """
     Obtiene una asignación específica por ID
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT a.*, p.nombre_completo
+    fila = filas.consultar(get_db(), CAMPOS_DETALLE, f'''
+        SELECT {columnas_asignacion(CAMPOS_DETALLE)}
         FROM asignaciones a
         LEFT JOIN peritos p ON a.perito_id = p.id
         WHERE a.id = ?
-    ''', (id,))
-    
-    row = cursor.fetchone()
-    conn.close()
+    ''', (id,)).fetchone()
     
-    if row:
-        asignacion = {
-            'id': row[0],
-            'hoja_envio': row[1],
-            'expediente': row[2],
-            'dependencia': row[3],
-            'tipo_perito': row[4],
-            'carpeta_fiscal': row[5],
-            'observaciones': row[6],
-            'lugar': row[7],
-            'fecha_inicio': row[8],
-            'fecha_fin': row[9],
-            'perito_asignado': row[10],
-            'perito_id': row[11],
-            'desginacion': row[12],
-            'oficio_desplazamiento': row[13],
-            'estado': row[14],
-            'perito_nombre': row[16]
-        }
-        return jsonify(asignacion)
+    if fila:
+        return jsonify(fila._asdict())
     else:
         return jsonify({'error': 'Asignación no encontrada'}), 404
 
+@app.route('/api/cambios', methods=['GET'])
+@condicional()
+def get_cambios():
+    """
+    Altas, modificaciones y cancelaciones posteriores a una secuencia
+    Query params:
+        - since: Última secuencia conocida (sin él solo se devuelve el cursor actual)
+        - limite: Cambios por respuesta (500 por defecto, máximo 5000)
+    
+    Para mantener una copia local: pedir primero el cursor, luego el listado
+    completo y después aplicar /api/cambios?since=<cursor> mientras hay_mas.
+    """
+    conn = get_db()
+    since = request.args.get('since')
+    if since is None:
+        return jsonify({'cursor': cambios.cursor_actual(conn)})
+    
+    try:
+        desde = int(since)
+        limite = int(request.args.get('limite', cambios.LIMITE_CAMBIOS))
+    except ValueError:
+        return jsonify({'error': 'since y limite deben ser números enteros'}), 400
+    if desde < 0 or not 1 <= limite <= cambios.LIMITE_CAMBIOS_MAX:
+        return jsonify({
+            'error': f'since debe ser >= 0 y limite entre 1 y {cambios.LIMITE_CAMBIOS_MAX}'
+        }), 400
+    
+    return jsonify(cambios.leer_cambios(conn, desde, limite))
+
+@app.route('/api/eventos', methods=['GET'])
+def get_eventos():
+    """
+    Flujo Server-Sent Events con los cambios de asignaciones (evento
+    'asignacion', mismo formato que /api/cambios) y los contadores del
+    dashboard (evento 'contadores'). Al reconectar, el navegador envía
+    Last-Event-ID y se reenvían los eventos perdidos.
+    Query params:
+        - desde: Alternativa a Last-Event-ID para la primera conexión
+    """
+    ultimo = request.headers.get('Last-Event-ID') or request.args.get('desde')
+    if ultimo is not None:
+        try:
+            ultimo = int(ultimo)
+        except ValueError:
+            return jsonify({'error': 'Last-Event-ID debe ser un número entero'}), 400
+        if ultimo < 0:
+            return jsonify({'error': 'Last-Event-ID debe ser >= 0'}), 400
+    
+    try:
+        suscripcion = get_canal().suscribir(ultimo)
+    except CanalLleno:
+        respuesta = jsonify({'error': 'Hay demasiadas conexiones en vivo, intente más tarde'})
+        respuesta.headers['Retry-After'] = '30'
+        return respuesta, 503
+    
+    return Response(suscripcion, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # Sin búfer en nginx
+    })
+
 @app.route('/api/asignacion', methods=['POST'])
 def crear_asignacion():
     """
@@ -442,54 +615,57 @@ def crear_asignacion():
     # Validar datos requeridos
     if not all(k in data for k in ('perito_id', 'fecha_inicio', 'fecha_fin')):
         return jsonify({'error': 'Faltan datos requeridos'}), 400
+    if not fechas_validas(data):
+        return jsonify({'error': fechas.MENSAJE_FECHA_INVALIDA}), 400
     
-    # Verificar disponibilidad del perito
-    disponible, conflictos = verificar_disponibilidad(
-        data['perito_id'],
-        data['fecha_inicio'],
-        data['fecha_fin']
-    )
-    
-    if not disponible:
-        return jsonify({
-            'error': 'El perito no está disponible en estas fechas',
-            'conflictos': conflictos
-        }), 409
-    
-    # Insertar asignación
-    conn = sqlite3.connect('database.db')
+    conn = get_db()
     cursor = conn.cursor()
     
-    cursor.execute('''
-        INSERT INTO asignaciones (
-            hoja_envio, expediente, dependencia, tipo_perito,
-            carpeta_fiscal, observaciones, lugar, fecha_inicio,
-            fecha_fin, perito_asignado, perito_id, desginacion,
-            oficio_desplazamiento, estado
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data.get('hoja_envio', ''),
-        data.get('expediente', ''),
-        data.get('dependencia', ''),
-        data.get('tipo_perito', ''),
-        data.get('carpeta_fiscal', ''),
-        data.get('observaciones', ''),
-        data.get('lugar', ''),
-        data['fecha_inicio'],
-        data['fecha_fin'],
-        data.get('perito_asignado', ''),
-        data['perito_id'],
-        data.get('desginacion', ''),
-        data.get('oficio_desplazamiento', ''),
-        'Pendiente'
-    ))
-    
-    asignacion_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    
-    # Registrar en historial
-    registrar_historial(asignacion_id, 'Creado', 'Asignación creada exitosamente')
+    # Verificación, inserción e historial en una sola transacción: el
+    # bloqueo de escritura impide que dos registradores reserven al mismo
+    # perito en fechas solapadas
+    with transaccion(conn):
+        disponible, conflictos = verificar_disponibilidad(
+            data['perito_id'],
+            data['fecha_inicio'],
+            data['fecha_fin']
+        )
+        
+        if not disponible:
+            return jsonify({
+                'error': 'El perito no está disponible en estas fechas',
+                'conflictos': conflictos
+            }), 409
+        
+        # Insertar asignación
+        cursor.execute('''
+            INSERT INTO asignaciones (
+                hoja_envio, expediente, dependencia, tipo_perito,
+                carpeta_fiscal, observaciones, lugar, fecha_inicio,
+                fecha_fin, perito_asignado, perito_id, desginacion,
+                oficio_desplazamiento, estado
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            data.get('hoja_envio', ''),
+            data.get('expediente', ''),
+            data.get('dependencia', ''),
+            data.get('tipo_perito', ''),
+            data.get('carpeta_fiscal', ''),
+            data.get('observaciones', ''),
+            data.get('lugar', ''),
+            data['fecha_inicio'],
+            data['fecha_fin'],
+            data.get('perito_asignado', ''),
+            data['perito_id'],
+            data.get('desginacion', ''),
+            data.get('oficio_desplazamiento', ''),
+            'Pendiente'
+        ))
+        
+        asignacion_id = cursor.lastrowid
+        
+        # Registrar en historial
+        registrar_historial(asignacion_id, 'Creado', 'Asignación creada exitosamente')
     
     return jsonify({
         'success': True,
@@ -504,24 +680,6 @@ def actualizar_asignacion(id):
     """
     data = request.json
     
-    # Si se están cambiando las fechas, verificar disponibilidad
-    if 'fecha_inicio' in data and 'fecha_fin' in data and 'perito_id' in data:
-        disponible, conflictos = verificar_disponibilidad(
-            data['perito_id'],
-            data['fecha_inicio'],
-            data['fecha_fin'],
-            asignacion_id=id
-        )
-        
-        if not disponible:
-            return jsonify({
-                'error': 'El perito no está disponible en estas fechas',
-                'conflictos': conflictos
-            }), 409
-    
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
     # Construir query de actualización dinámicamente
     campos = []
     valores = []
@@ -540,16 +698,35 @@ def actualizar_asignacion(id):
     
     if not campos:
         return jsonify({'error': 'No hay campos para actualizar'}), 400
+    if not fechas_validas(data):
+        return jsonify({'error': fechas.MENSAJE_FECHA_INVALIDA}), 400
     
     valores.append(id)
     query = f"UPDATE asignaciones SET {', '.join(campos)} WHERE id = ?"
     
-    cursor.execute(query, valores)
-    conn.commit()
-    conn.close()
+    conn = get_db()
+    cursor = conn.cursor()
     
-    # Registrar en historial
-    registrar_historial(id, 'Modificado', f'Campos actualizados: {", ".join(campos)}')
+    with transaccion(conn):
+        # Si se están cambiando las fechas, verificar disponibilidad
+        if 'fecha_inicio' in data and 'fecha_fin' in data and 'perito_id' in data:
+            disponible, conflictos = verificar_disponibilidad(
+                data['perito_id'],
+                data['fecha_inicio'],
+                data['fecha_fin'],
+                asignacion_id=id
+            )
+            
+            if not disponible:
+                return jsonify({
+                    'error': 'El perito no está disponible en estas fechas',
+                    'conflictos': conflictos
+                }), 409
+        
+        cursor.execute(query, valores)
+        
+        # Registrar en historial
+        registrar_historial(id, 'Modificado', f'Campos actualizados: {", ".join(campos)}')
     
     return jsonify({
         'success': True,
@@ -561,23 +738,48 @@ def eliminar_asignacion(id):
     """
     Elimina (o marca como cancelada) una asignación
     """
-    conn = sqlite3.connect('database.db')
+    conn = get_db()
     cursor = conn.cursor()
     
-    # En lugar de eliminar, marcar como cancelada (mejor práctica)
-    cursor.execute('UPDATE asignaciones SET estado = "Cancelado" WHERE id = ?', (id,))
-    
-    conn.commit()
-    conn.close()
-    
-    # Registrar en historial
-    registrar_historial(id, 'Cancelado', 'Asignación cancelada')
+    with transaccion(conn):
+        # En lugar de eliminar, marcar como cancelada (mejor práctica)
+        cursor.execute('UPDATE asignaciones SET estado = "Cancelado" WHERE id = ?', (id,))
+        
+        # Registrar en historial
+        registrar_historial(id, 'Cancelado', 'Asignación cancelada')
     
     return jsonify({
         'success': True,
         'message': 'Asignación cancelada exitosamente'
     })
 
+@app.route('/api/asignaciones/lote', methods=['POST'])
+def actualizar_asignaciones_lote():
+    """
+    Aplica varias modificaciones y cancelaciones en una sola transacción
+    Body JSON: {
+        "operaciones": [
+            {"id": 12, "accion": "actualizar", "campos": {"estado": "Completado"}},
+            {"id": 13, "accion": "cancelar"}
+        ],
+        "omitir_errores": false
+    }
+    Si alguna operación falla y no se indica omitir_errores no se aplica ninguna.
+    """
+    data = request.get_json(silent=True) or {}
+    lista = data.get('operaciones')
+    if not isinstance(lista, list) or not lista:
+        return jsonify({'error': 'Envíe una lista "operaciones"'}), 400
+    if len(lista) > lotes.MAX_OPERACIONES_LOTE:
+        return jsonify({
+            'error': f'Máximo {lotes.MAX_OPERACIONES_LOTE} operaciones por lote'
+        }), 400
+    
+    reporte = lotes.aplicar_lote(get_db(), lista, bool(data.get('omitir_errores')))
+    if reporte['total_errores'] and not reporte['aplicadas']:
+        return jsonify(reporte), 422
+    return jsonify(reporte)
+
 @app.route('/api/verificar-disponibilidad', methods=['POST'])
 def api_verificar_disponibilidad():
     """
@@ -587,6 +789,8 @@ def api_verificar_disponibilidad():
     
     if not all(k in data for k in ('perito_id', 'fecha_inicio', 'fecha_fin')):
         return jsonify({'error': 'Faltan datos requeridos'}), 400
+    if not fechas_validas(data):
+        return jsonify({'error': fechas.MENSAJE_FECHA_INVALIDA}), 400
     
     disponible, conflictos = verificar_disponibilidad(
         data['perito_id'],
@@ -606,145 +810,262 @@ def api_verificar_disponibilidad():
         } for c in conflictos]
     })
 
-@app.route('/api/peritos', methods=['GET'])
-def get_peritos():
+@app.route('/api/disponibilidad', methods=['GET'])
+@condicional()
+def get_matriz_disponibilidad():
     """
-    Obtiene lista de todos los peritos
+    Disponibilidad de varios peritos en una ventana de fechas
+    Query params:
+        - tipo: Tipo de perito (todos los peritos activos de ese tipo), o
+        - perito_ids: Lista de ids separados por coma
+        - desde, hasta: Ventana (AAAA-MM-DD, ambos incluidos)
+        - duracion: Días consecutivos libres buscados (por defecto 1)
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
+    try:
+        desde = datetime.strptime(request.args.get('desde', ''), '%Y-%m-%d').date()
+        hasta = datetime.strptime(request.args.get('hasta', ''), '%Y-%m-%d').date()
+        perito_ids = [int(i) for i in request.args.get('perito_ids', '').split(',') if i]
+    except ValueError:
+        return jsonify({'error': 'desde/hasta deben ser AAAA-MM-DD y perito_ids una lista de números'}), 400
+    
+    if hasta < desde or (hasta - desde).days >= ocupacion.MAX_DIAS_VENTANA:
+        return jsonify({
+            'error': f'La ventana debe tener entre 1 y {ocupacion.MAX_DIAS_VENTANA} días'
+        }), 400
+    
+    tipo = request.args.get('tipo')
+    if not tipo and not perito_ids:
+        return jsonify({'error': 'Indique tipo o perito_ids'}), 400
+    
+    duracion = max(request.args.get('duracion', 1, type=int), 1)
+    
+    conn = get_db()
+    if perito_ids:
+        marcas = ', '.join('?' * len(perito_ids))
+        peritos = conn.execute(f'''
+            SELECT id, nombre_completo, tipo FROM peritos
+            WHERE id IN ({marcas}) ORDER BY tipo, nombre_completo
+        ''', perito_ids).fetchall()
+    else:
+        peritos = conn.execute('''
+            SELECT id, nombre_completo, tipo FROM peritos
+            WHERE estado = 'Activo' AND tipo = ? ORDER BY nombre_completo
+        ''', (tipo,)).fetchall()
     
-    cursor.execute('SELECT * FROM peritos WHERE estado = "Activo" ORDER BY tipo, nombre_completo')
+    return jsonify({
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'duracion': duracion,
+        'peritos': ocupacion.matriz_disponibilidad(conn, peritos, desde, hasta, duracion)
+    })
+
+def leer_solicitud_sugerencia(datos):
+    """
+    Valida una solicitud de sugerencia (tipo, fecha_inicio, fecha_fin, lugar).
     
-    peritos = []
-    for row in cursor.fetchall():
-        peritos.append({
-            'id': row[0],
-            'nombre': row[1],
-            'tipo': row[2],
-            'estado': row[3]
-        })
+    Returns:
+        tuple: (solicitud: dict, error: str)
+    """
+    if not datos.get('tipo'):
+        return None, 'Falta el tipo de perito'
+    try:
+        fecha_inicio = datetime.strptime(datos.get('fecha_inicio') or '', '%Y-%m-%d').date()
+        fecha_fin = datetime.strptime(datos.get('fecha_fin') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return None, 'fecha_inicio y fecha_fin deben tener el formato AAAA-MM-DD'
+    if fecha_fin < fecha_inicio:
+        return None, 'La fecha de fin no puede ser anterior a la fecha de inicio'
+    
+    return {
+        'tipo': datos['tipo'],
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'lugar': datos.get('lugar') or '',
+    }, None
+
+@app.route('/api/sugerencias', methods=['GET'])
+@condicional()
+def get_sugerencias():
+    """
+    Peritos activos de un tipo ordenados por idoneidad para un rango de fechas
+    Query params: tipo, fecha_inicio, fecha_fin, lugar (opcional)
+    """
+    solicitud, error = leer_solicitud_sugerencia(request.args)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    planificador = sugerencias.Planificador(
+        get_db(), solicitud['tipo'], solicitud['fecha_inicio'], solicitud['fecha_fin']
+    )
+    return jsonify(planificador.sugerir(
+        solicitud['fecha_inicio'], solicitud['fecha_fin'], solicitud['lugar']
+    ))
+
+@app.route('/api/sugerencias/lote', methods=['POST'])
+def planificar_sugerencias():
+    """
+    Propone un perito para cada solicitud de una lista, sin que dos
+    solicitudes del lote se asignen al mismo perito en fechas solapadas.
+    Body JSON: {"solicitudes": [{tipo, fecha_inicio, fecha_fin, lugar}, ...]}
+    No registra ninguna asignación.
+    """
+    data = request.get_json(silent=True) or {}
+    lista = data.get('solicitudes')
+    if not isinstance(lista, list) or not lista:
+        return jsonify({'error': 'Envíe una lista "solicitudes"'}), 400
+    if len(lista) > sugerencias.MAX_SOLICITUDES_LOTE:
+        return jsonify({
+            'error': f'Máximo {sugerencias.MAX_SOLICITUDES_LOTE} solicitudes por lote'
+        }), 400
+    
+    solicitudes = []
+    for indice, datos in enumerate(lista):
+        solicitud, error = leer_solicitud_sugerencia(datos if isinstance(datos, dict) else {})
+        if error:
+            return jsonify({'error': f'Solicitud {indice}: {error}'}), 400
+        solicitudes.append(solicitud)
+    
+    return jsonify(sugerencias.planificar_lote(get_db(), solicitudes))
+
+@app.route('/api/peritos', methods=['GET'])
+@condicional(por_dia=True)
+def get_peritos():
+    """
+    Obtiene lista de los peritos activos
+    Query params:
+        - contadores: 1 para todos los peritos con sus totales por estado,
+          próximas y en curso
+    """
+    peritos = obtener_plantel(activos=request.args.get('contadores') != '1')
     
-    conn.close()
     return jsonify(peritos)
 
 @app.route('/api/estadisticas', methods=['GET'])
+@condicional()
 def get_estadisticas():
     """
     Obtiene estadísticas generales del sistema
+    Query params:
+        - fecha_desde, fecha_hasta, estado, perito_id: Filtros (igual que /api/asignaciones)
+        - agrupar: Agrupaciones adicionales separadas por coma
+          (dependencia, lugar, perito, tipo, estado, mes, dia)
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
+    conn = get_db()
     
-    # Total de asignaciones por estado
-    cursor.execute('''
-        SELECT estado, COUNT(*) 
-        FROM asignaciones 
-        GROUP BY estado
-    ''')
-    por_estado = dict(cursor.fetchall())
+    filtros = {k: v for k, v in request.args.items() if k in FILTROS_ASIGNACIONES and v}
+    for campo in ('fecha_desde', 'fecha_hasta'):
+        if campo in filtros:
+            try:
+                datetime.strptime(filtros[campo], '%Y-%m-%d')
+            except ValueError:
+                return jsonify({'error': f'{campo} debe tener el formato AAAA-MM-DD'}), 400
     
-    # Asignaciones por tipo de perito
-    cursor.execute('''
-        SELECT tipo_perito, COUNT(*) 
-        FROM asignaciones 
-        WHERE tipo_perito != ""
-        GROUP BY tipo_perito
-    ''')
-    por_tipo = dict(cursor.fetchall())
+    agrupaciones = [a for a in request.args.get('agrupar', '').split(',') if a]
+    invalidas = [a for a in agrupaciones if a not in estadisticas.AGRUPACIONES]
+    if invalidas:
+        return jsonify({
+            'error': f'Agrupación no válida: {", ".join(invalidas)}',
+            'agrupaciones': list(estadisticas.AGRUPACIONES)
+        }), 400
     
-    # Peritos más asignados
-    cursor.execute('''
-        SELECT p.nombre_completo, COUNT(a.id) as total
-        FROM peritos p
-        LEFT JOIN asignaciones a ON p.id = a.perito_id
-        GROUP BY p.id
-        ORDER BY total DESC
-        LIMIT 5
-    ''')
-    top_peritos = [{'nombre': row[0], 'total': row[1]} for row in cursor.fetchall()]
+    condiciones, params = filtros_asignaciones(filtros)
     
-    # Asignaciones por mes (últimos 6 meses)
-    cursor.execute('''
-        SELECT strftime('%Y-%m', fecha_inicio) as mes, COUNT(*) as total
-        FROM asignaciones
-        WHERE fecha_inicio >= date('now', '-6 months')
-        GROUP BY mes
-        ORDER BY mes
-    ''')
-    por_mes = [{'mes': row[0], 'total': row[1]} for row in cursor.fetchall()]
+    if filtros:
+        # Con filtros se agregan las filas del rango en una sola consulta
+        resultado = estadisticas.resumen_filtrado(conn, condiciones, params)
+    else:
+        # Sin filtros basta con los contadores de la tabla resumen (ver estadisticas.py)
+        por_tipo = estadisticas.contadores(conn, 'tipo_perito')
+        por_tipo.pop('', None)
+        resultado = {
+            'por_estado': estadisticas.contadores(conn, 'estado'),
+            'por_tipo': por_tipo,
+            'top_peritos': estadisticas.top_peritos(conn, 5),
+            'por_mes': estadisticas.por_mes(conn, 6),  # Últimos 6 meses
+        }
     
-    conn.close()
+    if agrupaciones:
+        resultado['grupos'] = {
+            agrupacion: estadisticas.agrupar(conn, agrupacion, condiciones, params)
+            for agrupacion in agrupaciones
+        }
     
-    return jsonify({
-        'por_estado': por_estado,
-        'por_tipo': por_tipo,
-        'top_peritos': top_peritos,
-        'por_mes': por_mes
-    })
+    return jsonify(resultado)
+
+@app.route('/api/calendario', methods=['GET'])
+@condicional()
+def get_calendario():
+    """
+    Asignaciones que se solapan con una ventana de fechas, con su reparto por día
+    Query params:
+        - mes: Mes a mostrar (AAAA-MM), o bien
+        - desde, hasta: Ventana explícita (AAAA-MM-DD, ambos incluidos)
+        - perito_id, estado: Filtros opcionales
+    """
+    try:
+        if request.args.get('mes'):
+            desde, hasta = ocupacion.ventana_mes(request.args['mes'])
+        else:
+            desde = datetime.strptime(request.args.get('desde', ''), '%Y-%m-%d').date()
+            hasta = datetime.strptime(request.args.get('hasta', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Indique mes (AAAA-MM) o desde y hasta (AAAA-MM-DD)'}), 400
+    
+    if hasta < desde or (hasta - desde).days >= ocupacion.MAX_DIAS_VENTANA:
+        return jsonify({
+            'error': f'La ventana debe tener entre 1 y {ocupacion.MAX_DIAS_VENTANA} días'
+        }), 400
+    
+    perito_id = request.args.get('perito_id', type=int)
+    estado = request.args.get('estado') or None
+    
+    # Mientras no cambien los datos la misma ventana se sirve desde memoria
+    conn = get_db()
+    version = version_datos(conn)
+    clave = (desde, hasta, perito_id, estado)
+    resultado = CACHE_CALENDARIO.obtener(clave, version)
+    if resultado is None:
+        resultado = CACHE_CALENDARIO.guardar(
+            clave, version, ocupacion.calendario(conn, desde, hasta, perito_id, estado)
+        )
+    
+    return jsonify({**resultado, 'version': version})
+
+@app.route('/api/sistema/conexiones', methods=['GET'])
+def get_estadisticas_conexiones():
+    """
+    Estado del pool de conexiones a la base de datos
+    """
+    return jsonify(estadisticas_conexiones())
 
 @app.route('/api/buscar', methods=['GET'])
+@condicional()
 def buscar_asignaciones():
     """
-    Búsqueda avanzada de asignaciones
-    Query params: q (término de búsqueda), campo (campo específico)
+    Búsqueda avanzada de asignaciones sobre el índice de texto completo
+    Query params: q (término de búsqueda), campo (campo específico),
+                  limite (por defecto 200, máximo 1000)
     """
     termino = request.args.get('q', '').strip()
     campo = request.args.get('campo', 'todos')
     
-    if not termino:
-        return jsonify([])
-    
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
+    if campo != 'todos' and campo not in CAMPOS_FTS:
+        return jsonify({'error': 'Campo de búsqueda no válido'}), 400
     
-    # Construir query según el campo
-    if campo == 'todos':
-        query = '''
-            SELECT a.*, p.nombre_completo
-            FROM asignaciones a
-            LEFT JOIN peritos p ON a.perito_id = p.id
-            WHERE a.hoja_envio LIKE ? 
-            OR a.expediente LIKE ?
-            OR a.carpeta_fiscal LIKE ?
-            OR a.lugar LIKE ?
-            OR p.nombre_completo LIKE ?
-            ORDER BY a.fecha_inicio DESC
-        '''
-        params = [f'%{termino}%'] * 5
-    else:
-        query = f'''
-            SELECT a.*, p.nombre_completo
-            FROM asignaciones a
-            LEFT JOIN peritos p ON a.perito_id = p.id
-            WHERE a.{campo} LIKE ?
-            ORDER BY a.fecha_inicio DESC
-        '''
-        params = [f'%{termino}%']
-    
-    cursor.execute(query, params)
+    match = construir_match(termino, campo)
+    if not match:
+        return jsonify([])
     
-    resultados = []
-    for row in cursor.fetchall():
-        resultados.append({
-            'id': row[0],
-            'hoja_envio': row[1],
-            'expediente': row[2],
-            'dependencia': row[3],
-            'tipo_perito': row[4],
-            'carpeta_fiscal': row[5],
-            'observaciones': row[6],
-            'lugar': row[7],
-            'fecha_inicio': row[8],
-            'fecha_fin': row[9],
-            'perito_asignado': row[10],
-            'desginacion': row[12],
-            'estado': row[14],
-            'perito_nombre': row[16]
-        })
+    try:
+        limite = min(max(int(request.args.get('limite', LIMITE_BUSQUEDA)), 1), LIMITE_PAGINA_MAX)
+    except ValueError:
+        return jsonify({'error': 'Límite no válido'}), 400
     
-    conn.close()
-    return jsonify(resultados)
+    query, params = construir_consulta_busqueda(
+        [objeto_asignacion(CAMPOS_BUSQUEDA)], match, limite
+    )
+    cuerpo, _ = filas.array_json(get_db().execute(query, params))
+    return Response(cuerpo, mimetype='application/json')
 
 # ============================================================================
 # EXPORTACIÓN DE DATOS
@@ -754,199 +1075,254 @@ def buscar_asignaciones():
 def exportar_excel():
     """
     Exporta asignaciones a formato Excel con formato profesional
+    Query params: estado, perito_id, fecha_desde, fecha_hasta
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Obtener filtros de la query string
-    query = '''
-        SELECT a.*, p.nombre_completo
-        FROM asignaciones a
-        LEFT JOIN peritos p ON a.perito_id = p.id
-        WHERE 1=1
-    '''
-    params = []
-    
-    if request.args.get('estado'):
-        query += ' AND a.estado = ?'
-        params.append(request.args.get('estado'))
-    
-    if request.args.get('fecha_desde'):
-        query += ' AND a.fecha_inicio >= ?'
-        params.append(request.args.get('fecha_desde'))
-    
-    if request.args.get('fecha_hasta'):
-        query += ' AND a.fecha_fin <= ?'
-        params.append(request.args.get('fecha_hasta'))
-    
-    query += ' ORDER BY a.fecha_inicio DESC'
+    query, params = construir_consulta_asignaciones(request.args, CAMPOS_EXCEL)
+    cursor = get_db().execute(query, params)
     
-    cursor.execute(query, params)
-    datos = cursor.fetchall()
-    conn.close()
+    # El libro se genera fila a fila desde el cursor; el archivo resultante
+    # se mantiene en memoria y solo pasa a disco si es muy grande
+    archivo = tempfile.SpooledTemporaryFile(max_size=EXPORTACION_MAX_MEMORIA)
+    with fase('excel'):
+        generar_excel(cursor, archivo)
+    archivo.seek(0)
     
-    # Crear libro de Excel
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Asignaciones"
-    
-    # Estilos
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_fill = PatternFill(start_color="1E40AF", end_color="1E40AF", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    # Encabezados
-    headers = [
-        'ID', 'Hoja Envío', 'Expediente', 'Dependencia', 'Tipo Perito',
-        'Carpeta Fiscal', 'Observaciones', 'Lugar', 'Fecha Inicio',
-        'Fecha Fin', 'Perito Asignado', 'Designación', 'Oficio Desplazamiento',
-        'Estado', 'Fecha Registro'
-    ]
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
-    
-    # Datos
-    for row_idx, row_data in enumerate(datos, 2):
-        for col_idx, value in enumerate(row_data[:15], 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = border
-            cell.alignment = Alignment(wrap_text=True)
-            
-            # Color según estado
-            if col_idx == 14:  # Columna de estado
-                if value == 'Completado':
-                    cell.fill = PatternFill(start_color="D1FAE5", end_color="D1FAE5", fill_type="solid")
-                elif value == 'En Proceso':
-                    cell.fill = PatternFill(start_color="FEF3C7", end_color="FEF3C7", fill_type="solid")
-                elif value == 'Pendiente':
-                    cell.fill = PatternFill(start_color="DBEAFE", end_color="DBEAFE", fill_type="solid")
-                elif value == 'Cancelado':
-                    cell.fill = PatternFill(start_color="FEE2E2", end_color="FEE2E2", fill_type="solid")
-    
-    # Ajustar ancho de columnas
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column].width = adjusted_width
-    
-    # Guardar archivo
     filename = f'asignaciones_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    filepath = os.path.join('exports', filename)
-    
-    # Crear carpeta exports si no existe
-    os.makedirs('exports', exist_ok=True)
-    
-    wb.save(filepath)
     
-    return send_file(filepath, as_attachment=True, download_name=filename)
+    return send_file(
+        archivo,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
 
 @app.route('/api/exportar/pdf', methods=['GET'])
 def exportar_pdf():
     """
     Exporta asignaciones a formato PDF con tabla profesional
+    Query params: estado, perito_id, fecha_desde, fecha_hasta (igual que el Excel)
     """
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
+    query, params = construir_consulta_asignaciones(request.args, CAMPOS_PDF)
+    cursor = get_db().execute(query, params)
     
-    # Obtener datos (similar al Excel)
-    query = '''
-        SELECT a.hoja_envio, a.expediente, a.fecha_inicio, a.fecha_fin, 
-               p.nombre_completo, a.estado, a.lugar
-        FROM asignaciones a
-        LEFT JOIN peritos p ON a.perito_id = p.id
-        WHERE 1=1
-    '''
-    params = []
+    filtros = {k: v for k, v in request.args.items() if k in FILTROS_ASIGNACIONES and v}
     
-    if request.args.get('estado'):
-        query += ' AND a.estado = ?'
-        params.append(request.args.get('estado'))
+    archivo = tempfile.SpooledTemporaryFile(max_size=EXPORTACION_MAX_MEMORIA)
+    with fase('pdf'):
+        generar_pdf(cursor, archivo, filtros)
+    archivo.seek(0)
     
-    query += ' ORDER BY a.fecha_inicio DESC LIMIT 50'
+    filename = f'reporte_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
     
-    cursor.execute(query, params)
-    datos = cursor.fetchall()
-    conn.close()
+    return send_file(
+        archivo,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/pdf'
+    )
+
+@app.route('/api/importar', methods=['POST'])
+def importar_excel():
+    """
+    Importa asignaciones desde un archivo .xlsx (mismas columnas que la exportación)
+    Form data:
+        - archivo: Libro .xlsx
+        - simular: 1 para validar sin registrar nada
+        - omitir_errores: 1 para registrar las filas válidas aunque otras fallen
+    """
+    archivo = request.files.get('archivo')
+    if not archivo or not archivo.filename:
+        return jsonify({'error': 'Adjunte un archivo .xlsx en el campo "archivo"'}), 400
+    
+    try:
+        reporte = importacion.importar(
+            get_db(),
+            archivo.stream,
+            simular=request.form.get('simular') == '1',
+            omitir_errores=request.form.get('omitir_errores') == '1',
+            nombre=archivo.filename
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except (KeyError, zipfile.BadZipFile):
+        return jsonify({'error': 'El archivo no es un libro .xlsx válido'}), 400
+    
+    if reporte['total_errores'] and not reporte['insertadas'] and not reporte['simulacion']:
+        return jsonify(reporte), 422
+    return jsonify(reporte), 201 if reporte['insertadas'] else 200
+
+@app.route('/api/exportar/trabajos', methods=['POST'])
+def crear_trabajo_exportacion():
+    """
+    Encola una exportación en segundo plano.
+    Body JSON: {"formato": "excel"|"pdf", "filtros": {estado, perito_id, fecha_desde, fecha_hasta}}
     
-    # Crear PDF
-    filename = f'reporte_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-    filepath = os.path.join('exports', filename)
-    os.makedirs('exports', exist_ok=True)
+    Si ya existe un reporte idéntico para la versión actual de los datos
+    se devuelve completado (200); si no, el trabajo queda encolado (202).
+    """
+    data = request.get_json(silent=True) or {}
+    formato = data.get('formato')
+    if formato not in ('excel', 'pdf'):
+        return jsonify({'error': 'formato debe ser "excel" o "pdf"'}), 400
+    
+    filtros = data.get('filtros') or {}
+    if not isinstance(filtros, dict):
+        return jsonify({'error': 'filtros debe ser un objeto'}), 400
+    filtros = {k: str(v) for k, v in filtros.items() if k in FILTROS_ASIGNACIONES and v}
+    
+    try:
+        trabajo = get_gestor().encolar(
+            app.config['DATABASE'], formato, filtros, version_datos()
+        )
+    except ColaLlena:
+        respuesta = jsonify({'error': 'Hay demasiadas exportaciones en curso, intente más tarde'})
+        respuesta.headers['Retry-After'] = '10'
+        return respuesta, 503
     
-    doc = SimpleDocTemplate(filepath, pagesize=A4)
-    elements = []
+    return respuesta_trabajo(trabajo, 200 if trabajo.estado == 'completado' else 202)
+
+@app.route('/api/exportar/trabajos/<id>', methods=['GET'])
+def get_trabajo_exportacion(id):
+    """
+    Estado de un trabajo de exportación
+    """
+    trabajo = get_gestor().obtener(id)
+    if not trabajo:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return respuesta_trabajo(trabajo, 200)
+
+@app.route('/api/exportar/trabajos/<id>/descarga', methods=['GET'])
+def descargar_trabajo_exportacion(id):
+    """
+    Descarga el archivo generado por un trabajo completado
+    """
+    trabajo = get_gestor().obtener(id)
+    if not trabajo:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    if trabajo.estado != 'completado':
+        return jsonify({'error': 'El trabajo no ha terminado', 'estado': trabajo.estado}), 409
+    if not os.path.exists(trabajo.archivo):
+        return jsonify({'error': 'El archivo ya no está disponible, vuelva a exportar'}), 410
+    
+    mimetypes = {
+        'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'pdf': 'application/pdf',
+    }
+    return send_file(
+        os.path.abspath(trabajo.archivo),
+        as_attachment=True,
+        download_name=trabajo.nombre_descarga,
+        mimetype=mimetypes[trabajo.formato]
+    )
+
+def respuesta_trabajo(trabajo, status):
+    """
+    Respuesta JSON de un trabajo con los enlaces de seguimiento y descarga
+    """
+    datos = trabajo.a_dict()
+    datos['url'] = url_for('get_trabajo_exportacion', id=trabajo.id)
+    if trabajo.estado == 'completado':
+        datos['descarga'] = url_for('descargar_trabajo_exportacion', id=trabajo.id)
+    
+    respuesta = jsonify(datos)
+    if status == 202:
+        respuesta.headers['Location'] = datos['url']
+    return respuesta, status
+
+# ============================================================================
+# COMANDOS DE ADMINISTRACIÓN
+# ============================================================================
+
+@app.cli.command('init-db')
+def init_db_command():
+    """
+    Crea las tablas y aplica las migraciones pendientes.
+    """
+    init_db()
+    click.echo('Base de datos inicializada')
+
+@app.cli.command('reconstruir-busqueda')
+def reconstruir_busqueda_command():
+    """
+    Reconstruye el índice de texto completo desde las asignaciones.
+    """
+    with transaccion():
+        total = reconstruir_indice(get_db())
+    click.echo(f'Índice de búsqueda reconstruido: {total} asignaciones')
+
+@app.cli.command('verificar-planes')
+def verificar_planes_command():
+    """
+    Falla si alguna consulta crítica recorre una tabla completa.
+    """
+    problemas = verificar_planes(get_db(), consultas_criticas())
     
-    # Estilos
-    styles = getSampleStyleSheet()
+    if not problemas:
+        click.echo('Todas las consultas críticas usan índices')
+        return
     
-    # Título
-    title = Paragraph("<b>REPORTE DE ASIGNACIONES DE PERITOS</b>", styles['Title'])
-    elements.append(title)
-    elements.append(Spacer(1, 0.3*inch))
+    for nombre, pasos in problemas.items():
+        click.echo(f'✗ {nombre}: {"; ".join(pasos)}', err=True)
+    raise SystemExit(1)
+
+@app.cli.command('verificar-resumen')
+@click.option('--reparar', is_flag=True, help='Reconstruir los contadores si hay diferencias')
+def verificar_resumen_command(reparar):
+    """
+    Recalcula los contadores del dashboard y reporta diferencias.
+    """
+    diferencias = estadisticas.verificar_resumen(get_db())
     
-    # Fecha del reporte
-    fecha_reporte = Paragraph(
-        f"<b>Fecha:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}",
-        styles['Normal']
+    if not diferencias:
+        click.echo('Los contadores del dashboard están al día')
+        return
+    
+    for dimension, clave, guardado, real in diferencias:
+        click.echo(f'✗ {dimension}={clave!r}: guardado {guardado}, real {real}', err=True)
+    
+    if reparar:
+        with transaccion():
+            estadisticas.reconstruir_resumen(get_db())
+        click.echo(f'Contadores reconstruidos ({len(diferencias)} diferencias corregidas)')
+        return
+    raise SystemExit(1)
+
+@app.cli.command('importar-excel')
+@click.argument('ruta', type=click.Path(exists=True, dir_okay=False))
+@click.option('--simular', is_flag=True, help='Validar sin registrar nada')
+@click.option('--omitir-errores', is_flag=True, help='Registrar las filas válidas aunque otras fallen')
+def importar_excel_command(ruta, simular, omitir_errores):
+    """
+    Importa asignaciones desde un archivo .xlsx.
+    """
+    try:
+        reporte = importacion.importar(
+            get_db(), ruta, simular=simular, omitir_errores=omitir_errores,
+            nombre=os.path.basename(ruta)
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    for error in reporte['errores']:
+        click.echo(f'✗ Fila {error["fila"]}: {error["error"]}', err=True)
+    if reporte['total_errores'] > len(reporte['errores']):
+        click.echo(f'... y {reporte["total_errores"] - len(reporte["errores"])} errores más', err=True)
+    
+    click.echo(
+        f'Filas: {reporte["filas"]}  Válidas: {reporte["validas"]}  '
+        f'Con errores: {reporte["total_errores"]}  Registradas: {reporte["insertadas"]}'
+        + ('  (simulación)' if simular else '')
     )
-    elements.append(fecha_reporte)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Tabla de datos
-    data = [['Oficio', 'Expediente', 'F. Inicio', 'F. Fin', 'Perito', 'Estado', 'Lugar']]
-    
-    for row in datos:
-        data.append([
-            row[0][:15] if row[0] else '',
-            row[1][:15] if row[1] else '',
-            row[2],
-            row[3],
-            row[4][:25] if row[4] else '',
-            row[5],
-            row[6][:20] if row[6] else ''
-        ])
-    
-    table = Table(data, colWidths=[1.2*inch, 1.2*inch, 0.9*inch, 0.9*inch, 1.8*inch, 0.9*inch, 1.5*inch])
-    
-    # Estilo de la tabla
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E40AF')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-    ]))
-    
-    elements.append(table)
-    
-    # Construir PDF
-    doc.build(elements)
-    
-    return send_file(filepath, as_attachment=True, download_name=filename)
+    if reporte['total_errores'] and not omitir_errores:
+        raise SystemExit(1)
+
+@app.cli.command('limpiar-exportaciones')
+def limpiar_exportaciones_command():
+    """
+    Aplica la política de retención a los reportes guardados en exports/.
+    """
+    eliminados = get_gestor().limpiar()
+    click.echo(f'Reportes eliminados: {eliminados}')
 
 # ============================================================================
 # INICIALIZACIÓN Y EJECUCIÓN
@@ -0,0 +1,136 @@
+"""
+SistemaPerito - Benchmark de arranque
+Descripción: Mide en procesos nuevos el tiempo de ``import app`` (con
+``python -X importtime``), el RSS tras la importación y los módulos
+cargados, sin precarga y con SISTEMAPERITO_PRECARGAR=1. Termina con código 1
+si el arranque normal supera los límites o si carga openpyxl o reportlab,
+que solo deben importarse en la primera exportación.
+
+Uso:
+    python benchmarks/bench_arranque.py [--repeticiones 5] [--max-ms 500] [--max-rss-mb 45]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Módulos que no deben cargarse al iniciar
+MODULOS_DIFERIDOS = ('openpyxl', 'reportlab')
+
+# Límites por defecto (máquina de desarrollo: ~230-290 ms y ~35 MB)
+LIMITE_MS = 500
+LIMITE_RSS_MB = 45
+
+# Se ejecuta en el proceso hijo: importa la app y reporta RSS y módulos
+_HIJO = '''
+import json, sys, time
+inicio = time.perf_counter()
+import app
+segundos = time.perf_counter() - inicio
+rss = {}
+with open('/proc/self/status') as status:
+    for linea in status:
+        if linea.startswith(('VmRSS:', 'VmHWM:')):
+            rss[linea[:5]] = int(linea.split()[1]) / 1024
+print(json.dumps({'segundos': segundos, 'rss_mb': rss.get('VmRSS'),
+                  'pico_mb': rss.get('VmHWM'), 'modulos': sorted(sys.modules)}))
+'''
+
+
+def arrancar(precargar):
+    """
+    Importa la aplicación en un intérprete nuevo.
+
+    Returns:
+        dict: segundos, rss_mb, pico_mb, modulos e importtime
+            ({módulo: microsegundos acumulados})
+    """
+    entorno = dict(os.environ, SISTEMAPERITO_PRECARGAR='1' if precargar else '0')
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _HIJO],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True
+    )
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    importtime = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or '|' not in linea:
+            continue
+        _, acumulado, modulo = linea.split('|')
+        try:
+            importtime[modulo.strip()] = int(acumulado)
+        except ValueError:
+            continue  # Encabezado
+    resultado['importtime'] = importtime
+    return resultado
+
+
+def resumir(ejecuciones):
+    return {
+        'import_app_ms': round(statistics.median(e['importtime'].get('app', 0) for e in ejecuciones) / 1000, 1),
+        'reloj_ms': round(statistics.median(e['segundos'] for e in ejecuciones) * 1000, 1),
+        'rss_mb': round(statistics.median(e['rss_mb'] for e in ejecuciones), 1),
+        'modulos': len(ejecuciones[-1]['modulos']),
+        'diferidos_cargados': sorted({
+            m.split('.')[0] for m in ejecuciones[-1]['modulos']
+            if m.split('.')[0] in MODULOS_DIFERIDOS
+        }),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=LIMITE_MS,
+                        help='Límite de import app sin precarga (mediana, ms)')
+    parser.add_argument('--max-rss-mb', type=float, default=LIMITE_RSS_MB,
+                        help='Límite de RSS tras import app sin precarga (MB)')
+    parser.add_argument('--top', type=int, default=10, help='Módulos más lentos a mostrar')
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    resultados = {}
+    print(f'{"modo":<12} {"import ms":>10} {"reloj ms":>10} {"RSS MB":>8} {"módulos":>8}  diferidos')
+    for modo, precargar in (('normal', False), ('precarga', True)):
+        ejecuciones = [arrancar(precargar) for _ in range(args.repeticiones)]
+        resumen = resumir(ejecuciones)
+        resultados[modo] = resumen
+        print(f'{modo:<12} {resumen["import_app_ms"]:>10.1f} {resumen["reloj_ms"]:>10.1f} '
+              f'{resumen["rss_mb"]:>8.1f} {resumen["modulos"]:>8}  '
+              f'{", ".join(resumen["diferidos_cargados"]) or "-"}')
+        if modo == 'normal':
+            # Dependencias de primer nivel que más tardan (acumulado)
+            importtime = ejecuciones[-1]['importtime']
+            resultados[modo]['mas_lentos'] = sorted(
+                ((m, us) for m, us in importtime.items() if '.' not in m and m != 'app'),
+                key=lambda par: -par[1]
+            )[:args.top]
+
+    print('\nMódulos más lentos (sin precarga):')
+    for modulo, us in resultados['normal']['mas_lentos']:
+        print(f'  {modulo:<30} {us / 1000:>8.1f} ms')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+
+    normal = resultados['normal']
+    fallos = []
+    if normal['diferidos_cargados']:
+        fallos.append(f'se cargan al iniciar: {", ".join(normal["diferidos_cargados"])}')
+    if normal['import_app_ms'] > args.max_ms:
+        fallos.append(f'import app {normal["import_app_ms"]} ms > {args.max_ms} ms')
+    if normal['rss_mb'] > args.max_rss_mb:
+        fallos.append(f'RSS {normal["rss_mb"]} MB > {args.max_rss_mb} MB')
+    if fallos:
+        print('\nRegresión de arranque: ' + '; '.join(fallos))
+        sys.exit(1)
+    print('\nArranque dentro de los límites')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+SistemaPerito - Benchmark de bytes transferidos por página
+Descripción: Mide los bytes que viajan por la red para cada página y para
+las respuestas JSON más usadas, sin compresión (como antes: JavaScript en
+línea y nada comprimido) y con compresión, distinguiendo la primera visita
+(HTML y archivos de /assets) de las siguientes (los archivos con huella
+quedan en la caché del navegador).
+
+Uso:
+    python benchmarks/bench_bytes_paginas.py [--filas 2000]
+"""
+
+import argparse
+import os
+import re
+import tempfile
+
+from comun import aplicacion, crear_base
+from compresion import codificaciones_disponibles
+
+PAGINAS = ['/', '/nuevo', '/buscar', '/calendario', '/peritos', '/reportes']
+
+API = [
+    '/api/asignaciones?limite=100',
+    '/api/calendario?mes=2025-03',
+    '/api/estadisticas',
+    '/api/peritos',
+]
+
+_PATRON_ASSETS = re.compile(r'(?:src|href)="(/assets/[^"]+)"')
+
+
+def bytes_peticion(cliente, url, codificacion):
+    """
+    Bytes del cuerpo tal como se envían y el cuerpo sin comprimir.
+    """
+    cabeceras = {'Accept-Encoding': codificacion} if codificacion else {}
+    respuesta = cliente.get(url, headers=cabeceras)
+    enviado = len(respuesta.data)
+    if respuesta.headers.get('Content-Encoding'):
+        respuesta = cliente.get(url)
+    return enviado, respuesta.get_data(as_text=True)
+
+
+def medir_pagina(cliente, url, codificacion):
+    """
+    Returns:
+        tuple: (bytes primera visita, bytes visitas siguientes)
+    """
+    html, texto = bytes_peticion(cliente, url, codificacion)
+    assets = sum(
+        bytes_peticion(cliente, asset, codificacion)[0]
+        for asset in _PATRON_ASSETS.findall(texto)
+    )
+    return html + assets, html
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--filas', type=int, default=2000)
+    args = parser.parse_args()
+
+    codificaciones = list(codificaciones_disponibles())
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, 'bench.db')
+        crear_base(ruta, args.filas)
+        aplicacion.app.config['DATABASE'] = ruta
+        cliente = aplicacion.app.test_client()
+
+        encabezado = ''.join(f'{c + " 1ª":>10} {c + " sig.":>10}' for c in codificaciones)
+        print(f'{"página":<30} {"antes":>10}{encabezado}')
+        totales = [0] * (1 + 2 * len(codificaciones))
+        for url in PAGINAS:
+            antes, _ = medir_pagina(cliente, url, None)
+            fila = [antes]
+            for codificacion in codificaciones:
+                fila.extend(medir_pagina(cliente, url, codificacion))
+            totales = [t + v for t, v in zip(totales, fila)]
+            print(f'{url:<30} ' + ' '.join(f'{v:>10}' for v in fila))
+        print(f'{"total páginas":<30} ' + ' '.join(f'{v:>10}' for v in totales))
+
+        print()
+        print(f'{"respuesta JSON":<30} {"antes":>10}' + ''.join(f'{c:>11}' for c in codificaciones))
+        for url in API:
+            fila = [bytes_peticion(cliente, url, None)[0]]
+            fila.extend(bytes_peticion(cliente, url, c)[0] for c in codificaciones)
+            print(f'{url:<30} ' + ' '.join(f'{v:>10}' for v in fila))
+
+
+if __name__ == '__main__':
+    main()
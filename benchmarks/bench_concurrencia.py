@@ -0,0 +1,186 @@
+"""
+SistemaPerito - Prueba de concurrencia de registros
+Descripción: Levanta la aplicación con el servidor WSGI multihilo de
+Werkzeug sobre una base temporal y envía desde varios hilos POST
+/api/asignacion con fechas que se solapan para unos pocos peritos. Al final
+comprueba en la base que ningún perito tiene dos asignaciones activas
+solapadas y que cada asignación creada tiene exactamente un registro
+'Creado' en el historial. Termina con código 1 si alguna comprobación falla.
+
+Uso:
+    python benchmarks/bench_concurrencia.py [--hilos 16] [--peticiones 20] [--peritos 3]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import date, timedelta
+
+from werkzeug.serving import make_server
+
+from comun import aplicacion, crear_base
+
+# Primer día de las fechas generadas; todas caen en una ventana corta para
+# que la mayoría de las peticiones compitan por los mismos días
+DIA_BASE = date(2025, 3, 1)
+
+SQL_SOLAPADAS = '''
+    SELECT a.id, b.id, a.perito_id
+    FROM asignaciones a
+    JOIN asignaciones b
+      ON a.perito_id = b.perito_id AND a.id < b.id
+     AND a.fecha_inicio <= b.fecha_fin AND b.fecha_inicio <= a.fecha_fin
+    WHERE a.estado != 'Cancelado' AND b.estado != 'Cancelado'
+'''
+
+SQL_HISTORIAL_CREADO = '''
+    SELECT a.id, COUNT(h.id)
+    FROM asignaciones a
+    LEFT JOIN historial h ON h.asignacion_id = a.id AND h.accion = 'Creado'
+    GROUP BY a.id
+    HAVING COUNT(h.id) != 1
+'''
+
+
+def cuerpo(azar, peritos, ventana):
+    inicio = DIA_BASE + timedelta(days=azar.randrange(ventana))
+    fin = inicio + timedelta(days=azar.randrange(3))
+    return {
+        'perito_id': azar.randint(1, peritos),
+        'fecha_inicio': inicio.isoformat(),
+        'fecha_fin': fin.isoformat(),
+        'expediente': 'ESTRES',
+    }
+
+
+def registrar(url, datos):
+    """
+    POST /api/asignacion.
+
+    Returns:
+        tuple: (código HTTP, id creado o None)
+    """
+    peticion = urllib.request.Request(
+        url, data=json.dumps(datos).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}, method='POST'
+    )
+    try:
+        with urllib.request.urlopen(peticion, timeout=60) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())['id']
+    except urllib.error.HTTPError as error:
+        return error.code, None
+
+
+def ejecutar(ruta, hilos, peticiones, peritos, ventana, semilla):
+    """
+    Envía ``hilos`` x ``peticiones`` registros en paralelo.
+
+    Returns:
+        dict: codigos (código -> cantidad), creados (ids) y segundos
+    """
+    aplicacion.app.config['DATABASE'] = ruta
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # Sin una línea por petición
+    servidor = make_server('127.0.0.1', 0, aplicacion.app, threaded=True)
+    hilo_servidor = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo_servidor.start()
+    url = f'http://127.0.0.1:{servidor.server_port}/api/asignacion'
+
+    codigos = {}
+    creados = []
+    cerrojo = threading.Lock()
+    salida = threading.Barrier(hilos)
+
+    def trabajador(numero):
+        azar = random.Random(semilla + numero)
+        lote = [cuerpo(azar, peritos, ventana) for _ in range(peticiones)]
+        salida.wait()  # Todos los hilos empiezan a la vez
+        for datos in lote:
+            codigo, id = registrar(url, datos)
+            with cerrojo:
+                codigos[codigo] = codigos.get(codigo, 0) + 1
+                if id is not None:
+                    creados.append(id)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajador, args=(n,)) for n in range(hilos)]
+    for trabajador_hilo in trabajadores:
+        trabajador_hilo.start()
+    for trabajador_hilo in trabajadores:
+        trabajador_hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    servidor.shutdown()
+    aplicacion.app.extensions.pop('sistemaperito_db').cerrar_todas()
+    return {'codigos': codigos, 'creados': creados, 'segundos': segundos}
+
+
+def comprobar(ruta, resultado):
+    """
+    Returns:
+        list: Descripción de cada comprobación fallida
+    """
+    fallos = []
+    inesperados = {c: n for c, n in resultado['codigos'].items() if c not in (201, 409)}
+    if inesperados:
+        fallos.append(f'respuestas distintas de 201/409: {inesperados}')
+
+    conn = sqlite3.connect(ruta)
+    solapadas = conn.execute(SQL_SOLAPADAS).fetchall()
+    if solapadas:
+        fallos.append(f'{len(solapadas)} pares de asignaciones activas solapadas, '
+                      f'p. ej. #{solapadas[0][0]} y #{solapadas[0][1]} (perito {solapadas[0][2]})')
+
+    historial = conn.execute(SQL_HISTORIAL_CREADO).fetchall()
+    if historial:
+        fallos.append(f'{len(historial)} asignaciones sin exactamente un registro Creado, '
+                      f'p. ej. #{historial[0][0]} con {historial[0][1]}')
+
+    en_base = {fila[0] for fila in conn.execute('SELECT id FROM asignaciones')}
+    conn.close()
+    if en_base != set(resultado['creados']):
+        fallos.append(f'la base tiene {len(en_base)} asignaciones y se respondieron '
+                      f'{len(resultado["creados"])} con 201')
+    return fallos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--peticiones', type=int, default=20, help='POST por hilo')
+    parser.add_argument('--peritos', type=int, default=3)
+    parser.add_argument('--ventana', type=int, default=30,
+                        help='Días en los que caen las fechas de inicio')
+    parser.add_argument('--semilla', type=int, default=2025)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, 'concurrencia.db')
+        crear_base(ruta, 0)
+        resultado = ejecutar(ruta, args.hilos, args.peticiones, args.peritos,
+                             args.ventana, args.semilla)
+        fallos = comprobar(ruta, resultado)
+
+    total = sum(resultado['codigos'].values())
+    print(f'{total} peticiones de {args.hilos} hilos en {resultado["segundos"]:.2f} s '
+          f'({total / resultado["segundos"]:.0f} req/s)')
+    print(f'Creadas: {resultado["codigos"].get(201, 0)}  '
+          f'Rechazadas por solapamiento: {resultado["codigos"].get(409, 0)}')
+
+    if fallos:
+        for fallo in fallos:
+            print(f'✗ {fallo}')
+        sys.exit(1)
+    print('Sin reservas dobles y un registro Creado por asignación')
+
+
+if __name__ == '__main__':
+    main()
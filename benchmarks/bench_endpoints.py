@@ -0,0 +1,296 @@
+"""
+SistemaPerito - Benchmark de extremo a extremo de las rutas principales
+Descripción: Genera una base sintética (ver datos_sinteticos.py), recorre
+cada ruta con el cliente de pruebas de Flask y registra latencia p50/p95,
+peticiones por segundo y RSS pico. Cada ruta se mide "en frío" (cachés en
+memoria vaciadas antes de cada petición) y, salvo las exportaciones,
+"en caliente" (respuestas repetidas). Los resultados se pueden guardar en
+JSON y comparar con una referencia; la comparación termina con código 1 si
+alguna métrica empeora más que la tolerancia. También termina con código 1
+si alguna consulta crítica recorre completa una tabla grande (ver
+bench_planes.py).
+
+Uso:
+    python benchmarks/bench_endpoints.py --filas 10k
+    python benchmarks/bench_endpoints.py --filas 100k --json resultados.json
+    python benchmarks/bench_endpoints.py --comparar benchmarks/referencia_10k.json
+    python benchmarks/bench_endpoints.py --base /tmp/bench_1m.db --rutas asignaciones buscar
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from bench_planes import informar as informar_planes, revisar as revisar_planes
+from comun import aplicacion
+from datos_sinteticos import SEMILLA_DEFAULT, cantidad, generar
+
+import compresion
+import respuestas
+from cache import CacheVersionada
+
+
+def _cuerpo_disponibilidad(azar, contexto):
+    inicio = azar.choice(contexto['fechas'])
+    return {
+        'perito_id': azar.choice(contexto['peritos']),
+        'fecha_inicio': inicio,
+        'fecha_fin': inicio,
+    }
+
+
+# (nombre, método, url, función que arma el cuerpo JSON, exportación)
+RUTAS = (
+    ('dashboard', 'GET', '/', None, False),
+    ('peritos', 'GET', '/peritos', None, False),
+    ('asignaciones', 'GET', '/api/asignaciones', None, False),
+    ('buscar', 'GET', '/api/buscar?q=huanuco', None, False),
+    ('estadisticas', 'GET', '/api/estadisticas', None, False),
+    ('verificar_disponibilidad', 'POST', '/api/verificar-disponibilidad',
+     _cuerpo_disponibilidad, False),
+    ('exportar_excel', 'GET', '/api/exportar/excel', None, True),
+    ('exportar_pdf', 'GET', '/api/exportar/pdf', None, True),
+)
+
+# Métricas que se comparan con la referencia y diferencia absoluta mínima
+# para considerar un empeoramiento (evita falsos positivos por ruido)
+METRICAS_COMPARADAS = {'p50_ms': 1.0, 'p95_ms': 2.0, 'rss_pico_mb': 5.0}
+
+
+def vaciar_caches():
+    """
+    Vacía todas las cachés en memoria de la aplicación.
+    """
+    for modulo in (aplicacion, respuestas, compresion):
+        for valor in vars(modulo).values():
+            if isinstance(valor, CacheVersionada):
+                valor.limpiar()
+
+
+def reiniciar_pico_rss():
+    """
+    Reinicia el RSS pico del proceso (Linux: /proc/self/clear_refs).
+
+    Returns:
+        bool: False si el sistema no lo permite y el pico es acumulado
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as archivo:
+            archivo.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def pico_rss_mb():
+    try:
+        with open('/proc/self/status') as status:
+            for linea in status:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def medir_ruta(cliente, metodo, url, cuerpo, repeticiones, frio, azar, contexto):
+    """
+    Ejecuta la ruta ``repeticiones`` veces (más una de calentamiento que no
+    se registra).
+
+    Returns:
+        dict: p50_ms, p95_ms, media_ms, req_s, rss_pico_mb, bytes
+    """
+    def peticion():
+        datos = cuerpo(azar, contexto) if cuerpo else None
+        if frio:
+            vaciar_caches()
+        inicio = time.perf_counter()
+        respuesta = cliente.open(url, method=metodo, json=datos)
+        tamano = len(respuesta.get_data())
+        segundos = time.perf_counter() - inicio
+        if respuesta.status_code >= 400:
+            raise RuntimeError(f'{metodo} {url}: {respuesta.status_code}')
+        return segundos, tamano
+
+    peticion()
+    reiniciar_pico_rss()
+    tiempos = []
+    tamano = 0
+    for _ in range(repeticiones):
+        segundos, tamano = peticion()
+        tiempos.append(segundos)
+
+    return {
+        'p50_ms': round(statistics.median(tiempos) * 1000, 2),
+        'p95_ms': round(percentil(tiempos, 95) * 1000, 2),
+        'media_ms': round(statistics.fmean(tiempos) * 1000, 2),
+        'req_s': round(len(tiempos) / sum(tiempos), 1),
+        'rss_pico_mb': round(pico_rss_mb(), 1),
+        'bytes': tamano,
+    }
+
+
+def contexto_datos(ruta):
+    """
+    Valores reales de la base para armar peticiones (peritos y fechas).
+    """
+    conn = sqlite3.connect(ruta)
+    contexto = {
+        'peritos': [fila[0] for fila in conn.execute('SELECT id FROM peritos')],
+        'fechas': [fila[0] for fila in conn.execute(
+            'SELECT fecha_inicio FROM asignaciones ORDER BY random() LIMIT 500'
+        )],
+        'filas': conn.execute('SELECT COUNT(*) FROM asignaciones').fetchone()[0],
+    }
+    conn.close()
+    return contexto
+
+
+def ejecutar(ruta_db, nombres, repeticiones, repeticiones_exportacion, semilla):
+    """
+    Mide las rutas seleccionadas sobre ``ruta_db``.
+
+    Returns:
+        dict: {'meta': {...}, 'rutas': {nombre: {'frio': {...}, 'caliente': {...}}}}
+    """
+    aplicacion.app.config['DATABASE'] = ruta_db
+    cliente = aplicacion.app.test_client()
+    contexto = contexto_datos(ruta_db)
+    azar = random.Random(semilla)
+
+    resultados = {}
+    print(f'{"ruta":<26} {"modo":<9} {"p50 ms":>9} {"p95 ms":>9} {"req/s":>8} '
+          f'{"RSS MB":>8} {"bytes":>10}')
+    for nombre, metodo, url, cuerpo, exportacion in RUTAS:
+        if nombres and nombre not in nombres:
+            continue
+        resultados[nombre] = {}
+        modos = ('frio',) if exportacion else ('frio', 'caliente')
+        for modo in modos:
+            medicion = medir_ruta(
+                cliente, metodo, url, cuerpo,
+                repeticiones_exportacion if exportacion else repeticiones,
+                modo == 'frio', azar, contexto
+            )
+            resultados[nombre][modo] = medicion
+            print(f'{nombre:<26} {modo:<9} {medicion["p50_ms"]:>9.2f} {medicion["p95_ms"]:>9.2f} '
+                  f'{medicion["req_s"]:>8.1f} {medicion["rss_pico_mb"]:>8.1f} {medicion["bytes"]:>10}')
+
+    return {
+        'meta': {
+            'filas': contexto['filas'],
+            'peritos': len(contexto['peritos']),
+            'semilla': semilla,
+            'repeticiones': repeticiones,
+            'repeticiones_exportacion': repeticiones_exportacion,
+            'rss_por_ruta': reiniciar_pico_rss(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+        },
+        'rutas': resultados,
+    }
+
+
+def comparar(actual, referencia, tolerancia):
+    """
+    Compara con una ejecución de referencia.
+
+    Returns:
+        list: Empeoramientos [(ruta, modo, métrica, referencia, actual)]
+    """
+    if actual['meta']['filas'] != referencia['meta']['filas']:
+        print(f'Aviso: la referencia se midió con {referencia["meta"]["filas"]} filas '
+              f'y esta ejecución con {actual["meta"]["filas"]}')
+
+    empeoramientos = []
+    print()
+    print(f'{"ruta":<26} {"modo":<9} {"métrica":<12} {"referencia":>11} {"actual":>9} {"cambio":>8}')
+    for nombre, modos in actual['rutas'].items():
+        for modo, medicion in modos.items():
+            anterior = referencia['rutas'].get(nombre, {}).get(modo)
+            if anterior is None:
+                continue
+            for metrica, minimo in METRICAS_COMPARADAS.items():
+                antes, ahora = anterior[metrica], medicion[metrica]
+                cambio = (ahora - antes) / antes if antes else 0.0
+                peor = cambio > tolerancia and ahora - antes > minimo
+                if peor:
+                    empeoramientos.append((nombre, modo, metrica, antes, ahora))
+                print(f'{nombre:<26} {modo:<9} {metrica:<12} {antes:>11.2f} {ahora:>9.2f} '
+                      f'{cambio:>+7.0%}{" !" if peor else ""}')
+    return empeoramientos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--filas', type=cantidad, default=cantidad('10k'),
+                        help='Asignaciones de la base generada (10k, 100k, 1M)')
+    parser.add_argument('--base', help='Base de datos ya generada (no se genera otra)')
+    parser.add_argument('--semilla', type=int, default=SEMILLA_DEFAULT)
+    parser.add_argument('--repeticiones', type=int, default=30)
+    parser.add_argument('--repeticiones-exportacion', type=int, default=3)
+    parser.add_argument('--rutas', nargs='+', choices=[r[0] for r in RUTAS],
+                        help='Medir solo estas rutas')
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    parser.add_argument('--comparar', help='Resultados de referencia (JSON)')
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help='Empeoramiento relativo admitido (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_db = args.base
+        if ruta_db is None:
+            ruta_db = os.path.join(tmp, 'bench.db')
+            resumen = generar(ruta_db, args.filas, args.semilla)
+            print(f'Base generada: {resumen["asignaciones"]} asignaciones, '
+                  f'{resumen["peritos"]} peritos ({resumen["segundos"]} s)')
+        resultados = ejecutar(
+            ruta_db, args.rutas, args.repeticiones, args.repeticiones_exportacion, args.semilla
+        )
+        aplicacion.app.extensions.pop('sistemaperito_db').cerrar_todas()
+        planes = revisar_planes(ruta_db)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        print(f'Resultados guardados en {args.json}')
+
+    print()
+    informar_planes('planes de consulta', planes)
+
+    fallo = bool(planes)
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            referencia = json.load(archivo)
+        empeoramientos = comparar(resultados, referencia, args.tolerancia)
+        if empeoramientos:
+            print(f'\n{len(empeoramientos)} métricas empeoraron más de {args.tolerancia:.0%}')
+            fallo = True
+        else:
+            print('\nSin empeoramientos respecto de la referencia')
+    if fallo:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+SistemaPerito - Benchmark de suscriptores de eventos en vivo
+Descripción: Arranca la aplicación en un proceso aparte (servidor_gevent.py
+o, con --servidor hilos, el servidor multihilo de Werkzeug) sobre una base
+temporal, abre N suscripciones inactivas a /api/eventos y registra los
+hilos del sistema operativo y el RSS del servidor. Después crea una
+asignación y mide cuánto tarda el evento en llegar a todos los
+suscriptores. Con gevent termina con código 1 si los hilos del servidor
+crecen con el número de suscriptores o si algún suscriptor no recibe el
+evento.
+
+Uso:
+    python benchmarks/bench_eventos.py [--suscriptores 500] [--servidor gevent|hilos]
+"""
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from comun import RAIZ, crear_base
+
+# Hilos del servidor admitidos por encima de los que tenía antes de abrir
+# las suscripciones (vigilante de eventos y similares)
+MARGEN_HILOS = 4
+
+# Servidor multihilo de Werkzeug, para comparar
+_SERVIDOR_HILOS = '''
+import sys
+from werkzeug.serving import run_simple
+import app
+app.app.config['EVENTOS_MAX_SUSCRIPTORES'] = 100000
+run_simple('127.0.0.1', int(sys.argv[1]), app.app, threaded=True)
+'''
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def estado_proceso(pid):
+    """
+    Returns:
+        tuple: (hilos del sistema operativo, RSS en MB)
+    """
+    hilos = rss = 0
+    with open(f'/proc/{pid}/status') as status:
+        for linea in status:
+            if linea.startswith('Threads:'):
+                hilos = int(linea.split()[1])
+            elif linea.startswith('VmRSS:'):
+                rss = int(linea.split()[1]) / 1024
+    return hilos, rss
+
+
+def arrancar(servidor, puerto, entorno):
+    if servidor == 'gevent':
+        orden = [sys.executable, 'servidor_gevent.py', '--puerto', str(puerto)]
+    else:
+        orden = [sys.executable, '-c', _SERVIDOR_HILOS, str(puerto)]
+    proceso = subprocess.Popen(orden, cwd=RAIZ, env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{puerto}/api/cambios', timeout=1)
+            return proceso
+        except OSError:
+            time.sleep(0.1)
+    proceso.kill()
+    raise SystemExit('El servidor no respondió')
+
+
+def suscribir(puerto, cantidad):
+    """
+    Abre ``cantidad`` conexiones a /api/eventos y espera la primera
+    respuesta de cada una.
+
+    Returns:
+        list: Sockets abiertos (no bloqueantes)
+    """
+    conexiones = []
+    for _ in range(cantidad):
+        s = socket.create_connection(('127.0.0.1', puerto))
+        s.sendall(b'GET /api/eventos HTTP/1.1\r\nHost: localhost\r\n'
+                  b'Accept: text/event-stream\r\n\r\n')
+        conexiones.append(s)
+    for s in conexiones:
+        s.settimeout(30)
+        inicio = s.recv(65536)
+        if b' 200 ' not in inicio.split(b'\r\n', 1)[0]:
+            raise SystemExit(f'Suscripción rechazada: {inicio[:80]!r}')
+        s.setblocking(False)
+    return conexiones
+
+
+def esperar_evento(conexiones, marca, limite):
+    """
+    Lee de todos los sockets hasta que cada uno reciba un texto con
+    ``marca``.
+
+    Returns:
+        tuple: (recibidos, segundos hasta el último)
+    """
+    selector = selectors.DefaultSelector()
+    buferes = {}
+    for s in conexiones:
+        selector.register(s, selectors.EVENT_READ)
+        buferes[s] = b''
+    pendientes = set(conexiones)
+    inicio = time.perf_counter()
+    while pendientes and time.perf_counter() - inicio < limite:
+        for clave, _ in selector.select(timeout=0.5):
+            s = clave.fileobj
+            try:
+                buferes[s] += s.recv(65536)
+            except BlockingIOError:
+                continue
+            if marca in buferes[s] and s in pendientes:
+                pendientes.discard(s)
+    return len(conexiones) - len(pendientes), time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--suscriptores', type=int, default=500)
+    parser.add_argument('--servidor', choices=('gevent', 'hilos'), default='gevent')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, 'eventos.db')
+        crear_base(ruta, 100)
+        puerto = puerto_libre()
+        entorno = dict(os.environ, SISTEMAPERITO_DB=ruta)
+        proceso = arrancar(args.servidor, puerto, entorno)
+        try:
+            hilos_antes, rss_antes = estado_proceso(proceso.pid)
+            inicio = time.perf_counter()
+            conexiones = suscribir(puerto, args.suscriptores)
+            segundos_conexion = time.perf_counter() - inicio
+            time.sleep(1)
+            hilos, rss = estado_proceso(proceso.pid)
+
+            peticion = urllib.request.Request(
+                f'http://127.0.0.1:{puerto}/api/asignacion',
+                data=json.dumps({'perito_id': 1, 'fecha_inicio': '2030-01-01',
+                                 'fecha_fin': '2030-01-02', 'expediente': 'EVENTOS'}).encode(),
+                headers={'Content-Type': 'application/json'}, method='POST'
+            )
+            urllib.request.urlopen(peticion, timeout=30)
+            recibidos, segundos_evento = esperar_evento(conexiones, b'EVENTOS', limite=30)
+            for s in conexiones:
+                s.close()
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+    print(f'servidor {args.servidor}: {args.suscriptores} suscriptores abiertos '
+          f'en {segundos_conexion:.2f} s')
+    print(f'hilos del servidor: {hilos_antes} -> {hilos}   '
+          f'RSS: {rss_antes:.1f} -> {rss:.1f} MB '
+          f'({(rss - rss_antes) * 1024 / args.suscriptores:.1f} KB por suscriptor)')
+    print(f'evento recibido por {recibidos}/{args.suscriptores} en {segundos_evento * 1000:.0f} ms')
+
+    fallos = []
+    if recibidos < args.suscriptores:
+        fallos.append(f'{args.suscriptores - recibidos} suscriptores no recibieron el evento')
+    if args.servidor == 'gevent' and hilos > hilos_antes + MARGEN_HILOS:
+        fallos.append(f'los hilos del servidor crecieron de {hilos_antes} a {hilos}')
+    if fallos:
+        for fallo in fallos:
+            print(f'✗ {fallo}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
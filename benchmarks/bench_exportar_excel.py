@@ -0,0 +1,97 @@
+"""
+SistemaPerito - Benchmark de exportación Excel
+Descripción: Compara filas/segundo y memoria pico de la exportación Excel
+en streaming (libro write_only) frente a la implementación anterior, que
+materializaba todas las filas y creaba estilos por celda.
+
+Uso:
+    python benchmarks/bench_exportar_excel.py [--filas 5000 20000]
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import tempfile
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+from comun import aplicacion, crear_base, medir
+from exportacion import CAMPOS_EXCEL, generar_excel
+
+
+def exportar_anterior(ruta):
+    """
+    Implementación previa: fetchall, libro normal y estilos por celda.
+    """
+    conn = sqlite3.connect(ruta)
+    datos = conn.execute(
+        'SELECT a.*, p.nombre_completo FROM asignaciones a '
+        'LEFT JOIN peritos p ON a.perito_id = p.id ORDER BY a.fecha_inicio DESC'
+    ).fetchall()
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Asignaciones"
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    header_fill = PatternFill(start_color="1E40AF", end_color="1E40AF", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                    top=Side(style='thin'), bottom=Side(style='thin'))
+
+    for col in range(1, 16):
+        cell = ws.cell(row=1, column=col, value=f'Columna {col}')
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cell.border = border
+
+    for row_idx, row_data in enumerate(datos, 2):
+        for col_idx, value in enumerate(row_data[:15], 1):
+            cell = ws.cell(row=row_idx, column=col_idx, value=value)
+            cell.border = border
+            cell.alignment = Alignment(wrap_text=True)
+            if col_idx == 14 and value == 'Completado':
+                cell.fill = PatternFill(start_color="D1FAE5", end_color="D1FAE5", fill_type="solid")
+
+    for col in ws.columns:
+        max_length = max(len(str(cell.value)) for cell in col)
+        ws.column_dimensions[col[0].column_letter].width = min(max_length + 2, 50)
+
+    conn.close()
+
+    wb.save(io.BytesIO())
+    return len(datos)
+
+
+def exportar_streaming(ruta):
+    """
+    Implementación actual de /api/exportar/excel.
+    """
+    conn = sqlite3.connect(ruta)
+    query, params = aplicacion.construir_consulta_asignaciones({}, CAMPOS_EXCEL)
+    total = generar_excel(conn.execute(query, params), io.BytesIO())
+    conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--filas', type=int, nargs='+', default=[5000, 20000])
+    args = parser.parse_args()
+
+    print(f'{"filas":>8} {"modo":<12} {"seg":>8} {"filas/s":>10} {"RSS MB":>9}')
+    for filas in args.filas:
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, 'bench.db')
+            crear_base(ruta, filas)
+            for nombre, funcion in (('anterior', exportar_anterior),
+                                    ('streaming', exportar_streaming)):
+                total, segundos, pico = medir(funcion, ruta)
+                print(f'{total:>8} {nombre:<12} {segundos:>8.2f} '
+                      f'{total / segundos:>10.0f} {pico:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
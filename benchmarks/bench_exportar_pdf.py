@@ -0,0 +1,53 @@
+"""
+SistemaPerito - Benchmark de exportación PDF
+Descripción: Mide filas/segundo, páginas y memoria pico del reporte PDF
+completo generado página a página desde el cursor.
+
+Uso:
+    python benchmarks/bench_exportar_pdf.py [--filas 10000 100000] [--sin-memoria]
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import tempfile
+
+from comun import aplicacion, crear_base, medir
+from exportacion import CAMPOS_PDF, generar_pdf
+
+
+def exportar(ruta):
+    """
+    Genera el reporte completo, igual que /api/exportar/pdf sin filtros.
+    """
+    conn = sqlite3.connect(ruta)
+    query, params = aplicacion.construir_consulta_asignaciones({}, CAMPOS_PDF)
+    destino = io.BytesIO()
+    filas = generar_pdf(conn.execute(query, params), destino)
+    conn.close()
+    return filas, destino.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--filas', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--sin-memoria', action='store_true',
+                        help='No medir la memoria pico (más rápido)')
+    args = parser.parse_args()
+
+    print(f'{"filas":>8} {"seg":>8} {"filas/s":>10} {"PDF MB":>8} {"RSS MB":>9}')
+    for filas in args.filas:
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, 'bench.db')
+            crear_base(ruta, filas)
+            (total, tamano), segundos, pico = medir(
+                exportar, ruta, memoria=not args.sin_memoria
+            )
+            pico = f'{pico:>9.1f}' if pico is not None else f'{"-":>9}'
+            print(f'{total:>8} {segundos:>8.2f} {total / segundos:>10.0f} '
+                  f'{tamano / (1024 * 1024):>8.1f} {pico}')
+
+
+if __name__ == '__main__':
+    main()
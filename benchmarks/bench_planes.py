@@ -0,0 +1,110 @@
+"""
+SistemaPerito - Regresión de planes de consulta
+Descripción: Ejecuta EXPLAIN QUERY PLAN de las consultas críticas
+(app.consultas_criticas) y termina con código 1 si alguna recorre completa
+una tabla grande. Se revisa una base recién creada con init_db() (sin
+filas ni estadísticas) y una base sintética con datos y ANALYZE, porque el
+planificador puede elegir otro plan en cada caso. bench_endpoints.py hace
+la misma revisión sobre la base que mide. Antes se comprueba el propio
+detector con pasos de plan de ejemplo (con y sin índice).
+
+Uso:
+    python benchmarks/bench_planes.py [--filas 10k]
+    python benchmarks/bench_planes.py --base /tmp/bench_1m.db
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+
+from comun import aplicacion
+from datos_sinteticos import SEMILLA_DEFAULT, cantidad, generar
+
+from migraciones import tabla_recorrida, verificar_planes
+
+# Pasos de plan con la tabla que debe reportarse (None: usa un índice)
+PASOS_DE_PRUEBA = (
+    ('SCAN asignaciones USING COVERING INDEX idx_asignaciones_perito_dias', None),
+    ('SCAN a USING INDEX idx_asignaciones_estado', None),
+    ('SEARCH a USING INDEX idx_asignaciones_perito_dias (perito_id=?)', None),
+    ('SCAN 3 CONSTANT ROWS', None),
+    ('SCAN asignaciones', 'asignaciones'),
+    ('SCAN peritos', 'peritos'),
+    ('SCAN a LEFT-JOIN', 'a'),
+)
+
+
+def comprobar_detector():
+    """
+    Comprueba que tabla_recorrida distingue los recorridos con índice de
+    los completos, sin recortar el nombre de la tabla.
+
+    Returns:
+        list: Pasos mal clasificados
+    """
+    return [
+        f'{paso!r}: se esperaba {esperada!r} y se obtuvo {tabla_recorrida(paso)!r}'
+        for paso, esperada in PASOS_DE_PRUEBA
+        if tabla_recorrida(paso) != esperada
+    ]
+
+
+def revisar(ruta):
+    """
+    Revisa los planes de las consultas críticas sobre la base ``ruta``.
+
+    Returns:
+        dict: nombre de consulta -> pasos con recorridos completos
+    """
+    conn = sqlite3.connect(ruta)
+    try:
+        return verificar_planes(conn, aplicacion.consultas_criticas())
+    finally:
+        conn.close()
+
+
+def informar(titulo, problemas):
+    if not problemas:
+        print(f'✓ {titulo}: todas las consultas críticas usan índices')
+        return
+    for nombre, pasos in problemas.items():
+        print(f'✗ {titulo}: {nombre}: {"; ".join(pasos)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--filas', type=cantidad, default=cantidad('10k'),
+                        help='Asignaciones de la base sintética (10k, 100k, 1M)')
+    parser.add_argument('--base', help='Revisar también esta base ya generada')
+    args = parser.parse_args()
+
+    errores_detector = comprobar_detector()
+    for error in errores_detector:
+        print(f'✗ detector de recorridos: {error}')
+    if errores_detector:
+        sys.exit(1)
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        vacia = os.path.join(tmp, 'vacia.db')
+        aplicacion.app.config['DATABASE'] = vacia
+        aplicacion.init_db()
+        resultados['base vacía'] = revisar(vacia)
+
+        sintetica = os.path.join(tmp, 'sintetica.db')
+        generar(sintetica, args.filas, SEMILLA_DEFAULT)
+        resultados[f'base sintética ({args.filas} filas)'] = revisar(sintetica)
+
+    if args.base:
+        resultados[args.base] = revisar(args.base)
+
+    for titulo, problemas in resultados.items():
+        informar(titulo, problemas)
+    if any(resultados.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
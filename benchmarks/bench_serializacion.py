@@ -0,0 +1,134 @@
+"""
+SistemaPerito - Benchmark de serialización del listado de asignaciones
+Descripción: Compara, sobre el listado completo (/api/asignaciones?todo=1),
+la implementación anterior (un dict por fila y jsonify), el modelo de filas
+con jsonify y la actual, en la que SQLite arma cada objeto con
+json_object() y Python une los textos por lotes (ver filas.py). Registra el
+tiempo (mínimo de varias ejecuciones), el tiempo de la consulta sola, los
+bytes y el RSS pico, y comprueba que las tres producen el mismo JSON.
+
+Uso:
+    python benchmarks/bench_serializacion.py [--filas 100k] [--repeticiones 3]
+    python benchmarks/bench_serializacion.py --base /tmp/bench_1m.db
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+from comun import aplicacion, medir
+from datos_sinteticos import SEMILLA_DEFAULT, cantidad, generar
+
+import filas
+from consultas import CAMPOS_LISTADO, construir_consulta_asignaciones
+
+
+def _consulta(ruta, **opciones):
+    conn = sqlite3.connect(ruta)
+    query, params = construir_consulta_asignaciones({}, CAMPOS_LISTADO, **opciones)
+    return conn, conn.execute(query, params)
+
+
+def solo_consulta(ruta):
+    """
+    Referencia: leer las tuplas sin serializarlas.
+    """
+    conn, cursor = _consulta(ruta)
+    total = len(cursor.fetchall())
+    conn.close()
+    return total, 0
+
+
+def serializar_anterior(ruta):
+    """
+    Implementación previa: un dict por fila y jsonify de la lista.
+    """
+    conn, cursor = _consulta(ruta)
+    with aplicacion.app.app_context():
+        asignaciones = [dict(zip(CAMPOS_LISTADO, row)) for row in cursor.fetchall()]
+        cuerpo = aplicacion.jsonify(asignaciones).get_data()
+    conn.close()
+    return len(asignaciones), cuerpo
+
+
+def serializar_modelo(ruta):
+    """
+    Modelo de filas (row_factory) convertido con _asdict y jsonify.
+    """
+    conn = sqlite3.connect(ruta)
+    query, params = construir_consulta_asignaciones({}, CAMPOS_LISTADO)
+    cursor = filas.consultar(conn, CAMPOS_LISTADO, query, params)
+    with aplicacion.app.app_context():
+        asignaciones = [fila._asdict() for fila in cursor.fetchall()]
+        cuerpo = aplicacion.jsonify(asignaciones).get_data()
+    conn.close()
+    return len(asignaciones), cuerpo
+
+
+def serializar_json(ruta):
+    """
+    Implementación actual: json_object() en SQLite y unión por lotes.
+    """
+    conn, cursor = _consulta(ruta, como_json=True)
+    cuerpo, total = filas.array_json(cursor)
+    conn.close()
+    return total, cuerpo
+
+
+MODOS = (
+    ('consulta', solo_consulta),
+    ('anterior', serializar_anterior),
+    ('modelo', serializar_modelo),
+    ('json_sqlite', serializar_json),
+)
+
+
+def _medir_bytes(funcion, ruta):
+    """
+    Versión de ``funcion`` que devuelve el tamaño del cuerpo (para medir()
+    en un proceso hijo, que no necesita el cuerpo completo).
+    """
+    total, cuerpo = funcion(ruta)
+    return total, len(cuerpo) if cuerpo else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--filas', type=cantidad, default=cantidad('100k'),
+                        help='Asignaciones de la base generada (10k, 100k, 1M)')
+    parser.add_argument('--base', help='Base de datos ya generada (no se genera otra)')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = args.base
+        if ruta is None:
+            ruta = os.path.join(tmp, 'bench.db')
+            resumen = generar(ruta, args.filas, SEMILLA_DEFAULT)
+            print(f'Base generada: {resumen["asignaciones"]} asignaciones')
+
+        # Las tres serializaciones deben decodificarse al mismo listado
+        referencia = json.loads(serializar_anterior(ruta)[1])
+        for nombre, funcion in MODOS[2:]:
+            if json.loads(funcion(ruta)[1]) != referencia:
+                raise SystemExit(f'{nombre}: el JSON no coincide con la implementación anterior')
+
+        print(f'{"modo":<12} {"filas":>8} {"ms":>9} {"filas/s":>10} {"MB":>8} {"RSS MB":>9}')
+        for nombre, funcion in MODOS:
+            tiempos = []
+            for _ in range(args.repeticiones):
+                inicio = time.perf_counter()
+                total, cuerpo = funcion(ruta)
+                tiempos.append(time.perf_counter() - inicio)
+                del cuerpo
+            segundos = min(tiempos)
+            (_, tamano), _, pico = medir(_medir_bytes, funcion, ruta)
+            print(f'{nombre:<12} {total:>8} {segundos * 1000:>9.0f} '
+                  f'{total / segundos:>10.0f} {tamano / 1024 / 1024:>8.1f} {pico:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
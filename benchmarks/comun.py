@@ -0,0 +1,91 @@
+"""
+SistemaPerito - Utilidades comunes de los benchmarks
+"""
+
+import multiprocessing
+import os
+import resource
+import sqlite3
+import sys
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+import app as aplicacion  # noqa: E402
+
+ESTADOS = ('Pendiente', 'En Proceso', 'Completado', 'Cancelado')
+
+
+def crear_base(ruta, filas):
+    """
+    Crea una base de datos con ``filas`` asignaciones de ejemplo.
+    """
+    aplicacion.app.config['DATABASE'] = ruta
+    aplicacion.init_db()
+    conn = sqlite3.connect(ruta)
+    conn.executemany('''
+        INSERT INTO asignaciones (
+            hoja_envio, expediente, dependencia, tipo_perito, carpeta_fiscal,
+            observaciones, lugar, fecha_inicio, fecha_fin, perito_asignado,
+            perito_id, desginacion, oficio_desplazamiento, estado
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        (
+            f'{i:06d}-2025', f'FPCECC2025{i:07d}', 'FECOR LIMA', 'Informático',
+            f'{i % 300}-2025', 'Extracción de información de equipos móviles',
+            'Lima-Huánuco-Lima (Vía Terrestre)',
+            f'2025-{1 + i % 12:02d}-{1 + i % 28:02d}', f'2025-{1 + i % 12:02d}-{1 + i % 28:02d}',
+            'PERITO', 1 + i % 11, f'{i:06d}-2025 POR DESPACHO', f'OFICIO {i:06d}-2025',
+            ESTADOS[i % 4]
+        )
+        for i in range(filas)
+    ))
+    conn.commit()
+    conn.close()
+
+
+def _memoria_pico_kb():
+    """
+    RSS pico del proceso en KB. En Linux se lee VmHWM, que a diferencia de
+    ru_maxrss no hereda el pico del proceso padre.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for linea in status:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _ejecutar_hijo(funcion, args, cola):
+    funcion(*args)
+    cola.put(_memoria_pico_kb())
+
+
+def medir(funcion, *args, memoria=True):
+    """
+    Ejecuta ``funcion(*args)`` y devuelve (resultado, segundos, RSS pico en MB).
+
+    El RSS pico se toma de una segunda ejecución en un proceso hijo nuevo
+    (incluye el intérprete y los módulos importados), de modo que no lo
+    afectan mediciones anteriores ni ralentiza la medición de tiempo. La función debe estar definida a
+    nivel de módulo y abrir sus propias conexiones a partir de la ruta.
+    """
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    segundos = time.perf_counter() - inicio
+
+    pico = None
+    if memoria:
+        contexto = multiprocessing.get_context('spawn')
+        cola = contexto.Queue()
+        proceso = contexto.Process(target=_ejecutar_hijo, args=(funcion, args, cola))
+        proceso.start()
+        pico = cola.get() / 1024
+        proceso.join()
+
+    return resultado, segundos, pico
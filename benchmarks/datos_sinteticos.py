@@ -0,0 +1,327 @@
+"""
+SistemaPerito - Generador de datos sintéticos
+Descripción: Crea una base de datos con peritos, asignaciones e historial
+realistas (nombres y textos en español, rangos de fechas que a veces se
+solapan y los cuatro estados) para medir la aplicación con volúmenes de
+producción. Con la misma semilla y fecha de referencia se obtienen siempre
+los mismos datos.
+
+Uso:
+    python benchmarks/datos_sinteticos.py bench_100k.db --filas 100k
+    python benchmarks/datos_sinteticos.py bench_1m.db --filas 1M --semilla 7
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from busqueda import carga_masiva  # noqa: E402
+from plantel import TIPOS_PERITO  # noqa: E402
+
+SEMILLA_DEFAULT = 2025
+
+# Asignaciones por perito: el plantel crece con el volumen para que la
+# carga por perito (y por tanto los solapamientos) sea comparable
+FILAS_POR_PERITO = 400
+
+# Filas por executemany
+LOTE = 10000
+
+NOMBRES = (
+    'JUAN', 'CARLOS', 'MARÍA', 'ROSA', 'LUIS', 'JORGE', 'ANA', 'PEDRO', 'CARMEN',
+    'JOSÉ', 'MIGUEL', 'ELENA', 'VÍCTOR', 'PATRICIA', 'RAÚL', 'GLADYS', 'CÉSAR',
+    'LUCÍA', 'FERNANDO', 'SONIA', 'WILBER', 'YESENIA', 'EDILBERTO', 'ROXANA',
+)
+
+APELLIDOS = (
+    'QUISPE', 'MAMANI', 'HUAMÁN', 'FLORES', 'RODRÍGUEZ', 'SÁNCHEZ', 'GARCÍA',
+    'ROJAS', 'CHÁVEZ', 'TORRES', 'RAMOS', 'MENDOZA', 'CASTILLO', 'VARGAS',
+    'ESPINOZA', 'GUTIÉRREZ', 'CÓRDOVA', 'PAREDES', 'ZAVALA', 'PALOMINO',
+)
+
+DEPENDENCIAS = (
+    'FECOR LIMA', 'FECOR LIMA NORTE', 'FECOR CALLAO',
+    'FISCALÍA PROVINCIAL PENAL DE HUÁNUCO',
+    'FISCALÍA SUPRAPROVINCIAL ESPECIALIZADA CONTRA LA CRIMINALIDAD ORGANIZADA',
+    'FISCALÍA ESPECIALIZADA EN DELITOS DE CORRUPCIÓN DE FUNCIONARIOS - CUSCO',
+    'FISCALÍA ESPECIALIZADA EN LAVADO DE ACTIVOS',
+    'FISCALÍA PROVINCIAL CORPORATIVA DE AREQUIPA',
+    'PROCURADURÍA PÚBLICA ANTICORRUPCIÓN',
+)
+
+LUGARES = (
+    'Lima', 'Callao', 'Lima-Huánuco-Lima (Vía Terrestre)',
+    'Lima-Cusco-Lima (Vía Aérea)', 'Lima-Arequipa-Lima (Vía Aérea)',
+    'Lima-Piura-Lima (Vía Aérea)', 'Lima-Ayacucho-Lima (Vía Terrestre)',
+    'Lima-Iquitos-Lima (Vía Aérea)', 'Lima-Puno-Lima (Vía Aérea)',
+    'Lima-Trujillo-Lima (Vía Terrestre)', 'Lima-Huancayo-Lima (Vía Terrestre)',
+)
+
+OBSERVACIONES = {
+    'Informático': (
+        'Extracción de información de equipos móviles',
+        'Análisis forense de disco duro y memorias USB',
+        'Visualización y lacrado de equipos de cómputo',
+        'Recuperación de archivos eliminados',
+        'Pericia de correos electrónicos y mensajería',
+    ),
+    'Acústico': (
+        'Reconocimiento de voz',
+        'Transcripción de audios de interceptaciones',
+        'Análisis de autenticidad de grabación',
+        'Homologación de voz con muestra indubitada',
+    ),
+    'Antropólogo': (
+        'Pericia antropológica forense',
+        'Evaluación sociocultural del investigado',
+        'Entrevistas en comunidad nativa',
+    ),
+    'Contable': (
+        'Pericia contable de desbalance patrimonial',
+        'Análisis de estados financieros',
+        'Revisión de movimientos de cuentas bancarias',
+        'Cálculo de perjuicio económico al Estado',
+    ),
+}
+
+# Duración en días (1 = un solo día) y su peso relativo
+DURACIONES = (1, 2, 3, 4, 5, 7, 10, 15)
+PESOS_DURACION = (30, 20, 15, 10, 10, 8, 5, 2)
+
+# Probabilidad de que una asignación empiece antes de que termine la anterior
+PROB_SOLAPE = 0.08
+
+# Fracción del período generado que queda después de la fecha de referencia
+FRACCION_FUTURA = 0.15
+
+COLUMNAS = (
+    'hoja_envio', 'expediente', 'dependencia', 'tipo_perito', 'carpeta_fiscal',
+    'observaciones', 'lugar', 'fecha_inicio', 'fecha_fin', 'perito_asignado',
+    'perito_id', 'desginacion', 'oficio_desplazamiento', 'estado', 'fecha_registro',
+)
+
+SQL_INSERTAR = f'''
+    INSERT INTO asignaciones ({', '.join(COLUMNAS)})
+    VALUES ({', '.join('?' for _ in COLUMNAS)})
+'''
+
+
+def cantidad(texto):
+    """
+    Convierte '10k', '100k', '1M' o '2500' en un entero (para argparse).
+    """
+    texto = texto.strip().lower()
+    multiplicador = {'k': 1000, 'm': 1000000}.get(texto[-1:], 1)
+    if multiplicador > 1:
+        texto = texto[:-1]
+    return int(float(texto) * multiplicador)
+
+
+def elegir_estado(azar, inicio, fin, referencia, solapada):
+    """
+    Estado plausible según la posición de la asignación respecto de la
+    fecha de referencia.
+    """
+    if solapada and azar.random() < 0.5:
+        return 'Cancelado'
+    tirada = azar.random()
+    if fin < referencia:
+        return 'Completado' if tirada < 0.90 else 'Cancelado' if tirada < 0.97 else 'Pendiente'
+    if inicio <= referencia:
+        return 'En Proceso' if tirada < 0.85 else 'Pendiente'
+    return 'Pendiente' if tirada < 0.90 else 'Cancelado'
+
+
+def asignaciones_perito(semilla, perito_id, nombre, tipo, cantidad, primer_dia, referencia):
+    """
+    Genera las asignaciones de un perito en orden de fecha de inicio.
+
+    Yields:
+        tuple: (fecha_inicio, valores sin número de documento)
+    """
+    azar = random.Random(f'{semilla}-{perito_id}')
+    observaciones = OBSERVACIONES.get(tipo, OBSERVACIONES['Informático'])
+    inicio = primer_dia + timedelta(days=azar.randint(0, 20))
+    inicio_anterior = fin_anterior = None
+    for _ in range(cantidad):
+        duracion = azar.choices(DURACIONES, PESOS_DURACION)[0]
+        solapada = fin_anterior is not None and azar.random() < PROB_SOLAPE
+        if solapada:
+            inicio = max(fin_anterior - timedelta(days=azar.randint(0, duracion - 1)), inicio_anterior)
+        fin = inicio + timedelta(days=duracion - 1)
+        registro = datetime.combine(
+            inicio - timedelta(days=azar.randint(1, 30)), datetime.min.time()
+        ) + timedelta(seconds=azar.randint(8 * 3600, 18 * 3600))
+        yield inicio, (
+            azar.choice(DEPENDENCIAS), tipo, azar.randint(1, 3000),
+            azar.choice(observaciones), azar.choice(LUGARES),
+            inicio.isoformat(), fin.isoformat(), nombre, perito_id,
+            elegir_estado(azar, inicio, fin, referencia, solapada),
+            registro.strftime('%Y-%m-%d %H:%M:%S'),
+        )
+        inicio_anterior, fin_anterior = inicio, fin
+        inicio = fin + timedelta(days=1 + azar.choices((0, 1, 2, 4, 8), (30, 30, 20, 15, 5))[0])
+
+
+def crear_peritos(conn, azar, total):
+    """
+    Completa el plantel hasta ``total`` peritos (los iniciales se conservan).
+
+    Returns:
+        list: [(id, nombre_completo, tipo)]
+    """
+    existentes = conn.execute('SELECT COUNT(*) FROM peritos').fetchone()[0]
+    nuevos = []
+    for _ in range(max(total - existentes, 0)):
+        nombre = ' '.join(azar.sample(NOMBRES, 2) + azar.sample(APELLIDOS, 2))
+        estado = 'Inactivo' if azar.random() < 0.05 else 'Activo'
+        nuevos.append((nombre, azar.choice(TIPOS_PERITO), estado))
+    conn.executemany(
+        'INSERT INTO peritos (nombre_completo, tipo, estado) VALUES (?, ?, ?)', nuevos
+    )
+    return conn.execute('SELECT id, nombre_completo, tipo FROM peritos ORDER BY id').fetchall()
+
+
+def filas_asignaciones(semilla, peritos, filas, referencia):
+    """
+    Asignaciones de todos los peritos intercaladas por fecha de inicio (los
+    ids crecen con el tiempo, como en producción) sin tenerlas en memoria.
+    """
+    base, resto = divmod(filas, len(peritos))
+    # Días promedio por asignación (duración + hueco), para repartir el
+    # período de modo que FRACCION_FUTURA quede después de la referencia
+    dias = (base + 1) * 5
+    primer_dia = referencia - timedelta(days=int(dias * (1 - FRACCION_FUTURA)))
+    flujos = [
+        asignaciones_perito(semilla, perito_id, nombre, tipo,
+                            base + (1 if i < resto else 0), primer_dia, referencia)
+        for i, (perito_id, nombre, tipo) in enumerate(peritos)
+    ]
+    for numero, (inicio, valores) in enumerate(heapq.merge(*flujos, key=lambda f: f[0]), 1):
+        dependencia, tipo, carpeta, observacion, lugar, fecha_inicio, fecha_fin, \
+            nombre, perito_id, estado, registro = valores
+        anio = inicio.year
+        hoja = f'{numero:06d}-{anio}'
+        yield (
+            hoja, f'FPCECC{anio}{numero:07d}', dependencia, tipo, f'{carpeta}-{anio}',
+            observacion, lugar, fecha_inicio, fecha_fin, nombre, perito_id,
+            f'{hoja} POR DESPACHO', f'OFICIO {numero:06d}-{anio}', estado, registro,
+        )
+
+
+def lotes(iterable, tamano=LOTE):
+    lote = []
+    for elemento in iterable:
+        lote.append(elemento)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def registrar_historial(conn, ultimo_id):
+    """
+    Historial coherente con las asignaciones nuevas: 'Creado' para todas,
+    'Modificado' para las que cambiaron de estado y 'Cancelado' para las
+    canceladas. El trigger de cambios.py guarda la copia de cada una.
+    """
+    conn.execute('''
+        INSERT INTO historial (asignacion_id, accion, detalles, fecha_hora)
+        SELECT id, 'Creado', 'Asignación creada exitosamente', fecha_registro
+        FROM asignaciones WHERE id > ?
+    ''', (ultimo_id,))
+    conn.execute('''
+        INSERT INTO historial (asignacion_id, accion, detalles, fecha_hora)
+        SELECT id, 'Modificado', 'Campos actualizados: estado', fecha_inicio || ' 09:00:00'
+        FROM asignaciones WHERE id > ? AND estado IN ('En Proceso', 'Completado')
+    ''', (ultimo_id,))
+    conn.execute('''
+        INSERT INTO historial (asignacion_id, accion, detalles, fecha_hora)
+        SELECT id, 'Cancelado', 'Asignación cancelada', fecha_registro
+        FROM asignaciones WHERE id > ? AND estado = 'Cancelado'
+    ''', (ultimo_id,))
+
+
+def generar(ruta, filas, semilla=SEMILLA_DEFAULT, referencia=None, informar=None):
+    """
+    Crea (o amplía) la base de datos ``ruta`` con ``filas`` asignaciones.
+
+    Args:
+        ruta: Archivo SQLite (se crean tablas y migraciones si no existen)
+        filas: Asignaciones a generar
+        semilla: Semilla del generador
+        referencia: Fecha que separa pasado y futuro (por defecto hoy)
+        informar: Función opcional que recibe mensajes de avance
+
+    Returns:
+        dict: {'peritos', 'asignaciones', 'historial', 'segundos'}
+    """
+    import app as aplicacion
+
+    informar = informar or (lambda mensaje: None)
+    referencia = referencia or date.today()
+    inicio = time.perf_counter()
+
+    aplicacion.app.config['DATABASE'] = ruta
+    aplicacion.init_db()
+
+    conn = sqlite3.connect(ruta)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = OFF')  # Base desechable: sin fsync
+    azar = random.Random(semilla)
+    peritos = crear_peritos(conn, azar, max(-(-filas // FILAS_POR_PERITO), 11))
+    ultimo_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM asignaciones').fetchone()[0]
+
+    with carga_masiva(conn):
+        insertadas = 0
+        for lote in lotes(filas_asignaciones(semilla, peritos, filas, referencia)):
+            conn.executemany(SQL_INSERTAR, lote)
+            insertadas += len(lote)
+            if insertadas % (LOTE * 10) == 0:
+                informar(f'{insertadas} asignaciones')
+        informar('Indexando búsqueda')
+    informar('Registrando historial')
+    registrar_historial(conn, ultimo_id)
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    resumen = {
+        'peritos': len(peritos),
+        'asignaciones': conn.execute('SELECT COUNT(*) FROM asignaciones').fetchone()[0],
+        'historial': conn.execute('SELECT COUNT(*) FROM historial').fetchone()[0],
+        'segundos': round(time.perf_counter() - inicio, 1),
+    }
+    conn.close()
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('ruta', help='Archivo SQLite a crear')
+    parser.add_argument('--filas', type=cantidad, default=cantidad('10k'),
+                        help='Asignaciones a generar (p. ej. 10k, 100k, 1M)')
+    parser.add_argument('--semilla', type=int, default=SEMILLA_DEFAULT)
+    parser.add_argument('--referencia', type=date.fromisoformat, default=None,
+                        help='Fecha AAAA-MM-DD que separa pasado y futuro (por defecto hoy)')
+    args = parser.parse_args()
+
+    if os.path.exists(args.ruta):
+        parser.error(f'{args.ruta} ya existe')
+    resumen = generar(args.ruta, args.filas, args.semilla, args.referencia, informar=print)
+    print(f'{resumen["peritos"]} peritos, {resumen["asignaciones"]} asignaciones, '
+          f'{resumen["historial"]} filas de historial en {resumen["segundos"]} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+SistemaPerito - Caché en memoria por versión de datos
+Descripción: Caché LRU sencilla cuyas entradas quedan invalidadas en cuanto
+cambia la versión de datos (ver conexion.version_datos), de modo que nunca
+se sirve un resultado calculado antes de la última escritura.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class CacheVersionada:
+    """
+    Caché LRU de resultados asociados a una versión de datos.
+    """
+
+    def __init__(self, max_entradas=64, max_peso=None):
+        """
+        Args:
+            max_entradas: Entradas máximas
+            max_peso: Suma máxima del ``peso`` de las entradas (p. ej. bytes),
+                o None para no limitarla
+        """
+        self.max_entradas = max_entradas
+        self.max_peso = max_peso
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.peso = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, version):
+        """
+        Devuelve el valor guardado para ``clave`` si se calculó con
+        ``version``; si no, None.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] != version:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, version, valor, peso=0):
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self.peso -= anterior[2]
+            self._entradas[clave] = (version, valor, peso)
+            self.peso += peso
+            while len(self._entradas) > self.max_entradas or (
+                self.max_peso is not None and self.peso > self.max_peso and self._entradas
+            ):
+                self.peso -= self._entradas.popitem(last=False)[1][2]
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.peso = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'peso': self.peso,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+            }
@@ -0,0 +1,103 @@
+"""
+SistemaPerito - Registro de cambios de asignaciones
+Descripción: Cada fila de historial guarda una copia (JSON) de la asignación
+tal como quedó tras el cambio. Como historial.id es AUTOINCREMENT y SQLite
+confirma las escrituras de una en una, ese id sirve como número de secuencia
+creciente: un cliente con una copia local pide los cambios posteriores a la
+última secuencia que conoce en lugar de volver a descargar todo el listado.
+"""
+
+import json
+
+from consultas import COLUMNAS_ASIGNACION
+
+# Cambios máximos por respuesta
+LIMITE_CAMBIOS = 500
+LIMITE_CAMBIOS_MAX = 5000
+
+# Copia de la asignación en el mismo formato que /api/asignaciones
+_JSON_ASIGNACION = 'json_object({})'.format(', '.join(
+    f"'{campo}', {columna}" for campo, columna in COLUMNAS_ASIGNACION.items()
+))
+
+SQL_TRIGGER_COPIA = f'''
+    CREATE TRIGGER IF NOT EXISTS historial_copia
+    AFTER INSERT ON historial WHEN NEW.datos IS NULL BEGIN
+        UPDATE historial SET datos = (
+            SELECT {_JSON_ASIGNACION}
+            FROM asignaciones a
+            LEFT JOIN peritos p ON a.perito_id = p.id
+            WHERE a.id = NEW.asignacion_id
+        )
+        WHERE id = NEW.id;
+    END
+'''
+
+SQL_CAMBIOS = '''
+    SELECT id, asignacion_id, accion, fecha_hora, datos
+    FROM historial
+    WHERE id > ? AND datos IS NOT NULL
+    ORDER BY id
+    LIMIT ?
+'''
+
+
+def crear_registro(conn):
+    """
+    Añade la columna de copia a historial y el trigger que la llena.
+    """
+    columnas = {fila[1] for fila in conn.execute('PRAGMA table_info(historial)')}
+    if 'datos' not in columnas:
+        conn.execute('ALTER TABLE historial ADD COLUMN datos TEXT')
+    conn.execute(SQL_TRIGGER_COPIA)
+
+
+def cursor_actual(conn):
+    """
+    Última secuencia registrada (0 si no hay ninguna).
+    """
+    return conn.execute('SELECT COALESCE(MAX(id), 0) FROM historial').fetchone()[0]
+
+
+def leer_cambios(conn, desde, limite=LIMITE_CAMBIOS):
+    """
+    Cambios posteriores a la secuencia ``desde``.
+
+    Dentro de la página se conserva solo el último cambio de cada
+    asignación: su copia ya refleja los anteriores.
+
+    Args:
+        conn: Conexión SQLite
+        desde: Última secuencia que conoce el cliente
+        limite: Filas de historial a leer como máximo
+
+    Returns:
+        dict: {'desde', 'cursor', 'hay_mas', 'cambios': [{'seq',
+        'asignacion_id', 'accion', 'fecha_hora', 'asignacion'}]} y
+        'reiniciar' si ``desde`` es posterior a la última secuencia
+    """
+    filas = conn.execute(SQL_CAMBIOS, (desde, limite + 1)).fetchall()
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    ultimos = {}
+    for seq, asignacion_id, accion, fecha_hora, datos in filas:
+        ultimos.pop(asignacion_id, None)
+        ultimos[asignacion_id] = {
+            'seq': seq,
+            'asignacion_id': asignacion_id,
+            'accion': accion,
+            'fecha_hora': fecha_hora,
+            'asignacion': json.loads(datos),
+        }
+
+    resultado = {
+        'desde': desde,
+        'cursor': filas[-1][0] if filas else desde,
+        'hay_mas': hay_mas,
+        'cambios': list(ultimos.values()),
+    }
+    if not filas and desde > cursor_actual(conn):
+        # Cursor de otra base de datos (p. ej. restaurada): hay que recargar todo
+        resultado['reiniciar'] = True
+    return resultado
@@ -0,0 +1,106 @@
+"""
+SistemaPerito - Compresión de respuestas
+Descripción: Comprime con brotli (si el paquete está instalado) o gzip las
+respuestas JSON, HTML, CSS y JavaScript que superan un tamaño mínimo, según
+el Accept-Encoding del cliente. Los cuerpos comprimidos de respuestas con
+ETag se guardan en memoria para no volver a comprimirlos en cada petición.
+"""
+
+import gzip
+
+from flask import request
+
+from cache import CacheVersionada
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir
+TIPOS_COMPRIMIBLES = {
+    'application/json', 'text/html', 'text/css', 'text/plain', 'text/csv',
+    'application/javascript', 'text/javascript', 'image/svg+xml',
+}
+
+# Por debajo de este tamaño la compresión no compensa
+COMPRESION_MIN_BYTES = 1024
+
+# Niveles para respuestas dinámicas (rápidos) y para archivos estáticos
+# (se comprimen una sola vez al iniciar)
+NIVEL_GZIP = 6
+NIVEL_BROTLI = 5
+NIVEL_GZIP_ESTATICOS = 9
+NIVEL_BROTLI_ESTATICOS = 11
+
+# Cuerpos comprimidos por (ETag, codificación)
+CACHE_COMPRIMIDAS = CacheVersionada(max_entradas=512, max_peso=32 * 1024 * 1024)
+
+
+def codificaciones_disponibles():
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def comprimir(datos, codificacion, estatico=False):
+    """
+    Comprime ``datos`` (bytes) con 'br' o 'gzip'.
+    """
+    if codificacion == 'br':
+        return brotli.compress(
+            datos, quality=NIVEL_BROTLI_ESTATICOS if estatico else NIVEL_BROTLI
+        )
+    # mtime=0: la misma entrada produce siempre los mismos bytes
+    return gzip.compress(
+        datos, compresslevel=NIVEL_GZIP_ESTATICOS if estatico else NIVEL_GZIP, mtime=0
+    )
+
+
+def codificacion_aceptada():
+    """
+    Mejor codificación que acepta el cliente, o None.
+    """
+    return request.accept_encodings.best_match(codificaciones_disponibles())
+
+
+def comprimir_respuesta(respuesta):
+    """
+    after_request: comprime el cuerpo si el cliente lo acepta y conviene.
+    """
+    if (respuesta.status_code < 200 or respuesta.status_code in (204, 206, 304)
+            or respuesta.direct_passthrough or respuesta.is_streamed
+            or 'Content-Encoding' in respuesta.headers
+            or respuesta.mimetype not in TIPOS_COMPRIMIBLES):
+        return respuesta
+
+    respuesta.vary.add('Accept-Encoding')
+    if respuesta.content_length is not None and respuesta.content_length < COMPRESION_MIN_BYTES:
+        return respuesta
+    codificacion = codificacion_aceptada()
+    if not codificacion:
+        return respuesta
+
+    etag, debil = respuesta.get_etag()
+    datos = None
+    if etag:
+        datos = CACHE_COMPRIMIDAS.obtener((etag, codificacion), None)
+    if datos is None:
+        original = respuesta.get_data()
+        if len(original) < COMPRESION_MIN_BYTES:
+            return respuesta
+        datos = comprimir(original, codificacion)
+        if etag:
+            CACHE_COMPRIMIDAS.guardar((etag, codificacion), None, datos, peso=len(datos))
+
+    respuesta.set_data(datos)
+    respuesta.headers['Content-Encoding'] = codificacion
+    if etag:
+        # La representación comprimida no es idéntica byte a byte: ETag débil
+        respuesta.set_etag(etag, weak=True)
+    return respuesta
+
+
+def init_app(app):
+    """
+    Registra la compresión de respuestas en la aplicación Flask.
+    """
+    app.after_request(comprimir_respuesta)
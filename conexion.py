@@ -0,0 +1,244 @@
+"""
+SistemaPerito - Capa de conexión a la base de datos
+Descripción: Pool de conexiones SQLite compartido por toda la aplicación.
+Cada petición HTTP reutiliza una única conexión (guardada en ``flask.g``)
+que se devuelve al pool al terminar. Las conexiones se abren en modo WAL
+para que las lecturas no se bloqueen mientras otro registrador escribe.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from flask import g, current_app, has_app_context
+
+# Ruta por defecto de la base de datos (configurable por variable de entorno
+# o mediante app.config['DATABASE'])
+DATABASE_DEFAULT = os.environ.get('SISTEMAPERITO_DB', 'database.db')
+
+# Conexiones inactivas que se conservan abiertas en el pool
+POOL_MAX_DEFAULT = int(os.environ.get('SISTEMAPERITO_DB_POOL', '8'))
+
+# PRAGMAs aplicados a cada conexión nueva. journal_mode=WAL es persistente
+# en el archivo; el resto son por conexión.
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),      # En WAL es seguro y evita un fsync por commit
+    ('cache_size', -20000),         # ~20 MB de caché de páginas
+    ('mmap_size', 268435456),       # 256 MB de lectura mapeada en memoria
+    ('busy_timeout', 5000),         # Esperar 5 s antes de "database is locked"
+    ('temp_store', 'MEMORY'),
+)
+
+
+def abrir_conexion(ruta=None, fabrica=None):
+    """
+    Abre una conexión nueva con los PRAGMAs de rendimiento aplicados.
+
+    Args:
+        ruta: Ruta del archivo SQLite (por defecto la configurada)
+        fabrica: Subclase de sqlite3.Connection a usar (p. ej. la que mide
+            consultas en instrumentacion.py)
+
+    Returns:
+        sqlite3.Connection
+    """
+    conn = sqlite3.connect(
+        ruta or ruta_database(),
+        timeout=5.0,
+        check_same_thread=False,  # El pool entrega la conexión a distintos hilos
+        factory=fabrica or sqlite3.Connection
+    )
+    for nombre, valor in PRAGMAS:
+        conn.execute(f'PRAGMA {nombre} = {valor}')
+    return conn
+
+
+def ruta_database():
+    """
+    Devuelve la ruta de la base de datos de la aplicación activa.
+    """
+    if has_app_context():
+        return current_app.config.get('DATABASE', DATABASE_DEFAULT)
+    return DATABASE_DEFAULT
+
+
+class PoolConexiones:
+    """
+    Pool sencillo de conexiones SQLite reutilizables entre peticiones.
+    """
+
+    def __init__(self, ruta, max_inactivas=POOL_MAX_DEFAULT, fabrica=None):
+        self.ruta = ruta
+        self.max_inactivas = max_inactivas
+        self.fabrica = fabrica
+        self._inactivas = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._stats = {
+            'abiertas': 0,
+            'reutilizadas': 0,
+            'devueltas': 0,
+            'cerradas': 0,
+            'en_uso': 0,
+        }
+
+    def _contar(self, clave, delta=1):
+        with self._lock:
+            self._stats[clave] += delta
+
+    def obtener(self):
+        """
+        Entrega una conexión inactiva del pool o abre una nueva.
+        """
+        try:
+            conn = self._inactivas.get_nowait()
+            self._contar('reutilizadas')
+        except queue.Empty:
+            conn = abrir_conexion(self.ruta, self.fabrica)
+            self._contar('abiertas')
+        self._contar('en_uso')
+        return conn
+
+    def devolver(self, conn):
+        """
+        Devuelve una conexión al pool, descartando cualquier transacción
+        que haya quedado abierta. Si el pool está lleno se cierra.
+        """
+        self._contar('en_uso', -1)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            self._contar('cerradas')
+            return
+
+        if self._inactivas.qsize() < self.max_inactivas:
+            self._inactivas.put(conn)
+            self._contar('devueltas')
+        else:
+            conn.close()
+            self._contar('cerradas')
+
+    def cerrar_todas(self):
+        """
+        Cierra todas las conexiones inactivas del pool.
+        """
+        while True:
+            try:
+                conn = self._inactivas.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            self._contar('cerradas')
+
+    def estadisticas(self):
+        """
+        Devuelve un resumen del estado del pool.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['inactivas'] = self._inactivas.qsize()
+        stats['max_inactivas'] = self.max_inactivas
+        stats['ruta'] = self.ruta
+        return stats
+
+
+def get_pool():
+    """
+    Devuelve el pool de la aplicación activa, creándolo si es necesario.
+    """
+    app = current_app._get_current_object()
+    pool = app.extensions.get('sistemaperito_db')
+    if pool is None or pool.ruta != app.config['DATABASE']:
+        pool = PoolConexiones(
+            app.config['DATABASE'],
+            app.config.get('DATABASE_POOL_MAX', POOL_MAX_DEFAULT),
+            app.config.get('DATABASE_CONEXION')
+        )
+        app.extensions['sistemaperito_db'] = pool
+    return pool
+
+
+def get_db():
+    """
+    Devuelve la conexión de la petición actual. Todas las llamadas dentro
+    de la misma petición (o contexto de aplicación) comparten la conexión.
+    """
+    if 'db' not in g:
+        g.db = get_pool().obtener()
+    return g.db
+
+
+@contextmanager
+def transaccion(conn=None):
+    """
+    Ejecuta un bloque dentro de una transacción ``BEGIN IMMEDIATE``.
+
+    El bloqueo de escritura se toma al inicio, de modo que la validación
+    (p. ej. disponibilidad del perito) y las escrituras que dependen de
+    ella quedan serializadas frente a otros registradores. Confirma al
+    salir del bloque y revierte si se produce una excepción.
+
+    Args:
+        conn: Conexión a usar (por defecto la de la petición actual)
+    """
+    conn = conn or get_db()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+
+def version_datos(conn=None):
+    """
+    Devuelve el contador global de versión de datos. Los triggers de la
+    migración 3 lo incrementan en cada escritura sobre asignaciones o
+    peritos, por lo que sirve como clave de invalidación de cachés.
+    """
+    conn = conn or get_db()
+    return conn.execute('SELECT version FROM version_datos WHERE id = 1').fetchone()[0]
+
+
+def marca_datos(conn=None):
+    """
+    Versión de datos y fecha UTC de la última escritura ('YYYY-MM-DD HH:MM:SS').
+
+    Returns:
+        tuple: (version: int, modificado: str)
+    """
+    conn = conn or get_db()
+    return conn.execute(
+        'SELECT version, modificado FROM version_datos WHERE id = 1'
+    ).fetchone()
+
+
+def close_db(exception=None):
+    """
+    Devuelve la conexión de la petición al pool (teardown de Flask).
+    """
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().devolver(conn)
+
+
+def estadisticas_conexiones():
+    """
+    Estadísticas del pool de la aplicación activa.
+    """
+    return get_pool().estadisticas()
+
+
+def init_app(app):
+    """
+    Registra la capa de conexión en la aplicación Flask.
+    """
+    app.config.setdefault('DATABASE', DATABASE_DEFAULT)
+    app.config.setdefault('DATABASE_POOL_MAX', POOL_MAX_DEFAULT)
+    app.teardown_appcontext(close_db)
@@ -0,0 +1,169 @@
+"""
+SistemaPerito - Construcción de consultas
+Descripción: Columnas y filtros del listado de asignaciones compartidos por
+la API, las exportaciones y los trabajos en segundo plano.
+"""
+
+from filas import objeto_json
+
+
+# Columnas que puede devolver el listado de asignaciones (campo -> SQL)
+COLUMNAS_ASIGNACION = {
+    'id': 'a.id',
+    'hoja_envio': 'a.hoja_envio',
+    'expediente': 'a.expediente',
+    'dependencia': 'a.dependencia',
+    'tipo_perito': 'a.tipo_perito',
+    'carpeta_fiscal': 'a.carpeta_fiscal',
+    'observaciones': 'a.observaciones',
+    'lugar': 'a.lugar',
+    'fecha_inicio': 'a.fecha_inicio',
+    'fecha_fin': 'a.fecha_fin',
+    'perito_asignado': 'a.perito_asignado',
+    'perito_id': 'a.perito_id',
+    'desginacion': 'a.desginacion',
+    'oficio_desplazamiento': 'a.oficio_desplazamiento',
+    'estado': 'a.estado',
+    'fecha_registro': 'a.fecha_registro',
+    'perito_nombre': 'p.nombre_completo',
+}
+
+# Campos de una asignación que se pueden registrar o modificar
+CAMPOS_EDITABLES = [
+    'hoja_envio', 'expediente', 'dependencia', 'tipo_perito', 'carpeta_fiscal',
+    'observaciones', 'lugar', 'fecha_inicio', 'fecha_fin', 'perito_asignado',
+    'perito_id', 'desginacion', 'oficio_desplazamiento', 'estado'
+]
+
+ESTADOS_ASIGNACION = ('Pendiente', 'En Proceso', 'Completado', 'Cancelado')
+
+# Filtros admitidos por el listado y las exportaciones
+FILTROS_ASIGNACIONES = ('estado', 'perito_id', 'fecha_desde', 'fecha_hasta')
+
+# Campos devueltos por /api/buscar
+CAMPOS_BUSQUEDA = [
+    'id', 'hoja_envio', 'expediente', 'dependencia', 'tipo_perito',
+    'carpeta_fiscal', 'observaciones', 'lugar', 'fecha_inicio', 'fecha_fin',
+    'perito_asignado', 'desginacion', 'estado', 'perito_nombre'
+]
+
+# Campos devueltos por /api/asignaciones cuando no se indica ``campos``
+CAMPOS_LISTADO = [
+    'id', 'hoja_envio', 'expediente', 'dependencia', 'tipo_perito',
+    'carpeta_fiscal', 'observaciones', 'lugar', 'fecha_inicio', 'fecha_fin',
+    'perito_asignado', 'desginacion', 'oficio_desplazamiento', 'estado',
+    'perito_nombre'
+]
+
+# Campos devueltos por /api/asignacion/<id>
+CAMPOS_DETALLE = [
+    'id', 'hoja_envio', 'expediente', 'dependencia', 'tipo_perito',
+    'carpeta_fiscal', 'observaciones', 'lugar', 'fecha_inicio', 'fecha_fin',
+    'perito_asignado', 'perito_id', 'desginacion', 'oficio_desplazamiento',
+    'estado', 'perito_nombre'
+]
+
+# Campos de las asignaciones recientes del dashboard
+CAMPOS_RECIENTES = [
+    'id', 'hoja_envio', 'expediente', 'fecha_inicio', 'fecha_fin',
+    'perito_nombre', 'estado', 'lugar'
+]
+
+
+def columnas_asignacion(campos):
+    """
+    Lista SELECT de los campos indicados (ver COLUMNAS_ASIGNACION).
+    """
+    return ', '.join(COLUMNAS_ASIGNACION[campo] for campo in campos)
+
+
+def objeto_asignacion(campos):
+    """
+    Expresión SQL que devuelve los campos indicados como objeto JSON.
+    """
+    return objeto_json((campo, COLUMNAS_ASIGNACION[campo]) for campo in campos)
+
+
+def filtros_asignaciones(filtros):
+    """
+    Construye las condiciones WHERE del listado de asignaciones.
+
+    Args:
+        filtros: Diccionario con estado, perito_id, fecha_desde, fecha_hasta
+
+    Returns:
+        tuple: (condiciones: str, params: list)
+    """
+    condiciones = ''
+    params = []
+
+    # Filtro por estado
+    if filtros.get('estado'):
+        condiciones += ' AND a.estado = ?'
+        params.append(filtros.get('estado'))
+
+    # Filtro por perito
+    if filtros.get('perito_id'):
+        condiciones += ' AND a.perito_id = ?'
+        params.append(filtros.get('perito_id'))
+
+    # Filtro por rango de fechas
+    if filtros.get('fecha_desde'):
+        condiciones += ' AND a.fecha_inicio >= ?'
+        params.append(filtros.get('fecha_desde'))
+
+    if filtros.get('fecha_hasta'):
+        condiciones += ' AND a.fecha_fin <= ?'
+        params.append(filtros.get('fecha_hasta'))
+
+    return condiciones, params
+
+
+def construir_consulta_asignaciones(filtros, campos=None, despues_de=None, limite=None,
+                                    como_json=False):
+    """
+    Construye la consulta de listado de asignaciones con filtros opcionales.
+    El orden es (fecha_inicio, id) descendente, que sirve de clave para la
+    paginación por cursor.
+
+    Args:
+        filtros: Diccionario con estado, perito_id, fecha_desde, fecha_hasta
+        campos: Campos de COLUMNAS_ASIGNACION a seleccionar (por defecto CAMPOS_LISTADO)
+        despues_de: Tupla (fecha_inicio, id) de la última fila ya entregada
+        limite: Número máximo de filas
+        como_json: Seleccionar los campos como un único objeto JSON por fila
+            (ver filas.array_json), seguido de fecha_inicio e id
+
+    Returns:
+        tuple: (query: str, params: list)
+    """
+    campos = campos or CAMPOS_LISTADO
+    if como_json:
+        columnas = f'{objeto_asignacion(campos)}, a.fecha_inicio, a.id'
+    else:
+        columnas = columnas_asignacion(campos)
+
+    # El JOIN con peritos solo hace falta para el nombre del perito
+    join = ''
+    if 'perito_nombre' in campos:
+        join = 'LEFT JOIN peritos p ON a.perito_id = p.id'
+
+    condiciones, params = filtros_asignaciones(filtros)
+
+    if despues_de:
+        condiciones += ' AND (a.fecha_inicio, a.id) < (?, ?)'
+        params.extend(despues_de)
+
+    query = f'''
+        SELECT {columnas}
+        FROM asignaciones a
+        {join}
+        WHERE 1=1{condiciones}
+        ORDER BY a.fecha_inicio DESC, a.id DESC
+    '''
+
+    if limite:
+        query += ' LIMIT ?'
+        params.append(limite)
+
+    return query, params
@@ -0,0 +1,358 @@
+"""
+SistemaPerito - Estadísticas precalculadas
+Descripción: Tabla resumen con el número de asignaciones por estado, tipo de
+perito, perito y mes. Los triggers la actualizan en cada alta, cambio o
+baja, de modo que el dashboard y /api/estadisticas leen unas pocas filas en
+lugar de recorrer toda la tabla de asignaciones.
+"""
+
+from contextlib import contextmanager
+
+from fechas import texto_mes
+
+# Dimensión -> expresión SQL de la clave a partir de una fila de asignaciones.
+# La clave se guarda como texto; los valores nulos se agrupan bajo ''.
+DIMENSIONES = {
+    'total': "''",
+    'estado': "COALESCE({fila}.estado, '')",
+    'tipo_perito': "COALESCE({fila}.tipo_perito, '')",
+    'perito': "COALESCE(CAST({fila}.perito_id AS TEXT), '')",
+    'mes': "COALESCE(strftime('%Y-%m', {fila}.fecha_inicio), '')",
+}
+
+# Columnas de asignaciones de las que dependen las claves
+COLUMNAS_RESUMEN = ('estado', 'tipo_perito', 'perito_id', 'fecha_inicio')
+
+SQL_CREAR_RESUMEN = '''
+    CREATE TABLE IF NOT EXISTS resumen_asignaciones (
+        dimension TEXT NOT NULL,
+        clave TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, clave)
+    ) WITHOUT ROWID
+'''
+
+# Contadores de una dimensión (búsqueda por clave primaria)
+SQL_CONTADORES = '''
+    SELECT clave, total FROM resumen_asignaciones
+    WHERE dimension = ? AND total > 0
+    ORDER BY clave
+'''
+
+
+def _sumar(fila, delta):
+    """
+    Sentencias que suman ``delta`` al contador de cada dimensión para la
+    fila ``fila`` (NEW u OLD) dentro de un trigger.
+    """
+    return '\n'.join(
+        f'''INSERT INTO resumen_asignaciones (dimension, clave, total)
+            VALUES ('{dimension}', {expresion.format(fila=fila)}, {delta})
+            ON CONFLICT (dimension, clave) DO UPDATE SET total = total + {delta};'''
+        for dimension, expresion in DIMENSIONES.items()
+    )
+
+
+SQL_TRIGGERS_RESUMEN = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS resumen_asignaciones_insert
+    AFTER INSERT ON asignaciones BEGIN
+        {_sumar('NEW', 1)}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS resumen_asignaciones_update
+    AFTER UPDATE OF {', '.join(COLUMNAS_RESUMEN)} ON asignaciones BEGIN
+        {_sumar('OLD', -1)}
+        {_sumar('NEW', 1)}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS resumen_asignaciones_delete
+    AFTER DELETE ON asignaciones BEGIN
+        {_sumar('OLD', -1)}
+    END
+    ''',
+]
+
+
+def crear_resumen(conn):
+    """
+    Crea la tabla resumen y sus triggers, y la llena con los datos actuales.
+    """
+    conn.execute(SQL_CREAR_RESUMEN)
+    for sql in SQL_TRIGGERS_RESUMEN:
+        conn.execute(sql)
+    reconstruir_resumen(conn)
+
+
+def calcular_resumen(conn):
+    """
+    Recalcula los contadores desde cero con un recorrido de asignaciones.
+
+    Returns:
+        dict: (dimension, clave) -> total
+    """
+    conteos = {}
+    for dimension, expresion in DIMENSIONES.items():
+        cursor = conn.execute(f'''
+            SELECT {expresion.format(fila='a')} AS clave, COUNT(*)
+            FROM asignaciones a
+            GROUP BY clave
+        ''')
+        for clave, total in cursor:
+            conteos[(dimension, clave)] = total
+    return conteos
+
+
+def reconstruir_resumen(conn):
+    """
+    Vuelve a llenar la tabla resumen desde asignaciones.
+    No confirma la transacción.
+
+    Returns:
+        int: Número de contadores escritos
+    """
+    conteos = calcular_resumen(conn)
+    conn.execute('DELETE FROM resumen_asignaciones')
+    conn.executemany(
+        'INSERT INTO resumen_asignaciones (dimension, clave, total) VALUES (?, ?, ?)',
+        [(dimension, clave, total) for (dimension, clave), total in conteos.items()]
+    )
+    return len(conteos)
+
+
+@contextmanager
+def carga_masiva(conn):
+    """
+    Inserta muchas asignaciones sin el trigger que suma cada fila a los
+    contadores y, al terminar, suma las nuevas con una consulta agrupada
+    por dimensión. No confirma la transacción.
+    """
+    ultimo_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM asignaciones').fetchone()[0]
+    conn.execute('DROP TRIGGER IF EXISTS resumen_asignaciones_insert')
+    try:
+        yield conn
+    finally:
+        conn.execute(SQL_TRIGGERS_RESUMEN[0])
+        for dimension, expresion in DIMENSIONES.items():
+            conn.execute(f'''
+                INSERT INTO resumen_asignaciones (dimension, clave, total)
+                SELECT '{dimension}', {expresion.format(fila='a')} AS clave, COUNT(*)
+                FROM asignaciones a
+                WHERE a.id > ?
+                GROUP BY clave
+                ON CONFLICT (dimension, clave) DO UPDATE SET total = total + excluded.total
+            ''', (ultimo_id,))
+
+
+def verificar_resumen(conn):
+    """
+    Compara la tabla resumen con un recálculo completo.
+
+    Returns:
+        list: (dimension, clave, guardado, real) de cada contador distinto
+    """
+    reales = calcular_resumen(conn)
+    guardados = {
+        (dimension, clave): total
+        for dimension, clave, total in conn.execute(
+            'SELECT dimension, clave, total FROM resumen_asignaciones'
+        )
+    }
+
+    diferencias = []
+    for dimension, clave in sorted(set(reales) | set(guardados)):
+        guardado = guardados.get((dimension, clave), 0)
+        real = reales.get((dimension, clave), 0)
+        if guardado != real:
+            diferencias.append((dimension, clave, guardado, real))
+    return diferencias
+
+
+def contadores(conn, dimension):
+    """
+    Contadores de una dimensión.
+
+    Args:
+        conn: Conexión SQLite
+        dimension: Una de DIMENSIONES
+
+    Returns:
+        dict: clave -> total (solo contadores mayores que cero)
+    """
+    return dict(conn.execute(SQL_CONTADORES, (dimension,)).fetchall())
+
+
+def total_asignaciones(conn):
+    """
+    Número total de asignaciones.
+    """
+    return contadores(conn, 'total').get('', 0)
+
+
+def resumen_dashboard(conn):
+    """
+    Contadores de las tarjetas del dashboard.
+
+    Returns:
+        dict: {'total', 'pendientes', 'en_proceso', 'completados'}
+    """
+    por_estado = contadores(conn, 'estado')
+    return {
+        'total': total_asignaciones(conn),
+        'pendientes': por_estado.get('Pendiente', 0),
+        'en_proceso': por_estado.get('En Proceso', 0),
+        'completados': por_estado.get('Completado', 0),
+    }
+
+
+def top_peritos(conn, limite=5):
+    """
+    Peritos con más asignaciones (incluye a los que no tienen ninguna).
+
+    Returns:
+        list: [{'nombre': str, 'total': int}, ...]
+    """
+    cursor = conn.execute('''
+        SELECT p.nombre_completo, COALESCE(r.total, 0) AS total
+        FROM peritos p
+        LEFT JOIN resumen_asignaciones r
+               ON r.dimension = 'perito' AND r.clave = CAST(p.id AS TEXT)
+        ORDER BY total DESC, p.id
+        LIMIT ?
+    ''', (limite,))
+    return [{'nombre': row[0], 'total': row[1]} for row in cursor.fetchall()]
+
+
+def por_mes(conn, meses=6):
+    """
+    Asignaciones por mes de inicio desde hace ``meses`` meses (el mes de
+    corte se cuenta completo).
+
+    Returns:
+        list: [{'mes': 'YYYY-MM', 'total': int}, ...] en orden cronológico
+    """
+    cursor = conn.execute('''
+        SELECT clave, total FROM resumen_asignaciones
+        WHERE dimension = 'mes' AND total > 0
+          AND clave >= strftime('%Y-%m', 'now', ?)
+        ORDER BY clave
+    ''', (f'-{int(meses)} months',))
+    return [{'mes': row[0], 'total': row[1]} for row in cursor.fetchall()]
+
+
+# ============================================================================
+# AGREGACIONES CON FILTROS
+# ============================================================================
+
+# Agrupaciones disponibles en /api/estadisticas?agrupar=... (nombre -> SQL)
+AGRUPACIONES = {
+    'dependencia': "COALESCE(a.dependencia, '')",
+    'lugar': "COALESCE(a.lugar, '')",
+    'perito': "COALESCE(p.nombre_completo, a.perito_asignado, '')",
+    'tipo': "COALESCE(a.tipo_perito, '')",
+    'estado': "COALESCE(a.estado, '')",
+    # Clave entera AAAAMM (columna generada, ver fechas.py): se convierte a
+    # texto después de agrupar, una vez por grupo y no por fila
+    'mes': 'a.mes_inicio',
+    # Sobre el texto: el índice (estado, fecha_inicio) cubre la consulta, y
+    # los de columnas generadas no (ver fechas.py)
+    'dia': 'date(a.fecha_inicio)',
+}
+
+# Agrupaciones por fecha: se ordenan cronológicamente y no por total
+AGRUPACIONES_FECHA = ('mes', 'dia')
+
+
+def consulta_agrupada(claves, condiciones):
+    """
+    SELECT <claves>, COUNT(*) ... GROUP BY <claves> sobre asignaciones.
+    Solo une peritos cuando alguna clave lo necesita.
+    """
+    join = ''
+    if any('p.' in clave for clave in claves):
+        join = 'LEFT JOIN peritos p ON a.perito_id = p.id'
+    columnas = ', '.join(claves)
+    return f'''
+        SELECT {columnas}, COUNT(*)
+        FROM asignaciones a
+        {join}
+        WHERE 1=1 {condiciones}
+        GROUP BY {', '.join(str(i) for i in range(1, len(claves) + 1))}
+    '''
+
+
+def resumen_filtrado(conn, condiciones, params, limite_peritos=5):
+    """
+    Estadísticas generales de las asignaciones que cumplen un filtro, en
+    una sola consulta agrupada por (estado, tipo, perito, mes).
+
+    Args:
+        conn: Conexión SQLite
+        condiciones: Condiciones WHERE (ver consultas.filtros_asignaciones)
+        params: Parámetros de las condiciones
+        limite_peritos: Tamaño del ranking de peritos
+
+    Returns:
+        dict: por_estado, por_tipo, top_peritos y por_mes con el mismo
+        formato que los contadores precalculados
+    """
+    query = consulta_agrupada(
+        [AGRUPACIONES['estado'], AGRUPACIONES['tipo'],
+         AGRUPACIONES['perito'], AGRUPACIONES['mes']],
+        condiciones
+    )
+
+    por_estado, por_tipo, por_perito, por_mes = {}, {}, {}, {}
+    for estado, tipo, perito, mes, total in conn.execute(query, params):
+        por_estado[estado] = por_estado.get(estado, 0) + total
+        if tipo:
+            por_tipo[tipo] = por_tipo.get(tipo, 0) + total
+        por_perito[perito] = por_perito.get(perito, 0) + total
+        if mes:
+            mes = texto_mes(mes)
+            por_mes[mes] = por_mes.get(mes, 0) + total
+
+    top = sorted(por_perito.items(), key=lambda item: (-item[1], item[0]))
+    return {
+        'por_estado': dict(sorted(por_estado.items())),
+        'por_tipo': dict(sorted(por_tipo.items())),
+        'top_peritos': [
+            {'nombre': nombre, 'total': total} for nombre, total in top[:limite_peritos]
+        ],
+        'por_mes': [{'mes': mes, 'total': total} for mes, total in sorted(por_mes.items())],
+    }
+
+
+def agrupar(conn, agrupacion, condiciones, params):
+    """
+    Totales por grupo con el desglose por estado de cada uno.
+
+    Args:
+        conn: Conexión SQLite
+        agrupacion: Una de AGRUPACIONES
+        condiciones: Condiciones WHERE (ver consultas.filtros_asignaciones)
+        params: Parámetros de las condiciones
+
+    Returns:
+        list: [{'clave': str, 'total': int, 'por_estado': {estado: int}}, ...]
+        ordenada por total descendente, o por fecha en 'mes' y 'dia'
+    """
+    query = consulta_agrupada(
+        [AGRUPACIONES[agrupacion], AGRUPACIONES['estado']], condiciones
+    )
+
+    grupos = {}
+    for clave, estado, total in conn.execute(query, params):
+        grupo = grupos.setdefault(clave, {'clave': clave, 'total': 0, 'por_estado': {}})
+        grupo['total'] += total
+        grupo['por_estado'][estado] = total
+
+    if agrupacion == 'mes':
+        for grupo in grupos.values():
+            if grupo['clave'] is not None:
+                grupo['clave'] = texto_mes(grupo['clave'])
+    if agrupacion in AGRUPACIONES_FECHA:
+        return sorted(grupos.values(), key=lambda g: g['clave'] or '')
+    return sorted(grupos.values(), key=lambda g: (-g['total'], g['clave']))
@@ -0,0 +1,135 @@
+"""
+SistemaPerito - Archivos estáticos con huella de contenido
+Descripción: Al iniciar se leen los archivos de static/, se calcula un hash
+de su contenido y se comprimen una sola vez (gzip y brotli). Las plantillas
+los enlazan con ``estatico('js/app.js')``, que produce una URL con el hash
+(p. ej. /assets/js/app.3f2a9c1b5d7e.js); como la URL cambia con el
+contenido, se sirven con caché inmutable de un año.
+"""
+
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, abort, current_app, request, url_for
+
+import compresion
+
+# Caché del navegador para URLs con huella
+CACHE_CONTROL_INMUTABLE = 'public, max-age=31536000, immutable'
+
+LONGITUD_HUELLA = 12
+
+
+class ArchivoEstatico:
+    """
+    Contenido de un archivo estático y sus versiones comprimidas.
+    """
+
+    __slots__ = ('ruta', 'huella', 'mimetype', 'contenido', 'comprimidos')
+
+    def __init__(self, ruta, contenido):
+        self.ruta = ruta
+        self.contenido = contenido
+        self.huella = hashlib.sha256(contenido).hexdigest()[:LONGITUD_HUELLA]
+        self.mimetype = mimetypes.guess_type(ruta)[0] or 'application/octet-stream'
+        self.comprimidos = {}
+        if self.mimetype in compresion.TIPOS_COMPRIMIBLES \
+                and len(contenido) >= compresion.COMPRESION_MIN_BYTES:
+            for codificacion in compresion.codificaciones_disponibles():
+                datos = compresion.comprimir(contenido, codificacion, estatico=True)
+                if len(datos) < len(contenido):
+                    self.comprimidos[codificacion] = datos
+
+    @property
+    def nombre_versionado(self):
+        base, extension = os.path.splitext(self.ruta)
+        return f'{base}.{self.huella}{extension}'
+
+
+class Estaticos:
+    """
+    Índice de los archivos de una carpeta por ruta relativa y por nombre
+    versionado.
+    """
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.por_ruta = {}
+        self.por_nombre = {}
+        if not carpeta or not os.path.isdir(carpeta):
+            return
+        for directorio, _, archivos in os.walk(carpeta):
+            for nombre in archivos:
+                completo = os.path.join(directorio, nombre)
+                ruta = os.path.relpath(completo, carpeta).replace(os.sep, '/')
+                with open(completo, 'rb') as archivo:
+                    estatico = ArchivoEstatico(ruta, archivo.read())
+                self.por_ruta[ruta] = estatico
+                self.por_nombre[estatico.nombre_versionado] = estatico
+
+    def url(self, ruta):
+        """
+        URL con huella de ``ruta`` (relativa a static/). Un archivo que no
+        estaba al iniciar se enlaza por la ruta estática normal de Flask.
+        """
+        estatico = self.por_ruta.get(ruta)
+        if estatico is None:
+            return url_for('static', filename=ruta)
+        return url_for('estatico', nombre=estatico.nombre_versionado)
+
+    def bytes_totales(self):
+        """
+        Tamaño original y comprimido de todos los archivos.
+
+        Returns:
+            dict: {'original': n, codificación: n, ...}
+        """
+        totales = {'original': 0}
+        for estatico in self.por_ruta.values():
+            totales['original'] += len(estatico.contenido)
+            for codificacion in compresion.codificaciones_disponibles():
+                datos = estatico.comprimidos.get(codificacion, estatico.contenido)
+                totales[codificacion] = totales.get(codificacion, 0) + len(datos)
+        return totales
+
+
+def get_estaticos():
+    return current_app.extensions['estaticos']
+
+
+def servir_estatico(nombre):
+    """
+    Sirve un archivo por su nombre versionado, comprimido de antemano si el
+    cliente lo acepta.
+    """
+    estatico = get_estaticos().por_nombre.get(nombre)
+    if estatico is None:
+        abort(404)
+
+    codificacion = None
+    if estatico.comprimidos:
+        codificacion = request.accept_encodings.best_match(list(estatico.comprimidos))
+
+    respuesta = Response(
+        estatico.comprimidos[codificacion] if codificacion else estatico.contenido,
+        mimetype=estatico.mimetype
+    )
+    if codificacion:
+        respuesta.headers['Content-Encoding'] = codificacion
+    if estatico.comprimidos:
+        respuesta.vary.add('Accept-Encoding')
+    respuesta.set_etag(estatico.huella)
+    respuesta.headers['Cache-Control'] = CACHE_CONTROL_INMUTABLE
+    return respuesta.make_conditional(request)
+
+
+def init_app(app):
+    """
+    Indexa static/ y registra la ruta /assets y la función ``estatico``
+    para las plantillas.
+    """
+    estaticos = Estaticos(app.static_folder)
+    app.extensions['estaticos'] = estaticos
+    app.add_url_rule('/assets/<path:nombre>', 'estatico', servir_estatico)
+    app.jinja_env.globals['estatico'] = estaticos.url
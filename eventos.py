@@ -0,0 +1,347 @@
+"""
+SistemaPerito - Eventos en vivo (Server-Sent Events)
+Descripción: Un único hilo vigila el registro de cambios (ver cambios.py) y
+publica cada alta, modificación o cancelación confirmada, junto con los
+contadores del dashboard recalculados, en un canal en memoria. Cada evento
+se serializa una sola vez; los suscriptores de /api/eventos no consultan la
+base de datos, sino que esperan en una misma condición y leen del búfer de
+eventos recientes a partir de su último id. Al reconectar, el navegador
+envía Last-Event-ID y se reenvían los eventos perdidos desde el búfer o, si
+ya salieron de él, desde historial.
+
+Una conexión abierta ocupa el hilo del servidor que la atiende, pero
+bloqueado en la condición: sin CPU, sin conexión a la base de datos y sin
+memoria por evento. El número de suscriptores se limita con
+EVENTOS_MAX_SUSCRIPTORES. Con servidor_gevent.py threading queda
+parcheado por gevent, las esperas son cooperativas y los suscriptores
+inactivos no retienen hilos del sistema operativo.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+from collections import deque
+
+from flask import current_app, request
+
+import cambios
+import estadisticas
+from conexion import abrir_conexion, marca_datos
+
+# Valores por defecto (configurables en app.config)
+MAX_SUSCRIPTORES_DEFAULT = 200
+INTERVALO_SONDEO_DEFAULT = 1.0
+
+# Segundos sin eventos tras los que se envía un comentario de latido, para
+# que proxies y navegadores no den la conexión por muerta
+INTERVALO_LATIDO = 15
+
+# Espera sugerida al navegador antes de reconectar (milisegundos)
+REINTENTO_MS = 3000
+
+# Eventos recientes que se conservan para suscriptores que reconectan
+BUFER_EVENTOS = 1000
+
+
+class CanalLleno(Exception):
+    """
+    Se alcanzó el número máximo de suscriptores.
+    """
+
+
+class Evento:
+    """
+    Evento ya serializado en formato text/event-stream.
+    """
+
+    __slots__ = ('id', 'texto')
+
+    def __init__(self, tipo, datos, id=None):
+        self.id = id
+        cabecera = f'id: {id}\n' if id is not None else ''
+        cuerpo = json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+        self.texto = f'{cabecera}event: {tipo}\ndata: {cuerpo}\n\n'
+
+
+def evento_cambio(cambio):
+    return Evento('asignacion', cambio, id=cambio['seq'])
+
+
+class CanalEventos:
+    """
+    Difusión en memoria de los cambios confirmados en la base de datos.
+    """
+
+    def __init__(self, ruta, max_suscriptores=MAX_SUSCRIPTORES_DEFAULT,
+                 intervalo=INTERVALO_SONDEO_DEFAULT):
+        self.ruta = ruta
+        self.max_suscriptores = max_suscriptores
+        self.intervalo = intervalo
+        self._condicion = threading.Condition()
+        self._despertar = threading.Event()
+        self._eventos = deque(maxlen=BUFER_EVENTOS)
+        self._base = None        # Secuencia anterior al evento más antiguo del búfer
+        self._cursor = None      # Última secuencia publicada
+        self._version = None
+        self._contadores = None  # Evento con los últimos contadores
+        self._suscriptores = 0
+        self._hilo = None
+        self._cerrado = False
+        self._stats = {'publicados': 0, 'reenvios_historial': 0, 'rechazados': 0}
+
+    def iniciar(self):
+        """
+        Arranca el hilo vigilante la primera vez que se necesita.
+        """
+        with self._condicion:
+            if self._hilo is not None:
+                return
+            conn = abrir_conexion(self.ruta)
+            try:
+                self._version = marca_datos(conn)[0]
+                self._cursor = self._base = cambios.cursor_actual(conn)
+                self._contadores = Evento('contadores', estadisticas.resumen_dashboard(conn))
+            finally:
+                conn.close()
+            self._hilo = threading.Thread(
+                target=self._vigilar, name='sistemaperito-eventos', daemon=True
+            )
+            self._hilo.start()
+
+    def despertar(self):
+        """
+        Adelanta la siguiente revisión (tras una escritura en este proceso).
+        """
+        self._despertar.set()
+
+    def _vigilar(self):
+        conn = abrir_conexion(self.ruta)
+        try:
+            while not self._cerrado:
+                self._despertar.wait(self.intervalo)
+                self._despertar.clear()
+                if self._cerrado:
+                    break
+                try:
+                    self._revisar(conn)
+                except sqlite3.Error:
+                    pass  # Base ocupada o en migración: se reintenta en la siguiente vuelta
+        finally:
+            conn.close()
+
+    def _revisar(self, conn):
+        """
+        Lee los cambios posteriores al último publicado (solo si cambió la
+        versión de datos) y los publica con los contadores actualizados.
+        """
+        version = marca_datos(conn)[0]
+        if version == self._version:
+            return
+
+        nuevos = []
+        cursor = self._cursor
+        while True:
+            pagina = cambios.leer_cambios(conn, cursor, cambios.LIMITE_CAMBIOS_MAX)
+            nuevos.extend(evento_cambio(cambio) for cambio in pagina['cambios'])
+            cursor = pagina['cursor']
+            if not pagina['hay_mas']:
+                break
+        contadores = Evento('contadores', estadisticas.resumen_dashboard(conn))
+        self._publicar(version, cursor, nuevos, contadores)
+
+    def _publicar(self, version, cursor, nuevos, contadores):
+        with self._condicion:
+            for evento in nuevos:
+                if len(self._eventos) == self._eventos.maxlen:
+                    self._base = self._eventos[0].id
+                self._eventos.append(evento)
+            self._version = version
+            self._cursor = cursor
+            if contadores.texto != self._contadores.texto:
+                self._contadores = contadores
+            self._stats['publicados'] += len(nuevos)
+            self._condicion.notify_all()
+
+    def suscribir(self, ultimo_id=None):
+        """
+        Registra un suscriptor.
+
+        Args:
+            ultimo_id: Último evento recibido (Last-Event-ID); sin él solo se
+                envían los eventos posteriores a la suscripción
+
+        Returns:
+            Suscripcion: Iterable con el cuerpo text/event-stream
+
+        Raises:
+            CanalLleno: Si ya hay ``max_suscriptores`` conectados
+        """
+        self.iniciar()
+        with self._condicion:
+            if self._suscriptores >= self.max_suscriptores:
+                self._stats['rechazados'] += 1
+                raise CanalLleno()
+            self._suscriptores += 1
+            cursor = self._cursor if ultimo_id is None else ultimo_id
+        return Suscripcion(self, cursor)
+
+    def _liberar(self):
+        with self._condicion:
+            self._suscriptores -= 1
+
+    def esperar(self, cursor, contadores, timeout):
+        """
+        Espera hasta que haya eventos posteriores a ``cursor`` o contadores
+        distintos de ``contadores``.
+
+        Returns:
+            tuple: (eventos, contadores, reenviar) — ``reenviar`` indica que
+            ``cursor`` ya no está en el búfer y hay que leer de historial
+        """
+        with self._condicion:
+            if not self._cerrado and self._cursor <= cursor \
+                    and self._contadores is contadores:
+                self._condicion.wait(timeout)
+            if cursor < self._base or cursor > self._cursor:
+                return [], self._contadores, True
+            eventos = []
+            for evento in reversed(self._eventos):
+                if evento.id <= cursor:
+                    break
+                eventos.append(evento)
+            eventos.reverse()
+            return eventos, self._contadores, False
+
+    def reenviar(self, cursor):
+        """
+        Eventos posteriores a ``cursor`` leídos de historial.
+
+        Returns:
+            tuple: (eventos, nuevo cursor) o (None, cursor de la última
+            publicación) si son demasiados o el cursor no es de esta base
+        """
+        with self._condicion:
+            self._stats['reenvios_historial'] += 1
+            publicado = self._cursor
+        conn = abrir_conexion(self.ruta)
+        try:
+            pagina = cambios.leer_cambios(conn, cursor, cambios.LIMITE_CAMBIOS_MAX)
+        finally:
+            conn.close()
+        if pagina['hay_mas'] or pagina.get('reiniciar') or cursor > publicado:
+            return None, publicado
+        return [evento_cambio(cambio) for cambio in pagina['cambios']], pagina['cursor']
+
+    @property
+    def cerrado(self):
+        return self._cerrado
+
+    def cerrar(self):
+        """
+        Detiene el hilo vigilante y termina las suscripciones abiertas.
+        """
+        self._cerrado = True
+        self._despertar.set()
+        with self._condicion:
+            self._condicion.notify_all()
+
+    def estadisticas(self):
+        with self._condicion:
+            stats = dict(self._stats)
+            stats.update({
+                'suscriptores': self._suscriptores,
+                'max_suscriptores': self.max_suscriptores,
+                'cursor': self._cursor,
+                'en_bufer': len(self._eventos),
+                'activo': self._hilo is not None and self._hilo.is_alive(),
+            })
+        return stats
+
+
+class Suscripcion:
+    """
+    Cuerpo de una respuesta text/event-stream. Es un iterador con
+    ``close()`` (y no un generador) para que el servidor WSGI libere el cupo
+    aunque el cliente se desconecte antes del primer envío.
+    """
+
+    def __init__(self, canal, cursor):
+        self.canal = canal
+        self.cursor = cursor
+        self.contadores = None
+        self._pendiente = f'retry: {REINTENTO_MS}\n\n'
+        self._cerrada = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._pendiente:
+            texto, self._pendiente = self._pendiente, ''
+            return texto
+        if self._cerrada or self.canal.cerrado:
+            raise StopIteration
+
+        eventos, contadores, reenviar = self.canal.esperar(
+            self.cursor, self.contadores, INTERVALO_LATIDO
+        )
+        partes = []
+        if reenviar:
+            eventos, self.cursor = self.canal.reenviar(self.cursor)
+            if eventos is None:
+                # Demasiados cambios perdidos: el cliente debe recargar sus datos
+                partes.append(f'id: {self.cursor}\nevent: reiniciar\ndata: {{}}\n\n')
+                eventos = []
+        elif eventos:
+            self.cursor = eventos[-1].id
+        partes.extend(evento.texto for evento in eventos)
+        if contadores is not self.contadores:
+            self.contadores = contadores
+            partes.append(contadores.texto)
+        return ''.join(partes) or ': latido\n\n'
+
+    def close(self):
+        if not self._cerrada:
+            self._cerrada = True
+            self.canal._liberar()
+
+
+def get_canal():
+    """
+    Devuelve el canal de eventos de la aplicación activa.
+    """
+    app = current_app._get_current_object()
+    canal = app.extensions.get('sistemaperito_eventos')
+    if canal is None or canal.ruta != app.config['DATABASE']:
+        if canal is not None:
+            canal.cerrar()
+        canal = CanalEventos(
+            app.config['DATABASE'],
+            max_suscriptores=app.config['EVENTOS_MAX_SUSCRIPTORES'],
+            intervalo=app.config['EVENTOS_INTERVALO'],
+        )
+        app.extensions['sistemaperito_eventos'] = canal
+        atexit.register(canal.cerrar)
+    return canal
+
+
+def avisar_escritura(respuesta):
+    """
+    after_request: tras una escritura correcta en este proceso, el vigilante
+    revisa de inmediato en lugar de esperar al siguiente sondeo.
+    """
+    if request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and respuesta.status_code < 400:
+        canal = current_app.extensions.get('sistemaperito_eventos')
+        if canal is not None:
+            canal.despertar()
+    return respuesta
+
+
+def init_app(app):
+    """
+    Registra la configuración de los eventos en vivo.
+    """
+    app.config.setdefault('EVENTOS_MAX_SUSCRIPTORES', MAX_SUSCRIPTORES_DEFAULT)
+    app.config.setdefault('EVENTOS_INTERVALO', INTERVALO_SONDEO_DEFAULT)
+    app.after_request(avisar_escritura)
@@ -0,0 +1,168 @@
+"""
+SistemaPerito - Exportación de reportes
+Descripción: Generación de reportes Excel y PDF en modo streaming. Las filas
+se leen del cursor por lotes: el Excel se escribe con un libro ``write_only``
+de openpyxl que comparte estilos con nombre, y el PDF se dibuja página a
+página con una tabla por página, de modo que la memoria no crece con el
+número de asignaciones exportadas.
+
+Este módulo solo define las columnas y puntos de entrada; openpyxl y
+reportlab (exportacion_excel.py y exportacion_pdf.py) se importan la primera
+vez que se genera un reporte, o al iniciar con SISTEMAPERITO_PRECARGAR=1.
+"""
+
+import importlib
+import os
+import sqlite3
+
+from consultas import FILTROS_ASIGNACIONES, construir_consulta_asignaciones
+
+# Columnas del reporte Excel (encabezado, campo de COLUMNAS_ASIGNACION)
+COLUMNAS_EXCEL = [
+    ('ID', 'id'),
+    ('Hoja Envío', 'hoja_envio'),
+    ('Expediente', 'expediente'),
+    ('Dependencia', 'dependencia'),
+    ('Tipo Perito', 'tipo_perito'),
+    ('Carpeta Fiscal', 'carpeta_fiscal'),
+    ('Observaciones', 'observaciones'),
+    ('Lugar', 'lugar'),
+    ('Fecha Inicio', 'fecha_inicio'),
+    ('Fecha Fin', 'fecha_fin'),
+    ('Perito Asignado', 'perito_asignado'),
+    ('Designación', 'desginacion'),
+    ('Oficio Desplazamiento', 'oficio_desplazamiento'),
+    ('Estado', 'estado'),
+    ('Fecha Registro', 'fecha_registro'),
+]
+
+CAMPOS_EXCEL = [campo for _, campo in COLUMNAS_EXCEL]
+
+# ============================================================================
+# REPORTE PDF
+# ============================================================================
+
+# Columnas del reporte PDF (encabezado, campo, ancho en pulgadas, caracteres máximos)
+COLUMNAS_PDF = [
+    ('Oficio', 'hoja_envio', 1.2, 15),
+    ('Expediente', 'expediente', 1.2, 13),
+    ('F. Inicio', 'fecha_inicio', 0.9, 10),
+    ('F. Fin', 'fecha_fin', 0.9, 10),
+    ('Perito', 'perito_nombre', 1.8, 21),
+    ('Estado', 'estado', 0.9, 12),
+    ('Lugar', 'lugar', 1.5, 18),
+]
+
+CAMPOS_PDF = [campo for _, campo, _, _ in COLUMNAS_PDF]
+
+
+# ============================================================================
+# CARGA DIFERIDA
+# ============================================================================
+
+# Módulos con las dependencias pesadas (openpyxl, reportlab)
+MODULOS_REPORTE = ('exportacion_excel', 'exportacion_pdf')
+
+# Precargarlos al iniciar (p. ej. servidores que hacen fork tras importar la app)
+PRECARGAR_DEFAULT = os.environ.get('SISTEMAPERITO_PRECARGAR', '0') == '1'
+
+
+def generar_excel(cursor, destino):
+    """
+    Escribe en ``destino`` un reporte Excel con las filas del cursor.
+
+    Args:
+        cursor: Cursor SQLite ya ejecutado que devuelve CAMPOS_EXCEL en orden
+        destino: Ruta o archivo binario donde guardar el libro
+
+    Returns:
+        int: Número de filas exportadas
+    """
+    from exportacion_excel import generar_excel as generar
+    return generar(cursor, destino)
+
+
+def generar_pdf(cursor, destino, filtros=None,
+                titulo='REPORTE DE ASIGNACIONES DE PERITOS'):
+    """
+    Dibuja en ``destino`` un reporte PDF con todas las filas del cursor.
+
+    Args:
+        cursor: Cursor SQLite ya ejecutado que devuelve CAMPOS_PDF en orden
+        destino: Ruta o archivo binario donde guardar el PDF
+        filtros: Filtros aplicados, para mostrarlos en la cabecera
+        titulo: Título del reporte
+
+    Returns:
+        int: Número de filas exportadas
+    """
+    from exportacion_pdf import generar_pdf as generar
+    return generar(cursor, destino, filtros, titulo)
+
+
+def precargar():
+    """
+    Importa openpyxl y reportlab de inmediato en lugar de en el primer
+    reporte, para que la primera exportación no pague la importación.
+    """
+    for modulo in MODULOS_REPORTE:
+        importlib.import_module(modulo)
+
+
+def init_app(app):
+    """
+    Registra la configuración de la exportación y precarga los módulos de
+    reportes si así se configuró.
+    """
+    app.config.setdefault('PRECARGAR_EXPORTACION', PRECARGAR_DEFAULT)
+    if app.config['PRECARGAR_EXPORTACION']:
+        precargar()
+
+
+# ============================================================================
+# GENERACIÓN FUERA DE LA PETICIÓN
+# ============================================================================
+
+FORMATOS = {
+    'excel': '.xlsx',
+    'pdf': '.pdf',
+}
+
+
+def generar_reporte(ruta_db, formato, filtros, destino):
+    """
+    Genera un reporte completo en ``destino`` usando su propia conexión.
+    Se ejecuta en los procesos del pool de trabajos de exportación.
+
+    El archivo se escribe con un nombre temporal y se renombra al terminar,
+    por lo que nunca se sirve un reporte a medio escribir.
+
+    Args:
+        ruta_db: Ruta de la base de datos SQLite
+        formato: 'excel' o 'pdf'
+        filtros: Diccionario con los filtros de FILTROS_ASIGNACIONES
+        destino: Ruta final del archivo
+
+    Returns:
+        int: Número de filas exportadas
+    """
+    filtros = {k: v for k, v in filtros.items() if k in FILTROS_ASIGNACIONES and v}
+    campos = CAMPOS_EXCEL if formato == 'excel' else CAMPOS_PDF
+    query, params = construir_consulta_asignaciones(filtros, campos)
+
+    conn = sqlite3.connect(ruta_db, timeout=5.0)
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    try:
+        cursor = conn.execute(query, params)
+        with open(temporal, 'wb') as archivo:
+            if formato == 'excel':
+                total = generar_excel(cursor, archivo)
+            else:
+                total = generar_pdf(cursor, archivo, filtros)
+        os.replace(temporal, destino)
+    finally:
+        conn.close()
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    return total
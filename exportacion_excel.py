@@ -0,0 +1,139 @@
+"""
+SistemaPerito - Reporte Excel
+Descripción: Libro ``write_only`` de openpyxl escrito fila a fila desde el
+cursor, con estilos con nombre compartidos por todas las celdas. Se importa
+la primera vez que se genera un Excel (ver exportacion.generar_excel).
+"""
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+
+from exportacion import CAMPOS_EXCEL, COLUMNAS_EXCEL
+
+# Color de fondo de la celda de estado
+COLORES_ESTADO = {
+    'Completado': 'D1FAE5',
+    'En Proceso': 'FEF3C7',
+    'Pendiente': 'DBEAFE',
+    'Cancelado': 'FEE2E2',
+}
+
+# Filas usadas para estimar el ancho de las columnas
+FILAS_MUESTRA_ANCHO = 200
+ANCHO_MAXIMO = 50
+
+# Filas leídas del cursor en cada lote
+TAMANO_LOTE = 1000
+
+
+def _registrar_estilos(wb):
+    """
+    Registra los estilos con nombre del reporte en el libro. Cada celda
+    solo guarda el nombre del estilo en lugar de objetos propios.
+
+    Returns:
+        dict: estado -> nombre del estilo de la celda de estado
+    """
+    borde = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    encabezado = NamedStyle(name='sp_encabezado')
+    encabezado.font = Font(bold=True, color="FFFFFF", size=11)
+    encabezado.fill = PatternFill(start_color="1E40AF", end_color="1E40AF", fill_type="solid")
+    encabezado.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    encabezado.border = borde
+    wb.add_named_style(encabezado)
+
+    celda = NamedStyle(name='sp_celda')
+    celda.alignment = Alignment(wrap_text=True)
+    celda.border = borde
+    wb.add_named_style(celda)
+
+    estilos_estado = {}
+    for estado, color in COLORES_ESTADO.items():
+        nombre = f'sp_estado_{estado.lower().replace(" ", "_")}'
+        estilo = NamedStyle(name=nombre)
+        estilo.alignment = Alignment(wrap_text=True)
+        estilo.border = borde
+        estilo.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        wb.add_named_style(estilo)
+        estilos_estado[estado] = nombre
+
+    return estilos_estado
+
+
+def _anchos_columnas(muestra):
+    """
+    Calcula el ancho de cada columna a partir de las filas de muestra.
+    """
+    anchos = [len(encabezado) for encabezado, _ in COLUMNAS_EXCEL]
+    for fila in muestra:
+        for i, valor in enumerate(fila):
+            if valor is not None:
+                anchos[i] = max(anchos[i], len(str(valor)))
+    return [min(ancho + 2, ANCHO_MAXIMO) for ancho in anchos]
+
+
+def _filas(cursor, muestra):
+    """
+    Recorre primero la muestra ya leída y luego el resto del cursor por lotes.
+    """
+    yield from muestra
+    while True:
+        lote = cursor.fetchmany(TAMANO_LOTE)
+        if not lote:
+            break
+        yield from lote
+
+
+def generar_excel(cursor, destino):
+    """
+    Escribe en ``destino`` un reporte Excel con las filas del cursor.
+
+    Args:
+        cursor: Cursor SQLite ya ejecutado que devuelve CAMPOS_EXCEL en orden
+        destino: Ruta o archivo binario donde guardar el libro
+
+    Returns:
+        int: Número de filas exportadas
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Asignaciones")
+    estilos_estado = _registrar_estilos(wb)
+
+    # En modo write_only los anchos deben fijarse antes de escribir filas
+    muestra = cursor.fetchmany(FILAS_MUESTRA_ANCHO)
+    for i, ancho in enumerate(_anchos_columnas(muestra), 1):
+        ws.column_dimensions[get_column_letter(i)].width = ancho
+
+    # Encabezados
+    fila_encabezado = []
+    for encabezado, _ in COLUMNAS_EXCEL:
+        cell = WriteOnlyCell(ws, value=encabezado)
+        cell.style = 'sp_encabezado'
+        fila_encabezado.append(cell)
+    ws.append(fila_encabezado)
+
+    # Datos
+    indice_estado = CAMPOS_EXCEL.index('estado')
+    total = 0
+    for datos in _filas(cursor, muestra):
+        fila = []
+        for i, valor in enumerate(datos):
+            cell = WriteOnlyCell(ws, value=valor)
+            if i == indice_estado and valor in estilos_estado:
+                cell.style = estilos_estado[valor]
+            else:
+                cell.style = 'sp_celda'
+            fila.append(cell)
+        ws.append(fila)
+        total += 1
+
+    wb.save(destino)
+    return total
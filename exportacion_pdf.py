@@ -0,0 +1,142 @@
+"""
+SistemaPerito - Reporte PDF
+Descripción: Reporte dibujado página a página con reportlab, con una tabla
+por página. Se importa la primera vez que se genera un PDF (ver
+exportacion.generar_pdf).
+"""
+
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle, Paragraph
+
+from exportacion import COLUMNAS_PDF
+
+MARGEN_PDF = 0.6 * inch
+ALTO_ENCABEZADO_PDF = 0.3 * inch
+ALTO_FILA_PDF = 0.18 * inch
+
+ESTILO_TABLA_PDF = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E40AF')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 1), (-1, -1), 7),
+    ('TOPPADDING', (0, 1), (-1, -1), 1),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 1),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+
+
+def _celda_pdf(valor, maximo):
+    """
+    Texto de una celda en una sola línea, recortado al ancho de la columna.
+    """
+    if valor is None:
+        return ''
+    return ' '.join(str(valor).split())[:maximo]
+
+
+def _dibujar_cabecera_pdf(c, titulo, filtros, y):
+    """
+    Dibuja el título, la fecha y los filtros aplicados en la primera página.
+
+    Returns:
+        float: Coordenada y disponible debajo de la cabecera
+    """
+    styles = getSampleStyleSheet()
+    ancho = A4[0] - 2 * MARGEN_PDF
+
+    parrafos = [Paragraph(f"<b>{titulo}</b>", styles['Title'])]
+    parrafos.append(Paragraph(
+        f"<b>Fecha:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}",
+        styles['Normal']
+    ))
+    if filtros:
+        parrafos.append(Paragraph(
+            '<b>Filtros:</b> ' + escape(', '.join(f'{k}: {v}' for k, v in filtros.items())),
+            styles['Normal']
+        ))
+
+    for parrafo in parrafos:
+        _, alto = parrafo.wrapOn(c, ancho, A4[1])
+        y -= alto
+        parrafo.drawOn(c, MARGEN_PDF, y)
+        y -= 0.1 * inch
+
+    return y - 0.1 * inch
+
+
+def generar_pdf(cursor, destino, filtros=None,
+                titulo='REPORTE DE ASIGNACIONES DE PERITOS'):
+    """
+    Dibuja en ``destino`` un reporte PDF con todas las filas del cursor.
+
+    Cada página recibe exactamente las filas que caben (leídas del cursor
+    en ese momento) y repite el encabezado de la tabla, por lo que solo
+    hay una página de filas en memoria a la vez.
+
+    Args:
+        cursor: Cursor SQLite ya ejecutado que devuelve CAMPOS_PDF en orden
+        destino: Ruta o archivo binario donde guardar el PDF
+        filtros: Filtros aplicados, para mostrarlos en la cabecera
+        titulo: Título del reporte
+
+    Returns:
+        int: Número de filas exportadas
+    """
+    c = canvas.Canvas(destino, pagesize=A4, pageCompression=1)
+    c.setTitle(titulo)
+
+    encabezado = [nombre for nombre, _, _, _ in COLUMNAS_PDF]
+    # Ajustar las columnas proporcionalmente al ancho útil de la página
+    anchos = [ancho * inch for _, _, ancho, _ in COLUMNAS_PDF]
+    escala = (A4[0] - 2 * MARGEN_PDF) / sum(anchos)
+    anchos = [ancho * escala for ancho in anchos]
+    maximos = [maximo for _, _, _, maximo in COLUMNAS_PDF]
+
+    total = 0
+    pagina = 1
+    y = _dibujar_cabecera_pdf(c, titulo, filtros, A4[1] - MARGEN_PDF)
+
+    while True:
+        # Filas que caben en el espacio restante de la página
+        capacidad = int((y - MARGEN_PDF - ALTO_ENCABEZADO_PDF) // ALTO_FILA_PDF)
+        filas = cursor.fetchmany(capacidad)
+        if not filas and pagina > 1:
+            break
+
+        datos = [encabezado]
+        for fila in filas:
+            datos.append([_celda_pdf(v, m) for v, m in zip(fila, maximos)])
+
+        table = Table(
+            datos,
+            colWidths=anchos,
+            rowHeights=[ALTO_ENCABEZADO_PDF] + [ALTO_FILA_PDF] * len(filas)
+        )
+        table.setStyle(ESTILO_TABLA_PDF)
+        _, alto = table.wrapOn(c, A4[0], A4[1])
+        table.drawOn(c, MARGEN_PDF, y - alto)
+
+        c.setFont('Helvetica', 8)
+        c.drawRightString(A4[0] - MARGEN_PDF, MARGEN_PDF / 2, f'Página {pagina}')
+
+        total += len(filas)
+        if len(filas) < capacidad:
+            break
+
+        c.showPage()
+        pagina += 1
+        y = A4[1] - MARGEN_PDF
+
+    c.save()
+    return total
@@ -0,0 +1,179 @@
+"""
+SistemaPerito - Fechas de las asignaciones como números de día
+Descripción: fecha_inicio y fecha_fin se guardan como texto AAAA-MM-DD.
+Las columnas generadas dia_inicio y dia_fin contienen el número de día (el
+mismo ordinal que date.toordinal()) y mes_inicio la clave entera AAAAMM.
+Con ellas los rangos, solapamientos y agrupaciones por mes se resuelven
+comparando enteros dentro de un índice, sin funciones de fecha por fila.
+Unos triggers rechazan las fechas mal formadas al insertar o modificar.
+
+Las columnas son STORED: se calculan una vez al escribir, mientras que las
+VIRTUAL se recalcularían con julianday() en cada lectura. SQLite no permite
+añadirlas con ALTER TABLE, así que la migración reconstruye la tabla. En
+SQLite 3.40 un índice sobre columnas generadas nunca es de cobertura (se lee
+también la fila), por eso el listado ordenado por fecha y la agrupación por
+día siguen usando los índices sobre el texto de las fechas.
+"""
+
+import re
+from datetime import date
+
+# julianday() de la medianoche del día con ordinal 0 (0000-12-31)
+DESFASE_JULIANO = 1721424.5
+
+# Columnas generadas (se añaden al final de la tabla)
+COLUMNAS_GENERADAS = {
+    'dia_inicio': f'CAST(julianday(fecha_inicio) - {DESFASE_JULIANO} AS INTEGER)',
+    'dia_fin': f'CAST(julianday(fecha_fin) - {DESFASE_JULIANO} AS INTEGER)',
+    'mes_inicio': "CAST(strftime('%Y%m', fecha_inicio) AS INTEGER)",
+}
+
+# Duración de una asignación en días (coincide con idx_asignaciones_duracion_dias)
+SQL_DURACION = 'dia_fin - dia_inicio'
+
+MENSAJE_FECHA_INVALIDA = 'Las fechas deben tener el formato AAAA-MM-DD'
+
+# Una fecha es válida si date() la devuelve sin cambios: descarta formatos
+# distintos de AAAA-MM-DD, horas añadidas y, con el modificador '+0 days'
+# (que normaliza la fecha), días inexistentes como 2025-02-30
+_FECHAS_INVALIDAS = '''
+    date(NEW.fecha_inicio, '+0 days') IS NOT NEW.fecha_inicio
+    OR date(NEW.fecha_fin, '+0 days') IS NOT NEW.fecha_fin
+'''
+
+SQL_TRIGGERS_VALIDACION = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS asignaciones_fechas_insert
+    BEFORE INSERT ON asignaciones WHEN {_FECHAS_INVALIDAS} BEGIN
+        SELECT RAISE(ABORT, '{MENSAJE_FECHA_INVALIDA}');
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS asignaciones_fechas_update
+    BEFORE UPDATE OF fecha_inicio, fecha_fin ON asignaciones
+    WHEN {_FECHAS_INVALIDAS} BEGIN
+        SELECT RAISE(ABORT, '{MENSAJE_FECHA_INVALIDA}');
+    END
+    ''',
+]
+
+SQL_INDICES = [
+    # Reemplaza al índice de duración sobre julianday() del texto
+    'DROP INDEX IF EXISTS idx_asignaciones_duracion',
+    f'''CREATE INDEX IF NOT EXISTS idx_asignaciones_duracion_dias
+       ON asignaciones (({SQL_DURACION}))''',
+    # Disponibilidad de un perito: el predicado completo se resuelve en el
+    # índice (idx_asignaciones_perito_fechas se conserva para ordenar el
+    # listado por fecha_inicio)
+    '''CREATE INDEX IF NOT EXISTS idx_asignaciones_perito_dias
+       ON asignaciones (perito_id, dia_inicio, dia_fin, estado)''',
+    # Solapamientos con una ventana, ya ordenados por dia_inicio, id
+    '''CREATE INDEX IF NOT EXISTS idx_asignaciones_dia_inicio
+       ON asignaciones (dia_inicio)''',
+    # Agrupación por mes (y estado) en /api/estadisticas
+    '''CREATE INDEX IF NOT EXISTS idx_asignaciones_mes
+       ON asignaciones (mes_inicio, estado)''',
+]
+
+
+# Primera restricción de tabla: las columnas nuevas van antes de ella
+_PATRON_RESTRICCION = re.compile(
+    r',\s*(?=(?:CONSTRAINT|PRIMARY\s+KEY|UNIQUE|CHECK|FOREIGN\s+KEY)\b)', re.IGNORECASE
+)
+
+
+def _esquema_con_columnas(sql):
+    """
+    CREATE TABLE de asignaciones_nueva: el de asignaciones con las columnas
+    generadas añadidas tras las existentes.
+    """
+    definiciones = ''.join(
+        f',\n            {nombre} INTEGER GENERATED ALWAYS AS ({expresion}) STORED'
+        for nombre, expresion in COLUMNAS_GENERADAS.items()
+    )
+    sql = re.sub(r'^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?"?asignaciones"?',
+                 'CREATE TABLE asignaciones_nueva', sql, count=1, flags=re.IGNORECASE)
+    restriccion = _PATRON_RESTRICCION.search(sql)
+    posicion = restriccion.start() if restriccion else sql.rindex(')')
+    return sql[:posicion] + definiciones + sql[posicion:]
+
+
+def reconstruir_tabla(conn):
+    """
+    Reconstruye asignaciones con las columnas generadas: copia las filas
+    (con sus ids) a una tabla nueva, la renombra y vuelve a crear los
+    índices y triggers de la anterior. Debe ejecutarse dentro de una
+    transacción y con las claves foráneas desactivadas (el valor por
+    defecto de SQLite, que conexion.py no cambia).
+    """
+    sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'asignaciones'"
+    ).fetchone()[0]
+    # table_info no lista las columnas generadas; table_xinfo sí (hidden != 0)
+    columnas = ', '.join(
+        fila[1] for fila in conn.execute('PRAGMA table_xinfo(asignaciones)') if fila[6] == 0
+    )
+    # Índices y triggers de la tabla, y triggers de otras tablas que la
+    # consultan (el RENAME falla si alguno apunta a una tabla inexistente)
+    dependientes = conn.execute(
+        "SELECT type, name, tbl_name, sql FROM sqlite_master "
+        "WHERE sql IS NOT NULL AND (type = 'index' AND tbl_name = 'asignaciones' "
+        "OR type = 'trigger' AND (tbl_name = 'asignaciones' OR sql LIKE '%asignaciones%')) "
+        "ORDER BY type, name"
+    ).fetchall()
+    secuencia = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'asignaciones'"
+    ).fetchone()
+
+    conn.execute(_esquema_con_columnas(sql))
+    conn.execute(
+        f'INSERT INTO asignaciones_nueva ({columnas}) SELECT {columnas} FROM asignaciones'
+    )
+    for tipo, nombre, tabla, _ in dependientes:
+        if tipo == 'trigger' and tabla != 'asignaciones':
+            conn.execute(f'DROP TRIGGER {nombre}')
+    conn.execute('DROP TABLE asignaciones')
+    conn.execute('ALTER TABLE asignaciones_nueva RENAME TO asignaciones')
+    for _, _, _, sentencia in dependientes:
+        conn.execute(sentencia)
+    if secuencia is not None:
+        # Los ids de filas ya borradas no se reutilizan
+        conn.execute(
+            "UPDATE sqlite_sequence SET seq = ? WHERE name = 'asignaciones'", secuencia
+        )
+
+
+def crear_columnas(conn):
+    """
+    Añade las columnas generadas (reconstruyendo la tabla si faltan), sus
+    índices y los triggers de validación.
+    """
+    columnas = {fila[1] for fila in conn.execute('PRAGMA table_xinfo(asignaciones)')}
+    if not columnas.issuperset(COLUMNAS_GENERADAS):
+        reconstruir_tabla(conn)
+    for sql in SQL_TRIGGERS_VALIDACION + SQL_INDICES:
+        conn.execute(sql)
+
+
+def dia(texto):
+    """
+    Número de día de una fecha AAAA-MM-DD (el valor de dia_inicio/dia_fin).
+
+    Raises:
+        ValueError: Si el texto no es una fecha AAAA-MM-DD válida
+    """
+    try:
+        fecha = date.fromisoformat(texto)
+    except TypeError:
+        raise ValueError(MENSAJE_FECHA_INVALIDA) from None
+    # fromisoformat también acepta otras formas ISO (20250105, 2025-W01-1)
+    if fecha.isoformat() != texto:
+        raise ValueError(MENSAJE_FECHA_INVALIDA)
+    return fecha.toordinal()
+
+
+def texto_mes(clave):
+    """
+    Mes AAAA-MM de una clave mes_inicio (AAAAMM).
+    """
+    return f'{clave // 100:04d}-{clave % 100:02d}'
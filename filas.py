@@ -0,0 +1,83 @@
+"""
+SistemaPerito - Filas de las consultas
+Descripción: Modelo de fila compartido (tuplas con nombre, sin __dict__)
+que se asigna como row_factory de un cursor, y serialización de listados a
+JSON. Para las respuestas grandes SQLite arma cada objeto con json_object()
+y Python solo une los textos por lotes, sin crear un dict por fila.
+"""
+
+import functools
+from collections import namedtuple
+
+# Filas leídas por cada fetchmany al serializar un cursor
+TAMANO_LOTE = 1000
+
+
+@functools.lru_cache(maxsize=64)
+def modelo(campos):
+    """
+    Clase de fila para una tupla de campos (una por combinación de campos).
+    Las instancias son tuplas: acceso por atributo (fila.estado) o por
+    posición, y ``_asdict()`` para serializarlas con jsonify.
+    """
+    return namedtuple('Fila', campos)
+
+
+def fabrica(campos):
+    """
+    row_factory de sqlite3 que devuelve filas del modelo de ``campos``.
+
+    Args:
+        campos: Nombres de las columnas seleccionadas, en orden
+    """
+    crear = modelo(tuple(campos))._make
+    return lambda cursor, fila: crear(fila)
+
+
+def consultar(conn, campos, query, params=()):
+    """
+    Ejecuta ``query`` con un cursor cuyas filas son del modelo de ``campos``.
+
+    Returns:
+        sqlite3.Cursor
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = fabrica(campos)
+    return cursor.execute(query, params)
+
+
+def objeto_json(columnas):
+    """
+    Expresión SQL que devuelve una fila como objeto JSON.
+
+    Args:
+        columnas: Lista de (campo, expresión SQL); el orden de los pares es
+            el de las claves del objeto
+
+    Returns:
+        str: json_object('campo', expresión, ...)
+    """
+    pares = ', '.join(f"'{campo}', {expresion}" for campo, expresion in columnas)
+    return f'json_object({pares})'
+
+
+def array_json(filas, tamano_lote=TAMANO_LOTE):
+    """
+    Une en un array JSON filas cuya primera columna es un objeto JSON (ver
+    objeto_json). Un cursor se lee por lotes con fetchmany; una lista se
+    une de una vez.
+
+    Returns:
+        tuple: (cuerpo: bytes, número de filas)
+    """
+    if hasattr(filas, 'fetchmany'):
+        lotes = iter(lambda: filas.fetchmany(tamano_lote), [])
+    else:
+        lotes = [filas] if filas else []
+
+    partes = []
+    total = 0
+    for lote in lotes:
+        total += len(lote)
+        partes.append(','.join([fila[0] for fila in lote]).encode('utf-8'))
+    return b'[' + b','.join(partes) + b']', total
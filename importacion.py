@@ -0,0 +1,332 @@
+"""
+SistemaPerito - Importación masiva de asignaciones desde Excel
+Descripción: Lee libros .xlsx con las mismas columnas que genera la
+exportación (openpyxl en modo read_only), valida todas las filas en lote,
+detecta solapamientos dentro del archivo y contra la base de datos con un
+barrido ordenado por perito, e inserta las filas válidas con executemany en
+una sola transacción. Durante la inserción no corren los triggers del índice
+de búsqueda ni de los contadores: ambos se ponen al día al final con una
+sentencia cada uno (ver busqueda.carga_masiva y estadisticas.carga_masiva).
+"""
+
+import unicodedata
+from datetime import date, datetime
+
+import busqueda
+import estadisticas
+from conexion import transaccion
+from consultas import CAMPOS_EDITABLES, ESTADOS_ASIGNACION
+from exportacion import COLUMNAS_EXCEL
+from ocupacion import consulta_solapadas, detectar_choques, parametros_ventana
+
+# Campos que se importan (ID y Fecha Registro los asigna la base de datos)
+CAMPOS_IMPORTACION = CAMPOS_EDITABLES
+
+# Encabezados adicionales que identifican al perito
+ENCABEZADOS_EXTRA = [
+    ('Perito ID', 'perito_id'),
+    ('Perito', 'perito_nombre'),
+]
+
+# Errores detallados que se incluyen en el reporte
+MAX_ERRORES_REPORTE = 500
+
+FORMATOS_FECHA = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+
+
+def _normalizar(texto):
+    """
+    Mayúsculas, sin tildes y con espacios simples.
+    """
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode()
+    return ' '.join(texto.upper().split())
+
+
+# Encabezado normalizado -> campo (acepta también el nombre del campo)
+_CAMPO_POR_ENCABEZADO = {}
+for _encabezado, _campo in [*COLUMNAS_EXCEL, *ENCABEZADOS_EXTRA]:
+    if _campo not in ('id', 'fecha_registro'):
+        _CAMPO_POR_ENCABEZADO[_normalizar(_encabezado)] = _campo
+        _CAMPO_POR_ENCABEZADO[_normalizar(_campo)] = _campo
+
+
+def _fecha(valor):
+    """
+    Convierte una celda en date (acepta fechas de Excel y texto).
+    """
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor or '').strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+class IndicePeritos:
+    """
+    Resuelve el perito de cada fila por id, nombre completo o por las
+    palabras del texto "Perito Asignado" (p. ej. "SANDRA IBARRA").
+    """
+
+    def __init__(self, conn):
+        self.por_id = {}
+        self.por_nombre = {}
+        self.palabras = []
+        for id, nombre, tipo in conn.execute('SELECT id, nombre_completo, tipo FROM peritos'):
+            self.por_id[id] = (id, nombre, tipo)
+            self.por_nombre[_normalizar(nombre)] = (id, nombre, tipo)
+            self.palabras.append((set(_normalizar(nombre).split()), (id, nombre, tipo)))
+
+    def resolver(self, perito_id, nombre, asignado, tipo):
+        """
+        Returns:
+            tuple: ((id, nombre, tipo) o None, error o None)
+        """
+        if perito_id:
+            try:
+                perito = self.por_id.get(int(float(perito_id)))
+            except (ValueError, OverflowError):  # "abc", "nan", "inf", "1e400"
+                perito = None
+            return (perito, None) if perito else (None, f'Perito ID {perito_id} no existe')
+
+        if nombre:
+            perito = self.por_nombre.get(_normalizar(nombre))
+            return (perito, None) if perito else (None, f'Perito "{nombre}" no existe')
+
+        palabras = set(_normalizar(asignado).split())
+        if not palabras:
+            return None, 'Falta el perito'
+        candidatos = [
+            perito for nombre_palabras, perito in self.palabras
+            if palabras <= nombre_palabras and (not tipo or perito[2] == tipo)
+        ]
+        if len(candidatos) == 1:
+            return candidatos[0], None
+        if not candidatos:
+            return None, f'Ningún perito coincide con "{asignado}"'
+        return None, f'"{asignado}" coincide con varios peritos'
+
+
+def leer_excel(origen):
+    """
+    Lee las filas de la primera hoja de un libro .xlsx.
+
+    Args:
+        origen: Ruta o archivo binario
+
+    Returns:
+        tuple: (campos: list, filas: iterador de (número de fila, valores))
+
+    Raises:
+        ValueError: Si faltan columnas obligatorias
+    """
+    from openpyxl import load_workbook  # Solo se carga al importar un archivo
+
+    wb = load_workbook(origen, read_only=True, data_only=True)
+    ws = wb.worksheets[0]
+    filas = ws.iter_rows(values_only=True)
+
+    encabezados = next(filas, None) or ()
+    campos = [_CAMPO_POR_ENCABEZADO.get(_normalizar(e or '')) for e in encabezados]
+
+    faltantes = [c for c in ('fecha_inicio', 'fecha_fin') if c not in campos]
+    if not any(c in campos for c in ('perito_id', 'perito_nombre', 'perito_asignado')):
+        faltantes.append('perito_asignado')
+    if faltantes:
+        wb.close()
+        raise ValueError(f'Faltan columnas: {", ".join(faltantes)}')
+
+    def _iterar():
+        try:
+            for numero, valores in enumerate(filas, start=2):
+                if any(v not in (None, '') for v in valores):
+                    yield numero, valores
+        finally:
+            wb.close()
+
+    return campos, _iterar()
+
+
+def validar_filas(conn, campos, filas):
+    """
+    Valida las filas leídas: fechas, estado y perito.
+
+    Returns:
+        tuple: (validas: list de dicts, errores: list de (fila, mensaje))
+    """
+    peritos = IndicePeritos(conn)
+    validas = []
+    errores = []
+
+    for numero, valores in filas:
+        datos = {
+            campo: valor for campo, valor in zip(campos, valores) if campo
+        }
+        fila = {campo: _texto(datos.get(campo)) for campo in CAMPOS_IMPORTACION}
+        problemas = []
+
+        inicio = _fecha(datos.get('fecha_inicio'))
+        fin = _fecha(datos.get('fecha_fin'))
+        if not inicio:
+            problemas.append('Fecha de inicio no válida')
+        if not fin:
+            problemas.append('Fecha de fin no válida')
+        if inicio and fin and fin < inicio:
+            problemas.append('La fecha de fin es anterior a la de inicio')
+
+        fila['estado'] = fila['estado'] or 'Pendiente'
+        if fila['estado'] not in ESTADOS_ASIGNACION:
+            problemas.append(f'Estado "{fila["estado"]}" no válido')
+
+        perito, error = peritos.resolver(
+            fila['perito_id'], _texto(datos.get('perito_nombre')),
+            fila['perito_asignado'], fila['tipo_perito']
+        )
+        if error:
+            problemas.append(error)
+
+        if problemas:
+            errores.append((numero, '; '.join(problemas)))
+            continue
+
+        fila['perito_id'] = perito[0]
+        fila['tipo_perito'] = fila['tipo_perito'] or perito[2]
+        fila['perito_asignado'] = fila['perito_asignado'] or perito[1]
+        fila['fecha_inicio'] = inicio.isoformat()
+        fila['fecha_fin'] = fin.isoformat()
+        fila['_fila'] = numero
+        fila['_inicio'] = inicio.toordinal()
+        fila['_fin'] = fin.toordinal()
+        validas.append(fila)
+
+    return validas, errores
+
+
+def detectar_solapamientos(conn, filas):
+    """
+    Detecta filas que se solapan con otra fila del archivo o con una
+    asignación existente del mismo perito (las canceladas no cuentan).
+
+    Se consultan de una vez las asignaciones existentes de los peritos del
+    archivo y luego se recorre cada perito con ocupacion.detectar_choques:
+    las asignaciones de la base son fijas y las filas se aceptan en orden de
+    fecha de inicio (y de fila).
+
+    Returns:
+        list: (fila, mensaje) de cada fila rechazada
+    """
+    activas = [f for f in filas if f['estado'] != 'Cancelado']
+    if not activas:
+        return []
+
+    # Asignaciones existentes de los peritos del archivo en el rango cubierto
+    peritos = sorted({f['perito_id'] for f in activas})
+    desde = date.fromordinal(min(f['_inicio'] for f in activas))
+    hasta = date.fromordinal(max(f['_fin'] for f in activas))
+    query, extra = consulta_solapadas(
+        ['a.perito_id', 'a.id', 'a.dia_inicio', 'a.dia_fin'],
+        incluir_canceladas=False, peritos=peritos
+    )
+
+    fijos = {perito: [] for perito in peritos}
+    for perito_id, id, inicio, fin in conn.execute(
+        query, [*parametros_ventana(conn, desde, hasta), *extra]
+    ):
+        fijos[perito_id].append((inicio, fin, f'la asignación #{id}'))
+    nuevos = {perito: [] for perito in peritos}
+    for fila in sorted(activas, key=lambda f: (f['_inicio'], f['_fila'])):
+        nuevos[fila['perito_id']].append(
+            (fila['_inicio'], fila['_fin'], fila['_fila'], f'la fila {fila["_fila"]}')
+        )
+
+    rechazadas = []
+    for perito in peritos:
+        rechazadas.extend(
+            (fila, f'Se solapa con {otro}')
+            for fila, otro in detectar_choques(fijos[perito], nuevos[perito])
+        )
+    return sorted(rechazadas)
+
+
+SQL_INSERTAR = f'''
+    INSERT INTO asignaciones ({', '.join(CAMPOS_IMPORTACION)})
+    VALUES ({', '.join('?' * len(CAMPOS_IMPORTACION))})
+'''
+
+
+def importar(conn, origen, simular=False, omitir_errores=False, nombre=''):
+    """
+    Importa un libro .xlsx de asignaciones.
+
+    Sin ``omitir_errores`` la importación es todo o nada: si alguna fila
+    tiene errores no se inserta ninguna. Con ``simular`` solo se valida.
+
+    Args:
+        conn: Conexión SQLite (se usa una transacción BEGIN IMMEDIATE)
+        origen: Ruta o archivo binario .xlsx
+        simular: Validar sin escribir
+        omitir_errores: Insertar las filas válidas aunque otras fallen
+        nombre: Nombre del archivo para el historial
+
+    Returns:
+        dict: Reporte con filas leídas, válidas, insertadas y errores
+
+    Raises:
+        ValueError: Si el libro no tiene las columnas necesarias
+    """
+    campos, filas = leer_excel(origen)
+    validas, errores = validar_filas(conn, campos, filas)
+    leidas = len(validas) + len(errores)
+
+    def _barrer():
+        solapadas = detectar_solapamientos(conn, validas)
+        rechazadas = {fila for fila, _ in solapadas}
+        return sorted(errores + solapadas), [f for f in validas if f['_fila'] not in rechazadas]
+
+    insertadas = 0
+    if simular:
+        errores, validas = _barrer()
+    else:
+        # El barrido se hace con el bloqueo de escritura tomado, de modo que
+        # nadie registra una asignación solapada entre la validación y la inserción
+        with transaccion(conn):
+            errores, validas = _barrer()
+            if validas and (omitir_errores or not errores):
+                ultimo_id = conn.execute(
+                    'SELECT COALESCE(MAX(id), 0) FROM asignaciones'
+                ).fetchone()[0]
+                with busqueda.carga_masiva(conn), estadisticas.carga_masiva(conn):
+                    conn.executemany(
+                        SQL_INSERTAR,
+                        ([f[campo] for campo in CAMPOS_IMPORTACION] for f in validas)
+                    )
+                conn.execute('''
+                    INSERT INTO historial (asignacion_id, accion, detalles)
+                    SELECT id, 'Creado', ? FROM asignaciones WHERE id > ?
+                ''', (f'Importada desde {nombre or "Excel"}', ultimo_id))
+                insertadas = len(validas)
+
+    return {
+        'simulacion': simular,
+        'filas': leidas,
+        'validas': len(validas),
+        'insertadas': insertadas,
+        'total_errores': len(errores),
+        'errores': [
+            {'fila': fila, 'error': mensaje}
+            for fila, mensaje in errores[:MAX_ERRORES_REPORTE]
+        ],
+    }
@@ -0,0 +1,370 @@
+"""
+SistemaPerito - Instrumentación de peticiones (opcional)
+Descripción: Con SISTEMAPERITO_INSTRUMENTACION=1 cada petición mide su
+duración total, el tiempo y número de consultas SQL (mediante una subclase
+de sqlite3.Connection), el tiempo de renderizado de plantillas y las fases
+que el código marque con ``fase('excel')``. El desglose se envía en la
+cabecera Server-Timing y se acumula por ruta en /debug/metrics (formato de
+texto de Prometheus). Con SISTEMAPERITO_PERFIL=0.01 se perfila con cProfile
+una de cada cien peticiones y el resultado se guarda en PERFIL_DIR.
+
+Desactivada (por defecto) no cambia la conexión ni añade trabajo a las
+peticiones más allá de leer dos valores de configuración.
+"""
+
+import cProfile
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import (Response, abort, before_render_template, current_app, g, request,
+                   template_rendered)
+
+# Valores por defecto (configurables en app.config)
+INSTRUMENTACION_DEFAULT = os.environ.get('SISTEMAPERITO_INSTRUMENTACION', '0') == '1'
+PERFIL_MUESTREO_DEFAULT = float(os.environ.get('SISTEMAPERITO_PERFIL', '0'))
+PERFIL_DIR_DEFAULT = os.environ.get('SISTEMAPERITO_PERFIL_DIR', 'perfiles')
+
+# Límites de los histogramas (segundos y consultas por petición)
+LIMITES_DURACION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 500)
+
+# Repeticiones de una misma consulta en una petición que se registran como
+# posible N+1
+UMBRAL_REPETICIONES = 20
+
+_local = threading.local()
+
+# Solo se perfila una petición a la vez
+_perfil_lock = threading.Lock()
+
+
+class MedicionPeticion:
+    """
+    Tiempos acumulados durante una petición.
+    """
+
+    __slots__ = ('inicio', 'consultas', 'segundos_sql', 'por_sql', 'fases',
+                 'inicio_render', 'perfil')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.segundos_sql = 0.0
+        self.por_sql = Counter()
+        self.fases = {}
+        self.inicio_render = None
+        self.perfil = None
+
+    def sql(self, sql, segundos):
+        self.segundos_sql += segundos
+        if sql is not None:
+            self.consultas += 1
+            self.por_sql[sql] += 1
+
+    def fase(self, nombre, segundos):
+        self.fases[nombre] = self.fases.get(nombre, 0.0) + segundos
+
+
+def medicion_actual():
+    return getattr(_local, 'medicion', None)
+
+
+class CursorMedido(sqlite3.Cursor):
+    """
+    Cursor que suma a la petición en curso el tiempo de execute y fetch*.
+    La iteración directa (``for fila in cursor``) no se mide.
+    """
+
+    def execute(self, sql, parametros=()):
+        medicion = medicion_actual()
+        if medicion is None:
+            return super().execute(sql, parametros)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            medicion.sql(sql, time.perf_counter() - inicio)
+
+    def executemany(self, sql, parametros):
+        medicion = medicion_actual()
+        if medicion is None:
+            return super().executemany(sql, parametros)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            medicion.sql(sql, time.perf_counter() - inicio)
+
+    def _leer(self, metodo, *args):
+        medicion = medicion_actual()
+        if medicion is None:
+            return metodo(*args)
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args)
+        finally:
+            medicion.sql(None, time.perf_counter() - inicio)
+
+    def fetchone(self):
+        return self._leer(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._leer(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._leer(super().fetchall)
+
+
+class ConexionMedida(sqlite3.Connection):
+    """
+    Conexión cuyos cursores miden las consultas (ver CursorMedido).
+    """
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+    def commit(self):
+        medicion = medicion_actual()
+        if medicion is None:
+            return super().commit()
+        inicio = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            medicion.sql(None, time.perf_counter() - inicio)
+
+
+@contextmanager
+def fase(nombre):
+    """
+    Mide un bloque como fase con nombre (p. ej. generación del Excel). Sin
+    instrumentación no hace nada.
+    """
+    medicion = medicion_actual()
+    if medicion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.fase(nombre, time.perf_counter() - inicio)
+
+
+class Histograma:
+    """
+    Histograma acumulativo al estilo de Prometheus.
+    """
+
+    __slots__ = ('limites', 'cuentas', 'suma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.cuentas = [0] * len(limites)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.cuentas[i] += 1
+        self.suma += valor
+        self.total += 1
+
+
+def _etiquetas(**valores):
+    partes = []
+    for clave, valor in valores.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+        partes.append(f'{clave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+class Metricas:
+    """
+    Métricas acumuladas por (método, ruta) desde que inició el proceso.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._duracion = {}
+        self._consultas = {}
+        self._segundos_sql = Counter()
+        self._peticiones = Counter()
+
+    def registrar(self, metodo, ruta, codigo, segundos, medicion):
+        clave = (metodo, ruta)
+        with self._lock:
+            if clave not in self._duracion:
+                self._duracion[clave] = Histograma(LIMITES_DURACION)
+                self._consultas[clave] = Histograma(LIMITES_CONSULTAS)
+            self._duracion[clave].observar(segundos)
+            self._consultas[clave].observar(medicion.consultas)
+            self._segundos_sql[clave] += medicion.segundos_sql
+            self._peticiones[(metodo, ruta, codigo)] += 1
+
+    def _histograma(self, lineas, nombre, ayuda, histogramas):
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} histogram')
+        for (metodo, ruta), histograma in sorted(histogramas.items()):
+            for limite, cuenta in zip(histograma.limites, histograma.cuentas):
+                lineas.append(f'{nombre}_bucket{_etiquetas(metodo=metodo, ruta=ruta, le=limite)} {cuenta}')
+            lineas.append(f'{nombre}_bucket{_etiquetas(metodo=metodo, ruta=ruta, le="+Inf")} {histograma.total}')
+            lineas.append(f'{nombre}_sum{_etiquetas(metodo=metodo, ruta=ruta)} {histograma.suma:.6f}')
+            lineas.append(f'{nombre}_count{_etiquetas(metodo=metodo, ruta=ruta)} {histograma.total}')
+
+    def prometheus(self):
+        """
+        Métricas en formato de texto de Prometheus (versión 0.0.4).
+        """
+        lineas = []
+        with self._lock:
+            self._histograma(lineas, 'sistemaperito_peticion_segundos',
+                             'Duración de las peticiones HTTP', self._duracion)
+            self._histograma(lineas, 'sistemaperito_sql_consultas_por_peticion',
+                             'Consultas SQL ejecutadas por petición', self._consultas)
+
+            lineas.append('# HELP sistemaperito_sql_segundos_total Tiempo en SQLite (execute, fetch y commit)')
+            lineas.append('# TYPE sistemaperito_sql_segundos_total counter')
+            for (metodo, ruta), segundos in sorted(self._segundos_sql.items()):
+                lineas.append(f'sistemaperito_sql_segundos_total{_etiquetas(metodo=metodo, ruta=ruta)} {segundos:.6f}')
+
+            lineas.append('# HELP sistemaperito_peticiones_total Peticiones HTTP por código de estado')
+            lineas.append('# TYPE sistemaperito_peticiones_total counter')
+            for (metodo, ruta, codigo), total in sorted(self._peticiones.items()):
+                lineas.append(
+                    f'sistemaperito_peticiones_total{_etiquetas(metodo=metodo, ruta=ruta, codigo=codigo)} {total}'
+                )
+        return '\n'.join(lineas) + '\n'
+
+
+def ruta_actual():
+    """
+    Patrón de la ruta (p. ej. /api/asignacion/<int:id>) para no crear una
+    serie por cada id.
+    """
+    return request.url_rule.rule if request.url_rule else 'sin_ruta'
+
+
+def _iniciar_medicion():
+    config = current_app.config
+    if not config['INSTRUMENTACION'] and not config['PERFIL_MUESTREO']:
+        return
+    medicion = MedicionPeticion()
+    _local.medicion = medicion
+    g.medicion = medicion
+
+    if config['PERFIL_MUESTREO'] and random.random() < config['PERFIL_MUESTREO'] \
+            and _perfil_lock.acquire(blocking=False):
+        medicion.perfil = cProfile.Profile()
+        medicion.perfil.enable()
+
+
+def _al_renderizar(app, template, context, **extra):
+    medicion = medicion_actual()
+    if medicion is not None:
+        medicion.inicio_render = time.perf_counter()
+
+
+def _renderizado(app, template, context, **extra):
+    medicion = medicion_actual()
+    if medicion is not None and medicion.inicio_render is not None:
+        medicion.fase('render', time.perf_counter() - medicion.inicio_render)
+        medicion.inicio_render = None
+
+
+def server_timing(medicion, total):
+    """
+    Valor de la cabecera Server-Timing (duraciones en milisegundos).
+    """
+    partes = [f'sql;dur={medicion.segundos_sql * 1000:.2f};desc="{medicion.consultas} consultas"']
+    partes.extend(f'{nombre};dur={segundos * 1000:.2f}' for nombre, segundos in medicion.fases.items())
+    python = total - medicion.segundos_sql - sum(medicion.fases.values())
+    partes.append(f'python;dur={max(python, 0) * 1000:.2f}')
+    partes.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(partes)
+
+
+def _registrar_medicion(respuesta):
+    medicion = g.get('medicion')
+    if medicion is None or not current_app.config['INSTRUMENTACION']:
+        return respuesta
+
+    total = time.perf_counter() - medicion.inicio
+    respuesta.headers['Server-Timing'] = server_timing(medicion, total)
+    ruta = ruta_actual()
+    get_metricas().registrar(request.method, ruta, respuesta.status_code, total, medicion)
+
+    if medicion.por_sql:
+        sql, repeticiones = medicion.por_sql.most_common(1)[0]
+        if repeticiones >= UMBRAL_REPETICIONES:
+            current_app.logger.warning(
+                '%s %s: la misma consulta se ejecutó %d veces (posible N+1): %s',
+                request.method, ruta, repeticiones, ' '.join(sql.split())[:200]
+            )
+    return respuesta
+
+
+def _terminar_medicion(exception=None):
+    medicion = g.pop('medicion', None)
+    _local.medicion = None
+    if medicion is None or medicion.perfil is None:
+        return
+    try:
+        medicion.perfil.disable()
+        directorio = current_app.config['PERFIL_DIR']
+        os.makedirs(directorio, exist_ok=True)
+        ruta = re.sub(r'[^\w]+', '_', ruta_actual()).strip('_') or 'raiz'
+        nombre = f'{datetime.now():%Y%m%d_%H%M%S_%f}_{request.method}_{ruta}.prof'
+        medicion.perfil.dump_stats(os.path.join(directorio, nombre))
+    finally:
+        _perfil_lock.release()
+
+
+def get_metricas():
+    """
+    Devuelve las métricas de la aplicación activa.
+    """
+    return current_app.extensions['sistemaperito_metricas']
+
+
+def ver_metricas():
+    """
+    /debug/metrics: métricas por ruta (404 sin instrumentación).
+    """
+    if not current_app.config['INSTRUMENTACION']:
+        abort(404)
+    return Response(get_metricas().prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    """
+    Registra la instrumentación. Con INSTRUMENTACION activa al iniciar, el
+    pool abre conexiones que miden las consultas.
+    """
+    app.config.setdefault('INSTRUMENTACION', INSTRUMENTACION_DEFAULT)
+    app.config.setdefault('PERFIL_MUESTREO', PERFIL_MUESTREO_DEFAULT)
+    app.config.setdefault('PERFIL_DIR', PERFIL_DIR_DEFAULT)
+    if app.config['INSTRUMENTACION']:
+        app.config.setdefault('DATABASE_CONEXION', ConexionMedida)
+
+    app.extensions['sistemaperito_metricas'] = Metricas()
+    app.before_request(_iniciar_medicion)
+    app.after_request(_registrar_medicion)
+    app.teardown_request(_terminar_medicion)
+    before_render_template.connect(_al_renderizar, app)
+    template_rendered.connect(_renderizado, app)
+    app.add_url_rule('/debug/metrics', 'metricas', ver_metricas)
@@ -0,0 +1,361 @@
+"""
+SistemaPerito - Cambios por lotes sobre asignaciones
+Descripción: Aplica muchas modificaciones y cancelaciones en una sola
+transacción. Las asignaciones afectadas se leen con una consulta, la
+disponibilidad de las que cambian de perito o de fechas se comprueba con una
+única consulta contra todas las candidatas a la vez, y las actualizaciones y
+el historial se escriben con executemany.
+"""
+
+import sqlite3
+
+from conexion import transaccion
+from consultas import CAMPOS_EDITABLES, ESTADOS_ASIGNACION
+from fechas import MENSAJE_FECHA_INVALIDA, dia
+from ocupacion import detectar_choques, duracion_maxima
+
+# Operaciones máximas por lote
+MAX_OPERACIONES_LOTE = 1000
+
+ACCIONES = ('actualizar', 'cancelar')
+
+# Campos cuyo cambio obliga a comprobar la disponibilidad del perito
+CAMPOS_DISPONIBILIDAD = ('perito_id', 'fecha_inicio', 'fecha_fin')
+
+# Tipos JSON que se pueden escribir en una columna (además de null)
+TIPOS_VALOR = (str, int, float, type(None))
+
+CAMPOS_FECHA = ('fecha_inicio', 'fecha_fin')
+
+
+def leer_operaciones(lista):
+    """
+    Valida la forma de cada operación del lote.
+
+    Cada operación es ``{"id": 12, "accion": "cancelar"}`` o
+    ``{"id": 12, "accion": "actualizar", "campos": {"estado": "Completado"}}``.
+
+    Returns:
+        list: Un dict por operación con indice, id, accion, campos y error
+        (None si la operación es válida)
+    """
+    operaciones = []
+    vistos = set()
+    for indice, datos in enumerate(lista):
+        datos = datos if isinstance(datos, dict) else {}
+        operacion = {
+            'indice': indice,
+            'id': datos.get('id'),
+            'accion': datos.get('accion', 'actualizar'),
+            'campos': {},
+            'error': None,
+        }
+        operaciones.append(operacion)
+
+        if not isinstance(operacion['id'], int) or isinstance(operacion['id'], bool):
+            operacion['error'] = 'Falta el id de la asignación'
+        elif operacion['id'] in vistos:
+            operacion['error'] = 'La asignación aparece más de una vez en el lote'
+        elif operacion['accion'] not in ACCIONES:
+            operacion['error'] = f'Acción no válida (use {" o ".join(ACCIONES)})'
+        elif operacion['accion'] == 'cancelar':
+            operacion['campos'] = {'estado': 'Cancelado'}
+        else:
+            campos = datos.get('campos')
+            if not isinstance(campos, dict) or not campos:
+                operacion['error'] = 'No hay campos para actualizar'
+            elif any(campo not in CAMPOS_EDITABLES for campo in campos):
+                desconocidos = [c for c in campos if c not in CAMPOS_EDITABLES]
+                operacion['error'] = f'Campos no permitidos: {", ".join(desconocidos)}'
+            elif any(not isinstance(valor, TIPOS_VALOR) for valor in campos.values()):
+                # Objetos o listas no se pueden guardar en una columna
+                invalidos = [c for c, v in campos.items() if not isinstance(v, TIPOS_VALOR)]
+                operacion['error'] = f'Valores no válidos en: {", ".join(invalidos)}'
+            elif 'estado' in campos and campos['estado'] not in ESTADOS_ASIGNACION:
+                operacion['error'] = f'Estado "{campos["estado"]}" no válido'
+            else:
+                operacion['campos'] = dict(campos)
+                if 'perito_id' in campos:
+                    try:
+                        operacion['campos']['perito_id'] = int(campos['perito_id'])
+                    except (TypeError, ValueError):
+                        operacion['error'] = 'perito_id debe ser un número'
+
+        if isinstance(operacion['id'], int):
+            vistos.add(operacion['id'])
+    return operaciones
+
+
+def _dia(texto):
+    try:
+        return dia(texto)
+    except ValueError:
+        return None
+
+
+def consulta_conflictos(cantidad):
+    """
+    Consulta de solapamientos para ``cantidad`` candidatas. Parámetros:
+    (indice, perito_id, dia_inicio, dia_fin) por candidata y la duración
+    máxima en días, que acota dia_inicio también por abajo (ver
+    ocupacion.consulta_solapadas).
+    """
+    valores = ', '.join('(?, ?, ?, ?)' for _ in range(cantidad))
+    return f'''
+        WITH candidatas (indice, perito_id, dia_inicio, dia_fin) AS (VALUES {valores})
+        SELECT candidatas.indice, a.id, a.expediente, a.fecha_inicio, a.fecha_fin,
+               a.observaciones
+        FROM candidatas
+        JOIN asignaciones a
+          ON a.perito_id = candidatas.perito_id
+         AND a.dia_inicio <= candidatas.dia_fin
+         AND a.dia_inicio >= candidatas.dia_inicio - ?
+         AND a.dia_fin >= candidatas.dia_inicio
+        WHERE a.estado != 'Cancelado'
+        ORDER BY candidatas.indice, a.dia_inicio
+    '''
+
+
+def buscar_conflictos(conn, candidatas, excluir):
+    """
+    Asignaciones existentes que se solapan con cada candidata, en una sola
+    consulta: las candidatas se pasan como una tabla VALUES y se cruzan con
+    idx_asignaciones_perito_dias.
+
+    Args:
+        conn: Conexión SQLite
+        candidatas: Lista de (indice, perito_id, dia_inicio, dia_fin)
+        excluir: Ids de asignaciones que no cuentan (las del propio lote)
+
+    Returns:
+        dict: indice -> [conflictos]
+    """
+    conflictos = {}
+    if not candidatas:
+        return conflictos
+
+    params = [valor for candidata in candidatas for valor in candidata]
+    cursor = conn.execute(
+        consulta_conflictos(len(candidatas)),
+        [*params, duracion_maxima(conn)]
+    )
+
+    for indice, id, expediente, fecha_inicio, fecha_fin, observaciones in cursor:
+        if id in excluir:
+            continue
+        conflictos.setdefault(indice, []).append({
+            'id': id,
+            'expediente': expediente,
+            'fecha_inicio': fecha_inicio,
+            'fecha_fin': fecha_fin,
+            'observaciones': observaciones,
+        })
+    return conflictos
+
+
+def _actualizar(conn, operaciones):
+    """
+    Escribe los campos de ``operaciones`` con un executemany por cada
+    combinación de campos modificados.
+    """
+    grupos = {}
+    for op in operaciones:
+        campos = tuple(sorted(op['campos']))
+        grupos.setdefault(campos, []).append(
+            [*(op['campos'][campo] for campo in campos), op['id']]
+        )
+    for campos, filas in grupos.items():
+        conn.executemany(
+            f"UPDATE asignaciones SET {', '.join(f'{c} = ?' for c in campos)} WHERE id = ?",
+            filas
+        )
+
+
+def _escribir(conn, operaciones):
+    """
+    Aplica las actualizaciones dentro de un SAVEPOINT. Si una restricción de
+    la base (los triggers de fechas, NOT NULL...) rechaza alguna fila, se
+    repiten una a una para marcar con error las que fallan y se deshace
+    todo lo escrito.
+
+    Returns:
+        list: Operaciones rechazadas por la base (vacía si se escribieron todas)
+    """
+    conn.execute('SAVEPOINT lote')
+    try:
+        _actualizar(conn, operaciones)
+    except sqlite3.IntegrityError:
+        conn.execute('ROLLBACK TO lote')
+        fallidas = []
+        for op in operaciones:
+            try:
+                _actualizar(conn, [op])
+            except sqlite3.IntegrityError as exc:
+                op['error'] = str(exc)
+                fallidas.append(op)
+        conn.execute('ROLLBACK TO lote')
+        conn.execute('RELEASE lote')
+        return fallidas
+    conn.execute('RELEASE lote')
+    return []
+
+
+def _choques_en_lote(operaciones):
+    """
+    Marca las operaciones cuyo estado final se solapa con el de otra
+    asignación del mismo lote.
+
+    Son fijas las asignaciones del lote que no cambian de perito ni de
+    fechas y, para las operaciones rechazadas, su estado actual (no se
+    aplicarán). Si el barrido rechaza alguna, se repite con ella como fija.
+    """
+    while True:
+        fijos = {}
+        nuevos = {}
+        for op in operaciones:
+            if 'final' not in op:
+                continue
+            if op['error']:
+                estado = op['actual']
+            elif 'revisar' in op:
+                inicio, fin = op['revisar']
+                nuevos.setdefault(op['final']['perito_id'], []).append(
+                    (inicio, fin, op['indice'], f'la asignación #{op["id"]}')
+                )
+                continue
+            else:
+                estado = op['final']
+            if estado['estado'] == 'Cancelado':
+                continue
+            inicio, fin = _dia(estado['fecha_inicio']), _dia(estado['fecha_fin'])
+            if inicio is not None and fin is not None:
+                fijos.setdefault(estado['perito_id'], []).append(
+                    (inicio, fin, f'la asignación #{op["id"]}')
+                )
+
+        rechazadas = 0
+        for perito_id, lista_nuevos in nuevos.items():
+            lista_nuevos.sort()
+            for indice, otro in detectar_choques(fijos.get(perito_id, []), lista_nuevos):
+                operaciones[indice]['error'] = f'Se solapa con {otro} del lote'
+                rechazadas += 1
+        if not rechazadas:
+            return
+
+
+def aplicar_lote(conn, lista, omitir_errores=False):
+    """
+    Aplica un lote de modificaciones y cancelaciones.
+
+    Sin ``omitir_errores`` el lote es todo o nada: si alguna operación
+    falla no se aplica ninguna. Todo ocurre en una transacción BEGIN
+    IMMEDIATE, así que el lote completo se confirma con un solo commit.
+
+    Args:
+        conn: Conexión SQLite
+        lista: Operaciones recibidas (ver leer_operaciones)
+        omitir_errores: Aplicar las operaciones válidas aunque otras fallen
+
+    Returns:
+        dict: {'aplicadas', 'total_errores', 'resultados': [...]} con un
+        resultado por operación, en el orden recibido
+    """
+    operaciones = leer_operaciones(lista)
+    ids = [op['id'] for op in operaciones if not op['error']]
+
+    with transaccion(conn):
+        actuales = {}
+        if ids:
+            cursor = conn.execute(f'''
+                SELECT id, perito_id, fecha_inicio, fecha_fin, estado
+                FROM asignaciones WHERE id IN ({', '.join('?' * len(ids))})
+            ''', ids)
+            actuales = {fila[0]: dict(zip(('id', *CAMPOS_DISPONIBILIDAD, 'estado'), fila))
+                        for fila in cursor}
+
+        # Estado final de cada asignación del lote
+        candidatas = []
+        for op in operaciones:
+            if op['error']:
+                continue
+            actual = actuales.get(op['id'])
+            if actual is None:
+                op['error'] = f'La asignación #{op["id"]} no existe'
+                continue
+
+            final = {**actual, **op['campos']}
+            op['actual'] = actual
+            op['final'] = final
+            # Las fechas que se escriben se validan aunque la asignación
+            # quede cancelada (el trigger de la tabla las rechazaría)
+            if any(campo in op['campos'] for campo in CAMPOS_FECHA) and \
+                    (_dia(final['fecha_inicio']) is None or _dia(final['fecha_fin']) is None):
+                op['error'] = MENSAJE_FECHA_INVALIDA
+                continue
+            if final['estado'] == 'Cancelado':
+                continue
+            # Solo se comprueba lo que cambia: perito, fechas o una reactivación
+            cambia = any(final[c] != actual[c] for c in CAMPOS_DISPONIBILIDAD) \
+                or actual['estado'] == 'Cancelado'
+            if not cambia:
+                continue
+
+            inicio, fin = _dia(final['fecha_inicio']), _dia(final['fecha_fin'])
+            if inicio is None or fin is None:
+                op['error'] = MENSAJE_FECHA_INVALIDA
+            elif fin < inicio:
+                op['error'] = 'La fecha de fin no puede ser anterior a la fecha de inicio'
+            else:
+                op['revisar'] = (inicio, fin)
+                candidatas.append((op['indice'], final['perito_id'], inicio, fin))
+
+        # Choques con asignaciones fuera del lote (una consulta)
+        for indice, conflictos in buscar_conflictos(conn, candidatas, set(ids)).items():
+            operaciones[indice]['error'] = 'El perito no está disponible en estas fechas'
+            operaciones[indice]['conflictos'] = conflictos
+
+        # Choques entre asignaciones del propio lote
+        _choques_en_lote(operaciones)
+
+        aplicar = []
+        while omitir_errores or not any(op['error'] for op in operaciones):
+            validas = [op for op in operaciones if not op['error']]
+            if not _escribir(conn, validas):
+                aplicar = validas
+                break
+            # Las rechazadas por la base siguen donde estaban: se repite el
+            # barrido con ellas fijas antes de escribir las demás
+            _choques_en_lote(operaciones)
+
+        errores = [op for op in operaciones if op['error']]
+
+        conn.executemany(
+            'INSERT INTO historial (asignacion_id, accion, detalles) VALUES (?, ?, ?)',
+            [
+                (op['id'], 'Cancelado', 'Asignación cancelada (lote)')
+                if op['accion'] == 'cancelar' else
+                (op['id'], 'Modificado', f'Campos actualizados (lote): {", ".join(op["campos"])}')
+                for op in aplicar
+            ]
+        )
+
+    aplicadas = {op['indice'] for op in aplicar}
+    resultados = []
+    for op in operaciones:
+        resultado = {
+            'indice': op['indice'],
+            'id': op['id'],
+            'accion': op['accion'],
+            'aplicada': op['indice'] in aplicadas,
+        }
+        if op['error']:
+            resultado['error'] = op['error']
+        if op.get('conflictos'):
+            resultado['conflictos'] = op['conflictos']
+        resultados.append(resultado)
+
+    return {
+        'aplicadas': len(aplicadas),
+        'total_errores': len(errores),
+        'resultados': resultados,
+    }
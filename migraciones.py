@@ -0,0 +1,195 @@
+"""
+SistemaPerito - Migraciones de esquema
+Descripción: Cambios de esquema versionados con ``PRAGMA user_version``.
+Cada migración se aplica una sola vez, en orden, dentro de una transacción.
+"""
+
+import re
+
+import busqueda
+import cambios
+import estadisticas
+import fechas
+
+def _triggers_version(asignacion, eliminar=False):
+    """
+    Triggers que actualizan version_datos en cada escritura sobre
+    asignaciones o peritos (``asignacion`` es la cláusula SET).
+    """
+    sentencias = []
+    for tabla in ('asignaciones', 'peritos'):
+        for evento in ('INSERT', 'UPDATE', 'DELETE'):
+            nombre = f'version_{tabla}_{evento.lower()}'
+            if eliminar:
+                sentencias.append(f'DROP TRIGGER IF EXISTS {nombre}')
+            sentencias.append(f'''CREATE TRIGGER IF NOT EXISTS {nombre}
+                AFTER {evento} ON {tabla} BEGIN
+                    UPDATE version_datos SET {asignacion} WHERE id = 1;
+                END''')
+    return sentencias
+
+
+# Lista ordenada de migraciones: (versión, descripción, sentencias).
+# Una sentencia puede ser SQL o una función que recibe la conexión.
+MIGRACIONES = [
+    (1, 'Índices para disponibilidad, listados y dashboard', [
+        # Búsqueda de solapamientos: perito_id = ? AND fecha_inicio <= ?
+        # y el resto del predicado se resuelve dentro del propio índice
+        '''CREATE INDEX IF NOT EXISTS idx_asignaciones_perito_fechas
+           ON asignaciones (perito_id, fecha_inicio, fecha_fin, estado)''',
+        '''CREATE INDEX IF NOT EXISTS idx_asignaciones_estado_fecha
+           ON asignaciones (estado, fecha_inicio)''',
+        '''CREATE INDEX IF NOT EXISTS idx_asignaciones_fecha_inicio
+           ON asignaciones (fecha_inicio)''',
+        '''CREATE INDEX IF NOT EXISTS idx_asignaciones_fecha_registro
+           ON asignaciones (fecha_registro)''',
+        '''CREATE INDEX IF NOT EXISTS idx_historial_asignacion
+           ON historial (asignacion_id)''',
+    ]),
+    (2, 'Índice de texto completo (FTS5) para la búsqueda', [
+        busqueda.crear_indice,
+    ]),
+    (3, 'Contador global de versión de datos', [
+        '''CREATE TABLE IF NOT EXISTS version_datos (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               version INTEGER NOT NULL
+           )''',
+        'INSERT OR IGNORE INTO version_datos (id, version) VALUES (1, 0)',
+        *_triggers_version('version = version + 1'),
+    ]),
+    (4, 'Contadores precalculados para el dashboard', [
+        estadisticas.crear_resumen,
+    ]),
+    (5, 'Índice de duración para consultas de solapamiento', [
+        # MAX(duración) en una búsqueda: con ella se acota fecha_inicio por
+        # abajo al buscar asignaciones que se solapan con una ventana
+        '''CREATE INDEX IF NOT EXISTS idx_asignaciones_duracion
+           ON asignaciones ((julianday(fecha_fin) - julianday(fecha_inicio)))''',
+    ]),
+    (6, 'Fecha de la última escritura en version_datos', [
+        # Last-Modified de las respuestas de la API
+        'ALTER TABLE version_datos ADD COLUMN modificado TEXT',
+        'UPDATE version_datos SET modificado = CURRENT_TIMESTAMP',
+        *_triggers_version(
+            'version = version + 1, modificado = CURRENT_TIMESTAMP', eliminar=True
+        ),
+    ]),
+    (7, 'Copia de la asignación en cada fila de historial (registro de cambios)', [
+        cambios.crear_registro,
+    ]),
+    (8, 'Fechas como números de día: columnas generadas, índices y validación', [
+        fechas.crear_columnas,
+    ]),
+]
+
+
+def version_actual(conn):
+    """
+    Devuelve la versión de esquema registrada en la base de datos.
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def aplicar_migraciones(conn):
+    """
+    Aplica las migraciones pendientes.
+
+    Args:
+        conn: Conexión SQLite
+
+    Returns:
+        list: Versiones aplicadas en esta llamada
+    """
+    aplicadas = []
+    actual = version_actual(conn)
+
+    for version, descripcion, sentencias in MIGRACIONES:
+        if version <= actual:
+            continue
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for sentencia in sentencias:
+                if callable(sentencia):
+                    sentencia(conn)
+                else:
+                    conn.execute(sentencia)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        aplicadas.append(version)
+
+    if aplicadas:
+        # Estadísticas para que el planificador elija bien los índices
+        conn.execute('ANALYZE')
+        conn.commit()
+
+    return aplicadas
+
+
+# ============================================================================
+# VERIFICACIÓN DE PLANES DE CONSULTA
+# ============================================================================
+
+# "SCAN tabla" sin "USING ... INDEX" indica un recorrido completo de la tabla
+# (los "SCAN n CONSTANT ROWS" de una cláusula VALUES no cuentan). El \b
+# impide que \w+ retroceda una letra y acepte "SCAN asignacione(s USING ...)"
+_PATRON_SCAN = re.compile(r'^SCAN (?!\d+ CONSTANT ROWS)(\w+)\b(?! USING)')
+
+
+def tabla_recorrida(detalle):
+    """
+    Tabla (o alias) que recorre completa un paso de EXPLAIN QUERY PLAN.
+
+    Args:
+        detalle: Texto del paso, p. ej. "SCAN asignaciones"
+
+    Returns:
+        str: Nombre de la tabla, o None si el paso usa un índice o no es
+        un recorrido
+    """
+    coincidencia = _PATRON_SCAN.match(detalle)
+    return coincidencia.group(1) if coincidencia else None
+
+
+def recorridos_completos(conn, sql, params=()):
+    """
+    Ejecuta EXPLAIN QUERY PLAN y devuelve los pasos que recorren una
+    tabla completa sin usar índice.
+
+    Args:
+        conn: Conexión SQLite
+        sql: Consulta a analizar
+        params: Parámetros de la consulta
+
+    Returns:
+        list: Detalles del plan que son recorridos completos
+    """
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    return [fila[3] for fila in plan if tabla_recorrida(fila[3])]
+
+
+def verificar_planes(conn, consultas, tablas_pequenas=('peritos', 'candidatas')):
+    """
+    Revisa una colección de consultas críticas y reporta las que caen en
+    un recorrido completo de alguna tabla grande.
+
+    Args:
+        conn: Conexión SQLite
+        consultas: Iterable de (nombre, sql, params)
+        tablas_pequenas: Tablas (o alias) cuyo recorrido completo es aceptable
+
+    Returns:
+        dict: nombre de consulta -> lista de pasos problemáticos
+    """
+    problemas = {}
+    for nombre, sql, params in consultas:
+        pasos = [
+            paso for paso in recorridos_completos(conn, sql, params)
+            if tabla_recorrida(paso) not in tablas_pequenas
+        ]
+        if pasos:
+            problemas[nombre] = pasos
+    return problemas
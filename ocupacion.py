@@ -0,0 +1,306 @@
+"""
+SistemaPerito - Ocupación de peritos por fechas
+Descripción: Consultas de asignaciones que se solapan con una ventana de
+fechas y su reparto por día, calculado en el servidor con un solo recorrido
+de las asignaciones.
+"""
+
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from fechas import SQL_DURACION
+
+# Días máximos de una ventana de calendario
+MAX_DIAS_VENTANA = 400
+
+# Campos de cada asignación devuelta por el calendario
+CAMPOS_CALENDARIO = [
+    'id', 'hoja_envio', 'expediente', 'tipo_perito', 'observaciones', 'lugar',
+    'fecha_inicio', 'fecha_fin', 'perito_id', 'estado', 'perito_nombre'
+]
+
+
+def duracion_maxima(conn):
+    """
+    Duración en días de la asignación más larga (búsqueda en el índice
+    idx_asignaciones_duracion_dias).
+    """
+    maxima = conn.execute(f'SELECT MAX({SQL_DURACION}) FROM asignaciones').fetchone()[0]
+    return maxima if maxima and maxima > 0 else 0
+
+
+def parametros_ventana(conn, desde, hasta):
+    """
+    Parámetros iniciales de consulta_solapadas para la ventana [desde, hasta]
+    (números de día, ver fechas.py).
+    """
+    inicio, fin = desde.toordinal(), hasta.toordinal()
+    return [fin, inicio, inicio - duracion_maxima(conn)]
+
+
+def consulta_solapadas(campos_sql, perito_id=None, estado=None, incluir_canceladas=True,
+                       peritos=None):
+    """
+    Consulta de asignaciones cuyo período se solapa con [desde, hasta]:
+    ``dia_inicio <= hasta AND dia_fin >= desde``. Como ninguna
+    asignación dura más que la más larga, ``dia_inicio`` queda acotado
+    también por abajo y la consulta recorre solo un tramo del índice.
+    Los primeros parámetros son los de parametros_ventana().
+
+    Args:
+        campos_sql: Expresiones SQL a seleccionar (a = asignaciones, p = peritos)
+        perito_id: Limitar a un perito
+        estado: Limitar a un estado
+        incluir_canceladas: Si es False se excluyen las canceladas
+        peritos: Limitar a una lista de ids de perito
+
+    Returns:
+        tuple: (query: str, params extra: list)
+    """
+    condiciones = ''
+    params = []
+    if perito_id:
+        condiciones += ' AND a.perito_id = ?'
+        params.append(perito_id)
+    if estado:
+        condiciones += ' AND a.estado = ?'
+        params.append(estado)
+    if not incluir_canceladas:
+        condiciones += " AND a.estado != 'Cancelado'"
+    if peritos is not None:
+        condiciones += f" AND a.perito_id IN ({', '.join('?' * len(peritos))})"
+        params.extend(peritos)
+
+    query = f'''
+        SELECT {', '.join(campos_sql)}
+        FROM asignaciones a
+        LEFT JOIN peritos p ON a.perito_id = p.id
+        WHERE a.dia_inicio <= ? AND a.dia_fin >= ?
+          AND a.dia_inicio >= ?{condiciones}
+        ORDER BY a.dia_inicio, a.id
+    '''
+    return query, params
+
+
+def calendario(conn, desde, hasta, perito_id=None, estado=None):
+    """
+    Asignaciones que se solapan con la ventana y su reparto por día.
+
+    Cada asignación se recorre una sola vez y se anota en los días de la
+    ventana que cubre, por lo que el costo es proporcional a los días
+    ocupados y no a (días x asignaciones).
+
+    Args:
+        conn: Conexión SQLite
+        desde: date, primer día de la ventana
+        hasta: date, último día de la ventana (incluido)
+        perito_id: Limitar a un perito
+        estado: Limitar a un estado
+
+    Returns:
+        dict: {
+            'desde', 'hasta': str,
+            'asignaciones': [dict],
+            'dias': {fecha: [id, ...]},
+            'ocupacion': {fecha: {perito_id (texto): n}},
+            'por_estado': {estado: n}
+        }
+    """
+    columnas = [
+        'p.nombre_completo' if campo == 'perito_nombre' else f'a.{campo}'
+        for campo in CAMPOS_CALENDARIO
+    ] + ['a.dia_inicio', 'a.dia_fin']
+    query, extra = consulta_solapadas(columnas, perito_id, estado)
+    cursor = conn.execute(query, [*parametros_ventana(conn, desde, hasta), *extra])
+
+    inicio_ventana = desde.toordinal()
+    fin_ventana = hasta.toordinal()
+    # Índice del día dentro de la ventana -> ids / ocupación por perito
+    ids_por_dia = [[] for _ in range(fin_ventana - inicio_ventana + 1)]
+    ocupacion_por_dia = [{} for _ in range(fin_ventana - inicio_ventana + 1)]
+
+    asignaciones = []
+    por_estado = {}
+    for fila in cursor:
+        asignacion = dict(zip(CAMPOS_CALENDARIO, fila))
+        inicio, fin = fila[-2:]
+        asignaciones.append(asignacion)
+        por_estado[asignacion['estado']] = por_estado.get(asignacion['estado'], 0) + 1
+
+        perito = '' if asignacion['perito_id'] is None else str(asignacion['perito_id'])
+        for dia in range(max(inicio, inicio_ventana) - inicio_ventana,
+                         min(fin, fin_ventana) - inicio_ventana + 1):
+            ids_por_dia[dia].append(asignacion['id'])
+            conteo = ocupacion_por_dia[dia]
+            conteo[perito] = conteo.get(perito, 0) + 1
+
+    dias = {}
+    ocupacion = {}
+    for indice, ids in enumerate(ids_por_dia):
+        if ids:
+            fecha = date.fromordinal(inicio_ventana + indice).isoformat()
+            dias[fecha] = ids
+            ocupacion[fecha] = ocupacion_por_dia[indice]
+
+    return {
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'asignaciones': asignaciones,
+        'dias': dias,
+        'ocupacion': ocupacion,
+        'por_estado': por_estado,
+    }
+
+
+def fusionar_intervalos(intervalos):
+    """
+    Une los intervalos [inicio, fin] (días ordinales, ordenados por inicio)
+    que se solapan o son contiguos.
+
+    Returns:
+        list: Intervalos disjuntos y ordenados
+    """
+    fusionados = []
+    for inicio, fin in intervalos:
+        if fusionados and inicio <= fusionados[-1][1] + 1:
+            if fin > fusionados[-1][1]:
+                fusionados[-1][1] = fin
+        else:
+            fusionados.append([inicio, fin])
+    return fusionados
+
+
+def detectar_choques(fijos, nuevos):
+    """
+    Decide qué intervalos nuevos pueden aceptarse sin solaparse con los
+    fijos ni con los nuevos ya aceptados (días ordinales, un solo perito).
+
+    Los fijos se ordenan por inicio con el máximo acumulado de sus fines:
+    un intervalo nuevo choca con ellos si el fijo que más se extiende entre
+    los que empiezan antes de su fin llega a su inicio. Los nuevos se
+    recorren en el orden recibido (por inicio); los aceptados no se solapan
+    entre sí, así que basta compararlos con el último aceptado.
+
+    Args:
+        fijos: Lista de (inicio, fin, etiqueta) que no se pueden rechazar
+        nuevos: Lista de (inicio, fin, clave, etiqueta) ordenada por inicio
+
+    Returns:
+        list: (clave, etiqueta del intervalo con el que choca) de cada
+        intervalo nuevo rechazado
+    """
+    fijos = sorted(fijos, key=lambda f: f[0])
+    inicios = [inicio for inicio, _, _ in fijos]
+    maximos = []
+    for inicio, fin, etiqueta in fijos:
+        if not maximos or fin > maximos[-1][0]:
+            maximos.append((fin, etiqueta))
+        else:
+            maximos.append(maximos[-1])
+
+    rechazados = []
+    ultimo = None
+    for inicio, fin, clave, etiqueta in nuevos:
+        posicion = bisect_right(inicios, fin)
+        if posicion and maximos[posicion - 1][0] >= inicio:
+            rechazados.append((clave, maximos[posicion - 1][1]))
+        elif ultimo and ultimo[0] >= inicio:
+            rechazados.append((clave, ultimo[1]))
+        else:
+            ultimo = (fin, etiqueta)
+    return rechazados
+
+
+def _a_fechas(intervalos):
+    return [
+        {'desde': date.fromordinal(inicio).isoformat(), 'hasta': date.fromordinal(fin).isoformat()}
+        for inicio, fin in intervalos
+    ]
+
+
+def matriz_disponibilidad(conn, peritos, desde, hasta, duracion=1):
+    """
+    Disponibilidad de varios peritos en una ventana, con una sola consulta
+    de solapamiento y un barrido por perito sobre sus asignaciones ordenadas.
+
+    Args:
+        conn: Conexión SQLite
+        peritos: Lista de (id, nombre, tipo)
+        desde: date, primer día de la ventana
+        hasta: date, último día de la ventana (incluido)
+        duracion: Días consecutivos libres que se buscan para
+            ``primera_fecha_libre``
+
+    Returns:
+        list: Un dict por perito, en el orden recibido, con ``disponible``
+        (sin conflictos en toda la ventana), ``ocupado`` y ``libre``
+        (intervalos dentro de la ventana), ``primera_fecha_libre`` y
+        ``conflictos``
+    """
+    inicio_ventana = desde.toordinal()
+    fin_ventana = hasta.toordinal()
+
+    ids = [perito[0] for perito in peritos]
+    intervalos = {perito_id: [] for perito_id in ids}
+    conflictos = {perito_id: [] for perito_id in ids}
+
+    if ids:
+        query, extra = consulta_solapadas(
+            ['a.perito_id', 'a.id', 'a.expediente', 'a.fecha_inicio', 'a.fecha_fin',
+             'a.estado', 'a.observaciones', 'a.dia_inicio', 'a.dia_fin'],
+            incluir_canceladas=False, peritos=ids
+        )
+        # Ordenadas por dia_inicio: cada lista por perito queda ordenada
+        for (perito_id, id, expediente, fecha_inicio, fecha_fin, estado, observaciones,
+             inicio, fin) in conn.execute(query, [*parametros_ventana(conn, desde, hasta), *extra]):
+            conflictos[perito_id].append({
+                'id': id,
+                'expediente': expediente,
+                'fecha_inicio': fecha_inicio,
+                'fecha_fin': fecha_fin,
+                'estado': estado,
+                'observaciones': observaciones,
+            })
+            intervalos[perito_id].append((max(inicio, inicio_ventana), min(fin, fin_ventana)))
+
+    matriz = []
+    for perito_id, nombre, tipo in peritos:
+        ocupado = fusionar_intervalos(intervalos[perito_id])
+
+        # Huecos entre los intervalos ocupados dentro de la ventana
+        libre = []
+        cursor = inicio_ventana
+        for inicio, fin in ocupado:
+            if inicio > cursor:
+                libre.append((cursor, inicio - 1))
+            cursor = fin + 1
+        if cursor <= fin_ventana:
+            libre.append((cursor, fin_ventana))
+
+        primera = next(
+            (inicio for inicio, fin in libre if fin - inicio + 1 >= duracion), None
+        )
+        matriz.append({
+            'perito_id': perito_id,
+            'nombre': nombre,
+            'tipo': tipo,
+            'disponible': not conflictos[perito_id],
+            'ocupado': _a_fechas(ocupado),
+            'libre': _a_fechas(libre),
+            'primera_fecha_libre': date.fromordinal(primera).isoformat() if primera else None,
+            'conflictos': conflictos[perito_id],
+        })
+    return matriz
+
+
+def ventana_mes(mes):
+    """
+    Primer y último día de un mes 'YYYY-MM'.
+
+    Raises:
+        ValueError: Si el mes no es válido
+    """
+    anio, numero = (int(parte) for parte in mes.split('-'))
+    desde = date(anio, numero, 1)
+    siguiente = date(anio + numero // 12, numero % 12 + 1, 1)
+    return desde, siguiente - timedelta(days=1)
@@ -0,0 +1,106 @@
+"""
+SistemaPerito - Plantel de peritos
+Descripción: Lista de peritos con sus totales de asignaciones por estado,
+próximas y en curso, calculada con una sola consulta: los contadores se
+agrupan por perito en un único recorrido de asignaciones (en el orden de
+idx_asignaciones_perito_dias) en lugar de una consulta por perito.
+"""
+
+from datetime import date
+
+from consultas import ESTADOS_ASIGNACION
+
+# Tipos de perito en el orden en que se muestran
+TIPOS_PERITO = ('Informático', 'Acústico', 'Antropólogo', 'Contable')
+
+# Contadores que calcula la subconsulta, en el orden de las columnas
+_CONTADORES = ('total', *(f'estado_{i}' for i in range(len(ESTADOS_ASIGNACION))),
+               'proximas', 'activas')
+
+# Los contadores se agrupan primero por perito_id (un recorrido de
+# asignaciones en el orden de idx_asignaciones_perito_dias) y después se
+# unen a peritos; con el LEFT JOIN directo el planificador puede recorrer
+# asignaciones una vez por perito
+SQL_PLANTEL = f'''
+    SELECT peritos.id, peritos.nombre_completo, peritos.tipo, peritos.estado,
+           peritos.fecha_creacion,
+           {', '.join(f'COALESCE(contadores.{contador}, 0)' for contador in _CONTADORES)}
+    FROM peritos
+    LEFT JOIN (
+        SELECT perito_id, COUNT(*) AS total,
+               {', '.join(f"COUNT(CASE WHEN estado = '{estado}' THEN 1 END) AS estado_{i}"
+                          for i, estado in enumerate(ESTADOS_ASIGNACION))},
+               COUNT(CASE WHEN estado != 'Cancelado' AND dia_inicio > :hoy THEN 1 END) AS proximas,
+               COUNT(CASE WHEN estado != 'Cancelado' AND dia_inicio <= :hoy
+                          AND dia_fin >= :hoy THEN 1 END) AS activas
+        FROM asignaciones
+        GROUP BY perito_id
+    ) AS contadores ON contadores.perito_id = peritos.id
+    ORDER BY peritos.tipo, peritos.nombre_completo
+'''
+
+SQL_PERITOS_ACTIVOS = '''
+    SELECT id, nombre_completo, tipo, estado FROM peritos
+    WHERE estado = 'Activo'
+    ORDER BY tipo, nombre_completo
+'''
+
+
+def plantel(conn, hoy=None):
+    """
+    Todos los peritos con sus contadores de asignaciones.
+
+    Args:
+        conn: Conexión SQLite
+        hoy: date de referencia para próximas y en curso (por defecto hoy)
+
+    Returns:
+        list: Un dict por perito con id, nombre, tipo, estado,
+        fecha_creacion, total_asignaciones, por_estado, proximas y activas
+    """
+    hoy = (hoy or date.today()).toordinal()
+    peritos = []
+    for fila in conn.execute(SQL_PLANTEL, {'hoy': hoy}):
+        id, nombre, tipo, estado, fecha_creacion, total = fila[:6]
+        por_estado = dict(zip(ESTADOS_ASIGNACION, fila[6:6 + len(ESTADOS_ASIGNACION)]))
+        proximas, activas = fila[6 + len(ESTADOS_ASIGNACION):]
+        peritos.append({
+            'id': id,
+            'nombre': nombre,
+            'tipo': tipo,
+            'estado': estado,
+            'fecha_creacion': fecha_creacion,
+            'total_asignaciones': total,
+            'por_estado': por_estado,
+            'proximas': proximas,
+            'activas': activas,
+        })
+    return peritos
+
+
+def peritos_activos(conn):
+    """
+    Peritos activos ordenados por tipo y nombre.
+
+    Returns:
+        list: Un dict por perito con id, nombre, tipo y estado
+    """
+    return [
+        {'id': id, 'nombre': nombre, 'tipo': tipo, 'estado': estado}
+        for id, nombre, tipo, estado in conn.execute(SQL_PERITOS_ACTIVOS)
+    ]
+
+
+def por_tipo(peritos):
+    """
+    Agrupa una lista de peritos por tipo (para el formulario de registro).
+
+    Returns:
+        dict: tipo -> [{'id', 'nombre'}], con todos los TIPOS_PERITO
+    """
+    agrupados = {tipo: [] for tipo in TIPOS_PERITO}
+    for perito in peritos:
+        agrupados.setdefault(perito['tipo'], []).append(
+            {'id': perito['id'], 'nombre': perito['nombre']}
+        )
+    return agrupados
@@ -0,0 +1,113 @@
+"""
+SistemaPerito - Respuestas condicionales de la API
+Descripción: ETag y Last-Modified derivados de la versión de datos (ver
+conexion.marca_datos). Una petición con If-None-Match / If-Modified-Since
+vigente se responde con 304 leyendo solo version_datos, y los cuerpos JSON
+ya serializados se guardan en memoria hasta la siguiente escritura.
+"""
+
+import functools
+import hashlib
+from datetime import date, datetime, timezone
+
+from flask import Response, current_app, request
+
+from cache import CacheVersionada
+from conexion import marca_datos
+
+# Cabeceras de la respuesta que se guardan junto con el cuerpo
+CABECERAS_GUARDADAS = ('X-Total-Count', 'X-Next-Cursor', 'Link')
+
+# Respuestas más grandes no se guardan (sí reciben ETag)
+MAX_BYTES_RESPUESTA = 8 * 1024 * 1024
+
+# Cuerpos serializados por (ruta, parámetros); 64 MB en total como máximo
+CACHE_RESPUESTAS = CacheVersionada(max_entradas=512, max_peso=64 * 1024 * 1024)
+
+
+def clave_peticion(por_dia=False):
+    """
+    Ruta y parámetros de la petición en forma canónica (orden estable).
+    """
+    partes = [request.path]
+    partes.extend(f'{clave}={valor}' for clave, valor in sorted(request.args.items(multi=True)))
+    if por_dia:
+        partes.append(date.today().isoformat())
+    return '\n'.join(partes)
+
+
+def calcular_etag(version, clave):
+    return f'v{version}-{hashlib.sha1(clave.encode()).hexdigest()[:16]}'
+
+
+def _ultima_modificacion(modificado):
+    """
+    Fecha de la última escritura como datetime UTC, o None si no sirve como
+    validador: sin fecha, o en el segundo actual (una escritura posterior
+    en el mismo segundo tendría la misma fecha).
+    """
+    if not modificado:
+        return None
+    ultima = datetime.strptime(modificado, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    if ultima >= datetime.now(timezone.utc).replace(microsecond=0):
+        return None
+    return ultima
+
+
+def _validadores(respuesta, etag, ultima):
+    respuesta.set_etag(etag)
+    if ultima:
+        respuesta.last_modified = ultima
+    # El cliente puede guardar la respuesta pero debe revalidarla siempre
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    return respuesta
+
+
+def condicional(por_dia=False):
+    """
+    Decorador para vistas GET que devuelven JSON y solo dependen de los
+    datos y de los parámetros de la petición.
+
+    Args:
+        por_dia: La respuesta depende también de la fecha actual (p. ej.
+            asignaciones próximas); se incluye en la clave y no se envía
+            Last-Modified
+    """
+    def decorador(vista):
+        @functools.wraps(vista)
+        def envoltura(*args, **kwargs):
+            version, modificado = marca_datos()
+            clave = clave_peticion(por_dia)
+            etag = calcular_etag(version, clave)
+            ultima = None if por_dia else _ultima_modificacion(modificado)
+
+            if request.if_none_match:
+                # Comparación débil: la versión comprimida lleva el ETag como W/"..."
+                no_modificado = request.if_none_match.contains_weak(etag)
+            else:
+                no_modificado = bool(
+                    ultima and request.if_modified_since
+                    and ultima <= request.if_modified_since
+                )
+            if no_modificado:
+                return _validadores(Response(status=304), etag, ultima)
+
+            guardada = CACHE_RESPUESTAS.obtener(clave, version)
+            if guardada is None:
+                respuesta = current_app.make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200 or respuesta.is_streamed:
+                    return respuesta
+                cuerpo = respuesta.get_data()
+                guardada = (
+                    cuerpo, respuesta.mimetype,
+                    {c: respuesta.headers[c] for c in CABECERAS_GUARDADAS if c in respuesta.headers}
+                )
+                if len(cuerpo) <= MAX_BYTES_RESPUESTA:
+                    CACHE_RESPUESTAS.guardar(clave, version, guardada, peso=len(cuerpo))
+            else:
+                cuerpo, mimetype, cabeceras = guardada
+                respuesta = Response(cuerpo, mimetype=mimetype, headers=cabeceras)
+
+            return _validadores(respuesta, etag, ultima)
+        return envoltura
+    return decorador
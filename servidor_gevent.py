@@ -0,0 +1,52 @@
+"""
+SistemaPerito - Servidor con greenlets (gevent)
+Descripción: Punto de entrada para producción cuando hay muchos suscriptores
+de /api/eventos. gevent parchea threading, socket y time antes de importar
+la aplicación, de modo que cada petición, y cada flujo SSE abierto, es un
+greenlet: un suscriptor inactivo espera en la condición del canal de
+eventos sin retener un hilo del sistema operativo. Las exportaciones en
+segundo plano siguen en su pool de procesos (ver trabajos.py).
+
+Las consultas a SQLite no ceden el control: mientras una se ejecuta, el
+resto de greenlets del proceso espera. Para aprovechar varios núcleos se
+usan varios workers.
+
+Uso:
+    pip install gevent
+    python servidor_gevent.py [--host 127.0.0.1] [--puerto 5000]
+    flask --app app init-db && \
+    gunicorn -k gevent -w 2 --worker-connections 2000 servidor_gevent:app
+"""
+
+from gevent import monkey
+
+monkey.patch_all()  # Antes de cualquier otro import
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+import app as aplicacion  # noqa: E402
+
+# Con greenlets un suscriptor inactivo ocupa unos pocos KB, así que se
+# admiten muchos más que con un hilo por conexión
+EVENTOS_MAX_SUSCRIPTORES_DEFAULT = int(os.environ.get('SISTEMAPERITO_EVENTOS_MAX', '5000'))
+
+app = aplicacion.app
+app.config['EVENTOS_MAX_SUSCRIPTORES'] = EVENTOS_MAX_SUSCRIPTORES_DEFAULT
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SistemaPerito con gevent')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=5000)
+    args = parser.parse_args()
+
+    aplicacion.init_db()
+    print(f'SistemaPerito (gevent) en http://{args.host}:{args.puerto}')
+    WSGIServer((args.host, args.puerto), app).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,435 @@
+/**
+ * SistemaPerito - Scripts de la página buscar
+ * Archivo: buscar.js
+ */
+
+// Variable global para almacenar los resultados actuales
+let resultadosActuales = [];
+
+/**
+ * Cargar lista de peritos al iniciar la página
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    cargarPeritos();
+    // Cargar todas las asignaciones por defecto
+    aplicarFiltros();
+});
+
+/**
+ * Cargar lista de peritos para el filtro
+ */
+function cargarPeritos() {
+    fetch('/api/peritos')
+        .then(response => response.json())
+        .then(peritos => {
+            const selectPerito = document.getElementById('filtroPerito');
+            peritos.forEach(perito => {
+                const option = document.createElement('option');
+                option.value = perito.id;
+                option.textContent = `${perito.nombre} (${perito.tipo})`;
+                selectPerito.appendChild(option);
+            });
+        })
+        .catch(error => console.error('Error al cargar peritos:', error));
+}
+
+/**
+ * Búsqueda general por término
+ */
+function buscarGeneral() {
+    const termino = document.getElementById('busquedaGeneral').value.trim();
+    const campo = document.getElementById('campoEspecifico').value;
+
+    if (!termino) {
+        alert('Por favor ingrese un término de búsqueda');
+        return;
+    }
+
+    // Mostrar indicador de carga
+    mostrarCargando();
+
+    // Construir URL con parámetros
+    const url = `/api/buscar?q=${encodeURIComponent(termino)}&campo=${campo}`;
+
+    fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            resultadosActuales = data;
+            mostrarResultados(data);
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            ocultarCargando();
+            alert('Error al realizar la búsqueda');
+        });
+}
+
+/**
+ * Aplicar filtros avanzados
+ */
+function aplicarFiltros() {
+    // Mostrar indicador de carga
+    mostrarCargando();
+
+    // Construir URL con filtros
+    const params = new URLSearchParams();
+
+    const estado = document.getElementById('filtroEstado').value;
+    const peritoId = document.getElementById('filtroPerito').value;
+    const fechaDesde = document.getElementById('fechaDesde').value;
+    const fechaHasta = document.getElementById('fechaHasta').value;
+
+    if (estado) params.append('estado', estado);
+    if (peritoId) params.append('perito_id', peritoId);
+    if (fechaDesde) params.append('fecha_desde', fechaDesde);
+    if (fechaHasta) params.append('fecha_hasta', fechaHasta);
+    params.append('todo', '1');
+
+    fetch(`/api/asignaciones?${params.toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            resultadosActuales = data;
+            mostrarResultados(data);
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            ocultarCargando();
+            alert('Error al aplicar filtros');
+        });
+}
+
+/**
+ * Mostrar indicador de carga
+ */
+function mostrarCargando() {
+    document.getElementById('loadingIndicator').classList.remove('hidden');
+    document.getElementById('tablaResultados').classList.add('hidden');
+    document.getElementById('sinResultados').classList.add('hidden');
+    document.getElementById('estadisticasResultados').classList.add('hidden');
+}
+
+/**
+ * Ocultar indicador de carga
+ */
+function ocultarCargando() {
+    document.getElementById('loadingIndicator').classList.add('hidden');
+}
+
+/**
+ * Mostrar resultados en la tabla
+ */
+function mostrarResultados(resultados) {
+    ocultarCargando();
+
+    if (resultados.length === 0) {
+        document.getElementById('sinResultados').classList.remove('hidden');
+        return;
+    }
+
+    // Mostrar estadísticas
+    actualizarEstadisticas(resultados);
+
+    // Mostrar tabla
+    document.getElementById('tablaResultados').classList.remove('hidden');
+
+    // Llenar tabla
+    const tbody = document.getElementById('cuerpoTabla');
+    tbody.innerHTML = '';
+
+    resultados.forEach(asignacion => {
+        const fila = document.createElement('tr');
+        fila.className = 'resultado-item hover:bg-gray-50 transition';
+        fila.innerHTML = `
+            <td class="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900">
+                #${asignacion.id}
+            </td>
+            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-600">
+                ${asignacion.hoja_envio || '-'}
+            </td>
+            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-600">
+                ${asignacion.expediente || '-'}
+            </td>
+            <td class="px-6 py-4 text-sm text-gray-900">
+                <div class="font-medium truncate max-w-xs" title="${asignacion.perito_nombre || asignacion.perito_asignado}">
+                    ${(asignacion.perito_nombre || asignacion.perito_asignado || '-').substring(0, 25)}...
+                </div>
+            </td>
+            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-600">
+                <span class="px-2 py-1 text-xs font-semibold rounded-full ${getTipoColor(asignacion.tipo_perito)}">
+                    ${asignacion.tipo_perito || '-'}
+                </span>
+            </td>
+            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-600">
+                <i class="far fa-calendar text-green-500 mr-1"></i>
+                ${asignacion.fecha_inicio}
+            </td>
+            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-600">
+                <i class="far fa-calendar text-red-500 mr-1"></i>
+                ${asignacion.fecha_fin}
+            </td>
+            <td class="px-6 py-4 whitespace-nowrap">
+                ${getEstadoBadge(asignacion.estado)}
+            </td>
+            <td class="px-6 py-4 text-sm text-gray-600">
+                <div class="max-w-xs truncate" title="${asignacion.lugar || '-'}">
+                    <i class="fas fa-map-marker-alt text-red-500 mr-1"></i>
+                    ${(asignacion.lugar || '-').substring(0, 30)}...
+                </div>
+            </td>
+            <td class="px-6 py-4 whitespace-nowrap text-sm">
+                <button onclick="verDetalle(${asignacion.id})" 
+                        class="text-blue-600 hover:text-blue-800 mr-3" 
+                        title="Ver detalle">
+                    <i class="fas fa-eye"></i>
+                </button>
+                <button onclick="editarAsignacion(${asignacion.id})" 
+                        class="text-green-600 hover:text-green-800" 
+                        title="Editar">
+                    <i class="fas fa-edit"></i>
+                </button>
+            </td>
+        `;
+        tbody.appendChild(fila);
+    });
+}
+
+/**
+ * Actualizar estadísticas de resultados
+ */
+function actualizarEstadisticas(resultados) {
+    document.getElementById('estadisticasResultados').classList.remove('hidden');
+
+    const stats = {
+        total: resultados.length,
+        pendientes: resultados.filter(r => r.estado === 'Pendiente').length,
+        enProceso: resultados.filter(r => r.estado === 'En Proceso').length,
+        completados: resultados.filter(r => r.estado === 'Completado').length
+    };
+
+    document.getElementById('totalResultados').textContent = stats.total;
+    document.getElementById('totalPendientes').textContent = stats.pendientes;
+    document.getElementById('totalEnProceso').textContent = stats.enProceso;
+    document.getElementById('totalCompletados').textContent = stats.completados;
+}
+
+/**
+ * Obtener color según tipo de perito
+ */
+function getTipoColor(tipo) {
+    const colores = {
+        'Informático': 'bg-blue-100 text-blue-800',
+        'Acústico': 'bg-purple-100 text-purple-800',
+        'Antropólogo': 'bg-green-100 text-green-800',
+        'Contable': 'bg-yellow-100 text-yellow-800'
+    };
+    return colores[tipo] || 'bg-gray-100 text-gray-800';
+}
+
+/**
+ * Obtener badge de estado
+ */
+function getEstadoBadge(estado) {
+    const badges = {
+        'Completado': '<span class="px-3 py-1 inline-flex text-xs leading-5 font-semibold rounded-full bg-green-100 text-green-800"><i class="fas fa-check-circle mr-1"></i>Completado</span>',
+        'En Proceso': '<span class="px-3 py-1 inline-flex text-xs leading-5 font-semibold rounded-full bg-yellow-100 text-yellow-800"><i class="fas fa-spinner mr-1"></i>En Proceso</span>',
+        'Pendiente': '<span class="px-3 py-1 inline-flex text-xs leading-5 font-semibold rounded-full bg-blue-100 text-blue-800"><i class="fas fa-clock mr-1"></i>Pendiente</span>',
+        'Cancelado': '<span class="px-3 py-1 inline-flex text-xs leading-5 font-semibold rounded-full bg-red-100 text-red-800"><i class="fas fa-times-circle mr-1"></i>Cancelado</span>'
+    };
+    return badges[estado] || estado;
+}
+
+/**
+ * Limpiar todos los filtros
+ */
+function limpiarFiltros() {
+    document.getElementById('busquedaGeneral').value = '';
+    document.getElementById('filtroEstado').value = '';
+    document.getElementById('filtroTipo').value = '';
+    document.getElementById('filtroPerito').value = '';
+    document.getElementById('fechaDesde').value = '';
+    document.getElementById('fechaHasta').value = '';
+    document.getElementById('campoEspecifico').value = 'todos';
+
+    // Recargar todas las asignaciones
+    aplicarFiltros();
+}
+
+/**
+ * Exportar resultados a Excel
+ */
+function exportarResultados() {
+    if (resultadosActuales.length === 0) {
+        alert('No hay resultados para exportar');
+        return;
+    }
+
+    // Construir URL con los filtros actuales
+    const params = new URLSearchParams();
+
+    const estado = document.getElementById('filtroEstado').value;
+    const fechaDesde = document.getElementById('fechaDesde').value;
+    const fechaHasta = document.getElementById('fechaHasta').value;
+
+    if (estado) params.append('estado', estado);
+    if (fechaDesde) params.append('fecha_desde', fechaDesde);
+    if (fechaHasta) params.append('fecha_hasta', fechaHasta);
+
+    // Abrir en nueva ventana para descargar
+    window.open(`/api/exportar/excel?${params.toString()}`, '_blank');
+}
+
+/**
+ * Ver detalle de asignación (reutilizar del index.html)
+ */
+function verDetalle(id) {
+    document.getElementById('modalDetalle').classList.remove('hidden');
+
+    fetch(`/api/asignacion/${id}`)
+        .then(response => response.json())
+        .then(data => {
+            const contenido = `
+                <div class="grid grid-cols-2 gap-4">
+                    <div class="col-span-2 bg-blue-50 p-4 rounded-lg mb-4">
+                        <h4 class="text-lg font-bold text-blue-900 mb-2">
+                            <i class="fas fa-file-alt mr-2"></i>Información General
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Hoja de Envío:</label>
+                        <p class="text-gray-800">${data.hoja_envio || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Expediente:</label>
+                        <p class="text-gray-800">${data.expediente || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Dependencia:</label>
+                        <p class="text-gray-800">${data.dependencia || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Tipo de Perito:</label>
+                        <p class="text-gray-800">${data.tipo_perito || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Carpeta Fiscal:</label>
+                        <p class="text-gray-800">${data.carpeta_fiscal || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2 bg-green-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-green-900 mb-2">
+                            <i class="fas fa-user-tie mr-2"></i>Perito Asignado
+                        </h4>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Nombre del Perito:</label>
+                        <p class="text-gray-800 text-lg font-semibold">${data.perito_nombre || data.perito_asignado}</p>
+                    </div>
+
+                    <div class="col-span-2 bg-purple-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-purple-900 mb-2">
+                            <i class="fas fa-calendar-alt mr-2"></i>Fechas y Ubicación
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Fecha Inicio:</label>
+                        <p class="text-gray-800">
+                            <i class="far fa-calendar-check text-green-600 mr-1"></i>
+                            ${data.fecha_inicio}
+                        </p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Fecha Fin:</label>
+                        <p class="text-gray-800">
+                            <i class="far fa-calendar-times text-red-600 mr-1"></i>
+                            ${data.fecha_fin}
+                        </p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Lugar:</label>
+                        <p class="text-gray-800">
+                            <i class="fas fa-map-marker-alt text-red-500 mr-1"></i>
+                            ${data.lugar || '-'}
+                        </p>
+                    </div>
+
+                    <div class="col-span-2 bg-yellow-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-yellow-900 mb-2">
+                            <i class="fas fa-file-signature mr-2"></i>Documentos Oficiales
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Designación:</label>
+                        <p class="text-gray-800">${data.desginacion || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Oficio Desplazamiento:</label>
+                        <p class="text-gray-800">${data.oficio_desplazamiento || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Observaciones:</label>
+                        <p class="text-gray-800 bg-gray-50 p-3 rounded-lg">${data.observaciones || 'Sin observaciones'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Estado Actual:</label>
+                        <p class="text-gray-800">
+                            ${getEstadoBadge(data.estado)}
+                        </p>
+                    </div>
+                </div>
+
+                <div class="mt-6 flex justify-end space-x-3">
+                    <button onclick="cerrarModal()" 
+                            class="px-6 py-2 bg-gray-500 text-white rounded-lg hover:bg-gray-600 transition">
+                        <i class="fas fa-times mr-2"></i>Cerrar
+                    </button>
+                </div>
+            `;
+
+            document.getElementById('contenidoDetalle').innerHTML = contenido;
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error al cargar el detalle de la asignación');
+        });
+}
+
+/**
+ * Cerrar modal
+ */
+function cerrarModal() {
+    document.getElementById('modalDetalle').classList.add('hidden');
+}
+
+/**
+ * Editar asignación
+ */
+function editarAsignacion(id) {
+    alert('Función de edición en desarrollo. ID: ' + id);
+}
+
+// Cerrar modal al hacer clic fuera
+document.getElementById('modalDetalle').addEventListener('click', function(e) {
+    if (e.target === this) {
+        cerrarModal();
+    }
+});
+
+// Permitir búsqueda con Enter
+document.getElementById('busquedaGeneral').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        buscarGeneral();
+    }
+});
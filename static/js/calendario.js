@@ -0,0 +1,551 @@
+/**
+ * SistemaPerito - Scripts de la página calendario
+ * Archivo: calendario.js
+ */
+
+// Variables globales
+let mesActual = new Date().getMonth();
+let anioActual = new Date().getFullYear();
+let asignacionesDelMes = [];
+let asignacionesPorId = {};
+let diasCalendario = {};   // fecha -> ids (calculado en el servidor)
+let porEstadoMes = {};
+
+/**
+ * Inicializar al cargar la página
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    inicializarSelectores();
+    cargarPeritos();
+    cargarCalendario();
+});
+
+/**
+ * Inicializar selectores de mes y año
+ */
+function inicializarSelectores() {
+    // Establecer mes y año actual
+    document.getElementById('mesSelect').value = mesActual;
+
+    // Llenar selector de años (2020-2030)
+    const anioSelect = document.getElementById('anioSelect');
+    for (let anio = 2020; anio <= 2030; anio++) {
+        const option = document.createElement('option');
+        option.value = anio;
+        option.textContent = anio;
+        if (anio === anioActual) option.selected = true;
+        anioSelect.appendChild(option);
+    }
+}
+
+/**
+ * Cargar lista de peritos
+ */
+function cargarPeritos() {
+    fetch('/api/peritos')
+        .then(response => response.json())
+        .then(peritos => {
+            const selectPerito = document.getElementById('filtroPerito');
+            peritos.forEach(perito => {
+                const option = document.createElement('option');
+                option.value = perito.id;
+                option.textContent = `${perito.nombre} (${perito.tipo})`;
+                selectPerito.appendChild(option);
+            });
+        })
+        .catch(error => console.error('Error al cargar peritos:', error));
+}
+
+/**
+ * Cargar calendario del mes seleccionado
+ */
+function cargarCalendario() {
+    mesActual = parseInt(document.getElementById('mesSelect').value);
+    anioActual = parseInt(document.getElementById('anioSelect').value);
+
+    // Actualizar título
+    const nombresMeses = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+                          'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
+    document.getElementById('tituloMes').textContent = `${nombresMeses[mesActual]} ${anioActual}`;
+
+    // Obtener primer y último día del mes
+    const primerDia = new Date(anioActual, mesActual, 1);
+    const ultimoDia = new Date(anioActual, mesActual + 1, 0);
+
+    // Construir parámetros de búsqueda
+    const params = new URLSearchParams({
+        mes: `${anioActual}-${String(mesActual + 1).padStart(2, '0')}`
+    });
+
+    const peritoFiltro = document.getElementById('filtroPerito').value;
+    if (peritoFiltro) {
+        params.append('perito_id', peritoFiltro);
+    }
+
+    // Obtener asignaciones que se solapan con el mes y su reparto por día
+    fetch(`/api/calendario?${params.toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            asignacionesDelMes = data.asignaciones;
+            asignacionesPorId = {};
+            asignacionesDelMes.forEach(a => { asignacionesPorId[a.id] = a; });
+            diasCalendario = data.dias;
+            porEstadoMes = data.por_estado;
+            renderizarCalendario(primerDia, ultimoDia);
+            actualizarEstadisticas();
+        })
+        .catch(error => {
+            console.error('Error al cargar asignaciones:', error);
+            renderizarCalendario(primerDia, ultimoDia);
+        });
+}
+
+/**
+ * Asignaciones de un día (AAAA-MM-DD)
+ */
+function asignacionesDelDia(fecha) {
+    return (diasCalendario[fecha] || []).map(id => asignacionesPorId[id]);
+}
+
+/**
+ * Renderizar el calendario
+ */
+function renderizarCalendario(primerDia, ultimoDia) {
+    const calendarioBody = document.getElementById('calendarioBody');
+    calendarioBody.innerHTML = '';
+
+    // Obtener día de la semana del primer día (0 = domingo)
+    const diaSemana = primerDia.getDay();
+
+    // Crear celdas vacías para días antes del primer día
+    for (let i = 0; i < diaSemana; i++) {
+        const celda = document.createElement('div');
+        celda.className = 'calendario-dia border-r border-b bg-gray-50';
+        calendarioBody.appendChild(celda);
+    }
+
+    // Obtener fecha de hoy para comparar
+    const hoy = new Date();
+    const hoyStr = `${hoy.getFullYear()}-${String(hoy.getMonth() + 1).padStart(2, '0')}-${String(hoy.getDate()).padStart(2, '0')}`;
+
+    // Crear celdas para cada día del mes
+    for (let dia = 1; dia <= ultimoDia.getDate(); dia++) {
+        const fechaActual = `${anioActual}-${String(mesActual + 1).padStart(2, '0')}-${String(dia).padStart(2, '0')}`;
+
+        // Asignaciones de este día
+        const asignacionesDia = asignacionesDelDia(fechaActual);
+
+        const celda = document.createElement('div');
+        celda.className = 'calendario-dia border-r border-b p-2 relative';
+
+        // Marcar día actual
+        if (fechaActual === hoyStr) {
+            celda.classList.add('dia-actual');
+        }
+
+        // Marcar días con asignaciones
+        if (asignacionesDia.length > 0) {
+            celda.classList.add('dia-con-asignaciones');
+        }
+
+        // Número del día
+        const numeroDia = document.createElement('div');
+        numeroDia.className = 'text-lg font-bold text-gray-700 mb-2';
+        numeroDia.textContent = dia;
+        celda.appendChild(numeroDia);
+
+        // Mostrar asignaciones (máximo 3, si hay más mostrar indicador)
+        const maxMostrar = 3;
+        asignacionesDia.slice(0, maxMostrar).forEach(asignacion => {
+            const evento = document.createElement('div');
+            evento.className = `evento-perito ${getTipoClase(asignacion.tipo_perito)}`;
+            evento.textContent = `${asignacion.perito_nombre?.split(' ')[0] || 'Sin nombre'}: ${asignacion.expediente || 'S/E'}`;
+            evento.title = `${asignacion.perito_nombre}\n${asignacion.observaciones || ''}`;
+            evento.onclick = () => verDetalleAsignacion(asignacion.id);
+            celda.appendChild(evento);
+        });
+
+        // Si hay más asignaciones, mostrar indicador
+        if (asignacionesDia.length > maxMostrar) {
+            const masEventos = document.createElement('div');
+            masEventos.className = 'text-xs text-blue-600 font-bold cursor-pointer hover:underline mt-1';
+            masEventos.textContent = `+${asignacionesDia.length - maxMostrar} más`;
+            masEventos.onclick = () => verAsignacionesDia(fechaActual, dia);
+            celda.appendChild(masEventos);
+        }
+
+        // Click en celda vacía para ver todas las asignaciones
+        if (asignacionesDia.length > 0) {
+            celda.style.cursor = 'pointer';
+            celda.onclick = (e) => {
+                if (e.target === celda || e.target === numeroDia) {
+                    verAsignacionesDia(fechaActual, dia);
+                }
+            };
+        }
+
+        calendarioBody.appendChild(celda);
+    }
+
+    // Rellenar celdas vacías al final
+    const totalCeldas = calendarioBody.children.length;
+    const celdasFaltantes = totalCeldas % 7 === 0 ? 0 : 7 - (totalCeldas % 7);
+    for (let i = 0; i < celdasFaltantes; i++) {
+        const celda = document.createElement('div');
+        celda.className = 'calendario-dia border-r border-b bg-gray-50';
+        calendarioBody.appendChild(celda);
+    }
+}
+
+/**
+ * Obtener clase CSS según tipo de perito
+ */
+function getTipoClase(tipo) {
+    const clases = {
+        'Informático': 'tipo-informatico',
+        'Acústico': 'tipo-acustico',
+        'Antropólogo': 'tipo-antropologo',
+        'Contable': 'tipo-contable'
+    };
+    return clases[tipo] || 'tipo-informatico';
+}
+
+/**
+ * Actualizar estadísticas del mes
+ */
+function actualizarEstadisticas() {
+    const stats = {
+        total: asignacionesDelMes.length,
+        pendientes: porEstadoMes['Pendiente'] || 0,
+        enProceso: porEstadoMes['En Proceso'] || 0,
+        completados: porEstadoMes['Completado'] || 0
+    };
+
+    const html = `
+        <div class="bg-white rounded-lg shadow p-4 border-l-4 border-blue-500">
+            <p class="text-sm text-gray-600 font-semibold">Total del Mes</p>
+            <p class="text-2xl font-bold text-gray-800">${stats.total}</p>
+        </div>
+        <div class="bg-white rounded-lg shadow p-4 border-l-4 border-yellow-500">
+            <p class="text-sm text-gray-600 font-semibold">Pendientes</p>
+            <p class="text-2xl font-bold text-yellow-600">${stats.pendientes}</p>
+        </div>
+        <div class="bg-white rounded-lg shadow p-4 border-l-4 border-orange-500">
+            <p class="text-sm text-gray-600 font-semibold">En Proceso</p>
+            <p class="text-2xl font-bold text-orange-600">${stats.enProceso}</p>
+        </div>
+        <div class="bg-white rounded-lg shadow p-4 border-l-4 border-green-500">
+            <p class="text-sm text-gray-600 font-semibold">Completados</p>
+            <p class="text-2xl font-bold text-green-600">${stats.completados}</p>
+        </div>
+    `;
+
+    document.getElementById('estadisticasMes').innerHTML = html;
+}
+
+/**
+ * Navegación de calendario
+ */
+function mesAnterior() {
+    if (mesActual === 0) {
+        mesActual = 11;
+        anioActual--;
+    } else {
+        mesActual--;
+    }
+    document.getElementById('mesSelect').value = mesActual;
+    document.getElementById('anioSelect').value = anioActual;
+    cargarCalendario();
+}
+
+function mesSiguiente() {
+    if (mesActual === 11) {
+        mesActual = 0;
+        anioActual++;
+    } else {
+        mesActual++;
+    }
+    document.getElementById('mesSelect').value = mesActual;
+    document.getElementById('anioSelect').value = anioActual;
+    cargarCalendario();
+}
+
+function irHoy() {
+    const hoy = new Date();
+    mesActual = hoy.getMonth();
+    anioActual = hoy.getFullYear();
+    document.getElementById('mesSelect').value = mesActual;
+    document.getElementById('anioSelect').value = anioActual;
+    cargarCalendario();
+}
+
+/**
+ * Ver todas las asignaciones de un día específico
+ */
+function verAsignacionesDia(fecha, dia) {
+    const nombresMeses = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+                          'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
+
+    document.getElementById('tituloDia').innerHTML = `
+        <i class="fas fa-calendar-day mr-2"></i>Asignaciones del ${dia} de ${nombresMeses[mesActual]} ${anioActual}
+    `;
+
+    // Asignaciones del día
+    const asignacionesDia = asignacionesDelDia(fecha);
+
+    let html = '';
+
+    if (asignacionesDia.length === 0) {
+        html = `
+            <div class="text-center py-8">
+                <i class="fas fa-calendar-times text-4xl text-gray-300 mb-3"></i>
+                <p class="text-gray-500">No hay asignaciones para este día</p>
+            </div>
+        `;
+    } else {
+        asignacionesDia.forEach(asignacion => {
+            html += `
+                <div class="bg-gray-50 rounded-lg p-4 mb-4 hover:bg-gray-100 transition cursor-pointer"
+                     onclick="verDetalleAsignacion(${asignacion.id})">
+                    <div class="flex justify-between items-start mb-2">
+                        <div class="flex-1">
+                            <h4 class="font-bold text-gray-800 text-lg">
+                                ${asignacion.perito_nombre || 'Sin nombre'}
+                            </h4>
+                            <p class="text-sm text-gray-600">
+                                <span class="px-2 py-1 rounded-full text-xs font-semibold ${getTipoClase(asignacion.tipo_perito)}">
+                                    ${asignacion.tipo_perito}
+                                </span>
+                            </p>
+                        </div>
+                        <div>
+                            ${getEstadoBadge(asignacion.estado)}
+                        </div>
+                    </div>
+
+                    <div class="grid grid-cols-2 gap-3 text-sm mt-3">
+                        <div>
+                            <span class="font-semibold text-gray-600">Expediente:</span>
+                            <p class="text-gray-800">${asignacion.expediente || '-'}</p>
+                        </div>
+                        <div>
+                            <span class="font-semibold text-gray-600">Hoja Envío:</span>
+                            <p class="text-gray-800">${asignacion.hoja_envio || '-'}</p>
+                        </div>
+                        <div class="col-span-2">
+                            <span class="font-semibold text-gray-600">Período:</span>
+                            <p class="text-gray-800">
+                                <i class="far fa-calendar text-green-500 mr-1"></i>
+                                ${asignacion.fecha_inicio} al ${asignacion.fecha_fin}
+                            </p>
+                        </div>
+                        <div class="col-span-2">
+                            <span class="font-semibold text-gray-600">Lugar:</span>
+                            <p class="text-gray-800">
+                                <i class="fas fa-map-marker-alt text-red-500 mr-1"></i>
+                                ${asignacion.lugar || '-'}
+                            </p>
+                        </div>
+                    </div>
+
+                    <div class="mt-3 text-right">
+                        <button class="text-blue-600 hover:text-blue-800 text-sm font-semibold">
+                            <i class="fas fa-eye mr-1"></i>Ver detalles completos
+                        </button>
+                    </div>
+                </div>
+            `;
+        });
+    }
+
+    document.getElementById('contenidoDia').innerHTML = html;
+    document.getElementById('modalDia').classList.remove('hidden');
+}
+
+/**
+ * Ver detalle completo de una asignación
+ */
+function verDetalleAsignacion(id) {
+    cerrarModalDia();
+
+    fetch(`/api/asignacion/${id}`)
+        .then(response => response.json())
+        .then(data => {
+            const contenido = `
+                <div class="grid grid-cols-2 gap-4">
+                    <div class="col-span-2 bg-blue-50 p-4 rounded-lg mb-4">
+                        <h4 class="text-lg font-bold text-blue-900 mb-2">
+                            <i class="fas fa-file-alt mr-2"></i>Información General
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Hoja de Envío:</label>
+                        <p class="text-gray-800">${data.hoja_envio || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Expediente:</label>
+                        <p class="text-gray-800">${data.expediente || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Dependencia:</label>
+                        <p class="text-gray-800">${data.dependencia || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Tipo de Perito:</label>
+                        <p class="text-gray-800">${data.tipo_perito || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Carpeta Fiscal:</label>
+                        <p class="text-gray-800">${data.carpeta_fiscal || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2 bg-green-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-green-900 mb-2">
+                            <i class="fas fa-user-tie mr-2"></i>Perito Asignado
+                        </h4>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Nombre del Perito:</label>
+                        <p class="text-gray-800 text-lg font-semibold">${data.perito_nombre || data.perito_asignado}</p>
+                    </div>
+
+                    <div class="col-span-2 bg-purple-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-purple-900 mb-2">
+                            <i class="fas fa-calendar-alt mr-2"></i>Fechas y Ubicación
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Fecha Inicio:</label>
+                        <p class="text-gray-800">
+                            <i class="far fa-calendar-check text-green-600 mr-1"></i>
+                            ${data.fecha_inicio}
+                        </p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Fecha Fin:</label>
+                        <p class="text-gray-800">
+                            <i class="far fa-calendar-times text-red-600 mr-1"></i>
+                            ${data.fecha_fin}
+                        </p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Lugar:</label>
+                        <p class="text-gray-800">
+                            <i class="fas fa-map-marker-alt text-red-500 mr-1"></i>
+                            ${data.lugar || '-'}
+                        </p>
+                    </div>
+
+                    <div class="col-span-2 bg-yellow-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-yellow-900 mb-2">
+                            <i class="fas fa-file-signature mr-2"></i>Documentos Oficiales
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Designación:</label>
+                        <p class="text-gray-800">${data.desginacion || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Oficio Desplazamiento:</label>
+                        <p class="text-gray-800">${data.oficio_desplazamiento || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Observaciones:</label>
+                        <p class="text-gray-800 bg-gray-50 p-3 rounded-lg">${data.observaciones || 'Sin observaciones'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Estado Actual:</label>
+                        <p class="text-gray-800">
+                            ${getEstadoBadge(data.estado)}
+                        </p>
+                    </div>
+                </div>
+
+                <div class="mt-6 flex justify-end space-x-3">
+                    <button onclick="cerrarModalDetalle()" 
+                            class="px-6 py-2 bg-gray-500 text-white rounded-lg hover:bg-gray-600 transition">
+                        <i class="fas fa-times mr-2"></i>Cerrar
+                    </button>
+                </div>
+            `;
+
+            document.getElementById('contenidoDetalle').innerHTML = contenido;
+            document.getElementById('modalDetalle').classList.remove('hidden');
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error al cargar el detalle de la asignación');
+        });
+}
+
+/**
+ * Obtener badge de estado
+ */
+function getEstadoBadge(estado) {
+    const badges = {
+        'Completado': '<span class="px-3 py-1 inline-flex text-xs leading-5 font-semibold rounded-full bg-green-100 text-green-800"><i class="fas fa-check-circle mr-1"></i>Completado</span>',
+        'En Proceso': '<span class="px-3 py-1 inline-flex text-xs leading-5 font-semibold rounded-full bg-yellow-100 text-yellow-800"><i class="fas fa-spinner mr-1"></i>En Proceso</span>',
+        'Pendiente': '<span class="px-3 py-1 inline-flex text-xs leading-5 font-semibold rounded-full bg-blue-100 text-blue-800"><i class="fas fa-clock mr-1"></i>Pendiente</span>',
+        'Cancelado': '<span class="px-3 py-1 inline-flex text-xs leading-5 font-semibold rounded-full bg-red-100 text-red-800"><i class="fas fa-times-circle mr-1"></i>Cancelado</span>'
+    };
+    return badges[estado] || estado;
+}
+
+/**
+ * Cerrar modales
+ */
+function cerrarModalDia() {
+    document.getElementById('modalDia').classList.add('hidden');
+}
+
+function cerrarModalDetalle() {
+    document.getElementById('modalDetalle').classList.add('hidden');
+}
+
+// Cerrar modales al hacer clic fuera
+document.getElementById('modalDia').addEventListener('click', function(e) {
+    if (e.target === this) cerrarModalDia();
+});
+
+document.getElementById('modalDetalle').addEventListener('click', function(e) {
+    if (e.target === this) cerrarModalDetalle();
+});
+
+/**
+ * Recargar el mes mostrado cuando cambia una de sus asignaciones
+ * (Server-Sent Events). Varios cambios seguidos producen una sola recarga.
+ */
+let recargaPendiente = null;
+
+function programarRecarga() {
+    clearTimeout(recargaPendiente);
+    recargaPendiente = setTimeout(cargarCalendario, 500);
+}
+
+if (window.EventSource) {
+    const eventos = new EventSource('/api/eventos');
+    eventos.addEventListener('asignacion', function(e) {
+        const cambio = JSON.parse(e.data);
+        const asignacion = cambio.asignacion;
+        const mes = `${anioActual}-${String(mesActual + 1).padStart(2, '0')}`;
+        const enMes = asignacion.fecha_inicio && asignacion.fecha_fin
+            && asignacion.fecha_inicio.slice(0, 7) <= mes && asignacion.fecha_fin.slice(0, 7) >= mes;
+        if (enMes || asignacionesPorId[cambio.asignacion_id]) {
+            programarRecarga();
+        }
+    });
+    eventos.addEventListener('reiniciar', programarRecarga);
+}
@@ -0,0 +1,190 @@
+/**
+ * SistemaPerito - Scripts de la página index
+ * Archivo: index.js
+ */
+
+/**
+ * Función para ver el detalle completo de una asignación
+ * @param {number} id - ID de la asignación
+ */
+function verDetalle(id) {
+    // Mostrar modal
+    document.getElementById('modalDetalle').classList.remove('hidden');
+
+    // Cargar datos de la asignación
+    fetch(`/api/asignacion/${id}`)
+        .then(response => response.json())
+        .then(data => {
+            // Renderizar información detallada
+            const contenido = `
+                <div class="grid grid-cols-2 gap-4">
+                    <div class="col-span-2 bg-blue-50 p-4 rounded-lg mb-4">
+                        <h4 class="text-lg font-bold text-blue-900 mb-2">
+                            <i class="fas fa-file-alt mr-2"></i>Información General
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Hoja de Envío:</label>
+                        <p class="text-gray-800">${data.hoja_envio || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Expediente:</label>
+                        <p class="text-gray-800">${data.expediente || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Dependencia:</label>
+                        <p class="text-gray-800">${data.dependencia || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Tipo de Perito:</label>
+                        <p class="text-gray-800">${data.tipo_perito || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Carpeta Fiscal:</label>
+                        <p class="text-gray-800">${data.carpeta_fiscal || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2 bg-green-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-green-900 mb-2">
+                            <i class="fas fa-user-tie mr-2"></i>Perito Asignado
+                        </h4>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Nombre del Perito:</label>
+                        <p class="text-gray-800 text-lg font-semibold">${data.perito_nombre || data.perito_asignado}</p>
+                    </div>
+
+                    <div class="col-span-2 bg-purple-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-purple-900 mb-2">
+                            <i class="fas fa-calendar-alt mr-2"></i>Fechas y Ubicación
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Fecha Inicio:</label>
+                        <p class="text-gray-800">
+                            <i class="far fa-calendar-check text-green-600 mr-1"></i>
+                            ${data.fecha_inicio}
+                        </p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Fecha Fin:</label>
+                        <p class="text-gray-800">
+                            <i class="far fa-calendar-times text-red-600 mr-1"></i>
+                            ${data.fecha_fin}
+                        </p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Lugar:</label>
+                        <p class="text-gray-800">
+                            <i class="fas fa-map-marker-alt text-red-500 mr-1"></i>
+                            ${data.lugar || '-'}
+                        </p>
+                    </div>
+
+                    <div class="col-span-2 bg-yellow-50 p-4 rounded-lg my-4">
+                        <h4 class="text-lg font-bold text-yellow-900 mb-2">
+                            <i class="fas fa-file-signature mr-2"></i>Documentos Oficiales
+                        </h4>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Designación:</label>
+                        <p class="text-gray-800">${data.desginacion || '-'}</p>
+                    </div>
+
+                    <div>
+                        <label class="text-sm font-semibold text-gray-600">Oficio Desplazamiento:</label>
+                        <p class="text-gray-800">${data.oficio_desplazamiento || '-'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Observaciones:</label>
+                        <p class="text-gray-800 bg-gray-50 p-3 rounded-lg">${data.observaciones || 'Sin observaciones'}</p>
+                    </div>
+
+                    <div class="col-span-2">
+                        <label class="text-sm font-semibold text-gray-600">Estado Actual:</label>
+                        <p class="text-gray-800">
+                            ${getEstadoBadge(data.estado)}
+                        </p>
+                    </div>
+                </div>
+
+                <div class="mt-6 flex justify-end space-x-3">
+                    <button onclick="editarAsignacion(${data.id})" 
+                            class="px-6 py-2 bg-green-600 text-white rounded-lg hover:bg-green-700 transition">
+                        <i class="fas fa-edit mr-2"></i>Editar
+                    </button>
+                    <button onclick="cerrarModal()" 
+                            class="px-6 py-2 bg-gray-500 text-white rounded-lg hover:bg-gray-600 transition">
+                        <i class="fas fa-times mr-2"></i>Cerrar
+                    </button>
+                </div>
+            `;
+
+            document.getElementById('contenidoDetalle').innerHTML = contenido;
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error al cargar el detalle de la asignación');
+        });
+}
+
+/**
+ * Función auxiliar para generar badge de estado
+ */
+function getEstadoBadge(estado) {
+    const badges = {
+        'Completado': '<span class="px-3 py-1 inline-flex text-sm font-semibold rounded-full bg-green-100 text-green-800"><i class="fas fa-check-circle mr-1"></i>Completado</span>',
+        'En Proceso': '<span class="px-3 py-1 inline-flex text-sm font-semibold rounded-full bg-yellow-100 text-yellow-800"><i class="fas fa-spinner mr-1"></i>En Proceso</span>',
+        'Pendiente': '<span class="px-3 py-1 inline-flex text-sm font-semibold rounded-full bg-blue-100 text-blue-800"><i class="fas fa-clock mr-1"></i>Pendiente</span>',
+        'Cancelado': '<span class="px-3 py-1 inline-flex text-sm font-semibold rounded-full bg-red-100 text-red-800"><i class="fas fa-times-circle mr-1"></i>Cancelado</span>'
+    };
+    return badges[estado] || estado;
+}
+
+/**
+ * Cerrar modal de detalle
+ */
+function cerrarModal() {
+    document.getElementById('modalDetalle').classList.add('hidden');
+}
+
+/**
+ * Función para editar asignación (redirige a página de edición)
+ */
+function editarAsignacion(id) {
+    // Por ahora redirigimos a la página de nueva asignación con el ID
+    // En una versión futura, se puede crear una página específica de edición
+    alert('Función de edición en desarrollo. ID: ' + id);
+}
+
+// Cerrar modal al hacer clic fuera de él
+document.getElementById('modalDetalle').addEventListener('click', function(e) {
+    if (e.target === this) {
+        cerrarModal();
+    }
+});
+
+/**
+ * Actualizar los contadores del dashboard en vivo (Server-Sent Events)
+ */
+if (window.EventSource) {
+    const eventos = new EventSource('/api/eventos');
+    eventos.addEventListener('contadores', function(e) {
+        const contadores = JSON.parse(e.data);
+        Object.keys(contadores).forEach(clave => {
+            const elemento = document.getElementById(`contador-${clave}`);
+            if (elemento) elemento.textContent = contadores[clave];
+        });
+    });
+}
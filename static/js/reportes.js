@@ -0,0 +1,444 @@
+/**
+ * SistemaPerito - Scripts de la página reportes
+ * Archivo: reportes.js
+ */
+
+// Variables globales para los gráficos
+let chartEstados, chartTipos, chartMeses;
+
+/**
+ * Inicialización al cargar la página
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    // Establecer fechas por defecto (últimos 6 meses)
+    const hoy = new Date();
+    const hace6Meses = new Date();
+    hace6Meses.setMonth(hace6Meses.getMonth() - 6);
+
+    document.getElementById('fechaDesde').value = hace6Meses.toISOString().split('T')[0];
+    document.getElementById('fechaHasta').value = hoy.toISOString().split('T')[0];
+
+    // Cargar estadísticas
+    cargarEstadisticas();
+});
+
+/**
+ * Cargar todas las estadísticas
+ */
+function cargarEstadisticas() {
+    const fechaDesde = document.getElementById('fechaDesde').value;
+    const fechaHasta = document.getElementById('fechaHasta').value;
+
+    // Construir parámetros
+    const params = new URLSearchParams();
+    if (fechaDesde) params.append('fecha_desde', fechaDesde);
+    if (fechaHasta) params.append('fecha_hasta', fechaHasta);
+    params.append('agrupar', 'dependencia');
+
+    // Obtener estadísticas del servidor (ya agregadas por el backend)
+    fetch(`/api/estadisticas?${params.toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            actualizarEstadisticasGenerales(data);
+            crearGraficoEstados(data.por_estado);
+            crearGraficoTipos(data.por_tipo);
+            crearGraficoMeses(data.por_mes);
+            mostrarTopPeritos(data.top_peritos);
+            cargarDatosDependencias(data.grupos.dependencia);
+        })
+        .catch(error => {
+            console.error('Error al cargar estadísticas:', error);
+            alert('Error al cargar las estadísticas');
+        });
+}
+
+/**
+ * Actualizar estadísticas generales en las tarjetas
+ */
+function actualizarEstadisticasGenerales(data) {
+    const porEstado = data.por_estado || {};
+
+    const total = Object.values(porEstado).reduce((sum, val) => sum + val, 0);
+    const pendientes = porEstado['Pendiente'] || 0;
+    const enProceso = porEstado['En Proceso'] || 0;
+    const completados = porEstado['Completado'] || 0;
+
+    document.getElementById('totalAsignaciones').textContent = total;
+    document.getElementById('totalPendientes').textContent = pendientes;
+    document.getElementById('totalEnProceso').textContent = enProceso;
+    document.getElementById('totalCompletados').textContent = completados;
+
+    // Calcular porcentajes
+    const porcentajePendientes = total > 0 ? ((pendientes / total) * 100).toFixed(1) : 0;
+    const porcentajeEnProceso = total > 0 ? ((enProceso / total) * 100).toFixed(1) : 0;
+    const porcentajeCompletados = total > 0 ? ((completados / total) * 100).toFixed(1) : 0;
+
+    document.getElementById('porcentajePendientes').innerHTML = 
+        `<i class="fas fa-percentage mr-1"></i>${porcentajePendientes}% del total`;
+    document.getElementById('porcentajeEnProceso').innerHTML = 
+        `<i class="fas fa-percentage mr-1"></i>${porcentajeEnProceso}% del total`;
+    document.getElementById('porcentajeCompletados').innerHTML = 
+        `<i class="fas fa-percentage mr-1"></i>${porcentajeCompletados}% del total`;
+}
+
+/**
+ * Crear gráfico de distribución por estado
+ */
+function crearGraficoEstados(porEstado) {
+    const ctx = document.getElementById('chartEstados').getContext('2d');
+
+    // Destruir gráfico anterior si existe
+    if (chartEstados) {
+        chartEstados.destroy();
+    }
+
+    const labels = Object.keys(porEstado);
+    const valores = Object.values(porEstado);
+
+    chartEstados = new Chart(ctx, {
+        type: 'doughnut',
+        data: {
+            labels: labels,
+            datasets: [{
+                data: valores,
+                backgroundColor: [
+                    'rgba(59, 130, 246, 0.8)',  // Azul - Pendiente
+                    'rgba(251, 146, 60, 0.8)',  // Naranja - En Proceso
+                    'rgba(34, 197, 94, 0.8)',   // Verde - Completado
+                    'rgba(239, 68, 68, 0.8)'    // Rojo - Cancelado
+                ],
+                borderColor: [
+                    'rgba(59, 130, 246, 1)',
+                    'rgba(251, 146, 60, 1)',
+                    'rgba(34, 197, 94, 1)',
+                    'rgba(239, 68, 68, 1)'
+                ],
+                borderWidth: 2
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    position: 'bottom',
+                    labels: {
+                        padding: 15,
+                        font: {
+                            size: 12,
+                            weight: 'bold'
+                        }
+                    }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            const label = context.label || '';
+                            const value = context.parsed || 0;
+                            const total = context.dataset.data.reduce((a, b) => a + b, 0);
+                            const percentage = ((value / total) * 100).toFixed(1);
+                            return `${label}: ${value} (${percentage}%)`;
+                        }
+                    }
+                }
+            }
+        }
+    });
+}
+
+/**
+ * Crear gráfico de distribución por tipo de perito
+ */
+function crearGraficoTipos(porTipo) {
+    const ctx = document.getElementById('chartTipos').getContext('2d');
+
+    // Destruir gráfico anterior si existe
+    if (chartTipos) {
+        chartTipos.destroy();
+    }
+
+    const labels = Object.keys(porTipo);
+    const valores = Object.values(porTipo);
+
+    chartTipos = new Chart(ctx, {
+        type: 'pie',
+        data: {
+            labels: labels,
+            datasets: [{
+                data: valores,
+                backgroundColor: [
+                    'rgba(59, 130, 246, 0.8)',   // Azul - Informático
+                    'rgba(147, 51, 234, 0.8)',   // Púrpura - Acústico
+                    'rgba(34, 197, 94, 0.8)',    // Verde - Antropólogo
+                    'rgba(245, 158, 11, 0.8)'    // Amarillo - Contable
+                ],
+                borderColor: [
+                    'rgba(59, 130, 246, 1)',
+                    'rgba(147, 51, 234, 1)',
+                    'rgba(34, 197, 94, 1)',
+                    'rgba(245, 158, 11, 1)'
+                ],
+                borderWidth: 2
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    position: 'bottom',
+                    labels: {
+                        padding: 15,
+                        font: {
+                            size: 12,
+                            weight: 'bold'
+                        }
+                    }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            const label = context.label || '';
+                            const value = context.parsed || 0;
+                            const total = context.dataset.data.reduce((a, b) => a + b, 0);
+                            const percentage = ((value / total) * 100).toFixed(1);
+                            return `${label}: ${value} (${percentage}%)`;
+                        }
+                    }
+                }
+            }
+        }
+    });
+}
+
+/**
+ * Crear gráfico de tendencia por meses
+ */
+function crearGraficoMeses(porMes) {
+    const ctx = document.getElementById('chartMeses').getContext('2d');
+
+    // Destruir gráfico anterior si existe
+    if (chartMeses) {
+        chartMeses.destroy();
+    }
+
+    const labels = porMes.map(item => {
+        const [anio, mes] = item.mes.split('-');
+        const nombresMeses = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 
+                             'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic'];
+        return `${nombresMeses[parseInt(mes) - 1]} ${anio}`;
+    });
+
+    const valores = porMes.map(item => item.total);
+
+    chartMeses = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: labels,
+            datasets: [{
+                label: 'Asignaciones por Mes',
+                data: valores,
+                backgroundColor: 'rgba(59, 130, 246, 0.2)',
+                borderColor: 'rgba(59, 130, 246, 1)',
+                borderWidth: 3,
+                fill: true,
+                tension: 0.4,
+                pointRadius: 5,
+                pointHoverRadius: 7,
+                pointBackgroundColor: 'rgba(59, 130, 246, 1)',
+                pointBorderColor: '#fff',
+                pointBorderWidth: 2
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: false
+                },
+                tooltip: {
+                    backgroundColor: 'rgba(0, 0, 0, 0.8)',
+                    padding: 12,
+                    titleFont: {
+                        size: 14,
+                        weight: 'bold'
+                    },
+                    bodyFont: {
+                        size: 13
+                    }
+                }
+            },
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    ticks: {
+                        stepSize: 1
+                    },
+                    grid: {
+                        color: 'rgba(0, 0, 0, 0.05)'
+                    }
+                },
+                x: {
+                    grid: {
+                        display: false
+                    }
+                }
+            }
+        }
+    });
+}
+
+/**
+ * Mostrar top 5 peritos con más asignaciones
+ */
+function mostrarTopPeritos(topPeritos) {
+    const container = document.getElementById('topPeritos');
+
+    if (!topPeritos || topPeritos.length === 0) {
+        container.innerHTML = `
+            <div class="text-center py-8">
+                <i class="fas fa-user-slash text-4xl text-gray-300 mb-3"></i>
+                <p class="text-gray-500">No hay datos disponibles</p>
+            </div>
+        `;
+        return;
+    }
+
+    // Encontrar el máximo para la barra de progreso
+    const maxTotal = Math.max(...topPeritos.map(p => p.total));
+
+    let html = '';
+    topPeritos.forEach((perito, index) => {
+        const porcentaje = (perito.total / maxTotal) * 100;
+        const colores = [
+            'bg-yellow-500',
+            'bg-gray-400',
+            'bg-orange-500',
+            'bg-blue-500',
+            'bg-purple-500'
+        ];
+
+        html += `
+            <div class="flex items-center space-x-4">
+                <div class="flex-shrink-0 w-12 h-12 rounded-full ${colores[index]} flex items-center justify-center text-white font-bold text-xl">
+                    ${index + 1}
+                </div>
+                <div class="flex-1">
+                    <div class="flex justify-between items-center mb-2">
+                        <h4 class="font-bold text-gray-800">${perito.nombre}</h4>
+                        <span class="text-2xl font-bold text-blue-600">${perito.total}</span>
+                    </div>
+                    <div class="w-full bg-gray-200 rounded-full h-3">
+                        <div class="${colores[index]} h-3 rounded-full transition-all duration-500" 
+                             style="width: ${porcentaje}%"></div>
+                    </div>
+                </div>
+            </div>
+        `;
+    });
+
+    container.innerHTML = html;
+}
+
+/**
+ * Cargar datos de dependencias (agrupados en el servidor)
+ */
+function cargarDatosDependencias(grupos) {
+    const porDependencia = {};
+
+    grupos.forEach(grupo => {
+        const dep = grupo.clave || 'Sin dependencia';
+        const actual = porDependencia[dep] || {
+            total: 0,
+            pendientes: 0,
+            enProceso: 0,
+            completados: 0
+        };
+
+        actual.total += grupo.total;
+        actual.pendientes += grupo.por_estado['Pendiente'] || 0;
+        actual.enProceso += grupo.por_estado['En Proceso'] || 0;
+        actual.completados += grupo.por_estado['Completado'] || 0;
+        porDependencia[dep] = actual;
+    });
+
+    // Mostrar en tabla
+    mostrarTablaDependencias(porDependencia);
+}
+
+/**
+ * Mostrar tabla de dependencias
+ */
+function mostrarTablaDependencias(porDependencia) {
+    const tbody = document.getElementById('tablaDependencias');
+
+    if (Object.keys(porDependencia).length === 0) {
+        tbody.innerHTML = `
+            <tr>
+                <td colspan="6" class="px-6 py-8 text-center text-gray-500">
+                    <i class="fas fa-inbox text-4xl text-gray-300 mb-3"></i>
+                    <p>No hay datos disponibles</p>
+                </td>
+            </tr>
+        `;
+        return;
+    }
+
+    let html = '';
+
+    // Ordenar por total descendente
+    const dependenciasOrdenadas = Object.entries(porDependencia)
+        .sort((a, b) => b[1].total - a[1].total);
+
+    dependenciasOrdenadas.forEach(([dependencia, stats]) => {
+        const porcentajeCompletado = stats.total > 0 
+            ? ((stats.completados / stats.total) * 100).toFixed(1) 
+            : 0;
+
+        html += `
+            <tr class="hover:bg-gray-50 transition">
+                <td class="px-6 py-4 text-sm font-semibold text-gray-900">
+                    <i class="fas fa-building text-blue-500 mr-2"></i>${dependencia}
+                </td>
+                <td class="px-6 py-4 text-center">
+                    <span class="text-lg font-bold text-blue-600">${stats.total}</span>
+                </td>
+                <td class="px-6 py-4 text-center">
+                    <span class="text-lg font-bold text-yellow-600">${stats.pendientes}</span>
+                </td>
+                <td class="px-6 py-4 text-center">
+                    <span class="text-lg font-bold text-orange-600">${stats.enProceso}</span>
+                </td>
+                <td class="px-6 py-4 text-center">
+                    <span class="text-lg font-bold text-green-600">${stats.completados}</span>
+                </td>
+                <td class="px-6 py-4">
+                    <div class="flex items-center space-x-3">
+                        <div class="flex-1 bg-gray-200 rounded-full h-2">
+                            <div class="bg-green-600 h-2 rounded-full" 
+                                 style="width: ${porcentajeCompletado}%"></div>
+                        </div>
+                        <span class="text-sm font-bold text-gray-700 w-12">${porcentajeCompletado}%</span>
+                    </div>
+                </td>
+            </tr>
+        `;
+    });
+
+    tbody.innerHTML = html;
+}
+
+/**
+ * Exportar reporte a Excel
+ */
+function exportarReporte() {
+    const fechaDesde = document.getElementById('fechaDesde').value;
+    const fechaHasta = document.getElementById('fechaHasta').value;
+
+    const params = new URLSearchParams();
+    if (fechaDesde) params.append('fecha_desde', fechaDesde);
+    if (fechaHasta) params.append('fecha_hasta', fechaHasta);
+
+    window.open(`/api/exportar/excel?${params.toString()}`, '_blank');
+}
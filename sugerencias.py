@@ -0,0 +1,248 @@
+"""
+SistemaPerito - Sugerencia de peritos
+Descripción: Ordena a los peritos activos de un tipo para un rango de fechas
+según su disponibilidad, la carga de trabajo en las semanas cercanas y su
+experiencia previa en el mismo lugar. Las asignaciones de cada perito se
+cargan una sola vez en arreglos ordenados, de modo que evaluar un candidato
+es una búsqueda binaria.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from busqueda import construir_match
+from ocupacion import consulta_solapadas, fusionar_intervalos, parametros_ventana
+
+# Semanas antes y después del rango que cuentan para la carga de trabajo
+SEMANAS_ENTORNO = 4
+
+# Días de carga que compensa cada viaje previo al mismo lugar, y tope de viajes
+PESO_LUGAR = 2
+MAX_VIAJES_LUGAR = 5
+
+# Palabras frecuentes en el campo lugar que no identifican un destino
+PALABRAS_COMUNES_LUGAR = {
+    'desplazamiento', 'lugar', 'via', 'aerea', 'terrestre', 'ida', 'retorno',
+    'manana', 'tarde', 'noche', 'lima', 'para', 'desde', 'hacia',
+}
+
+# Solicitudes máximas en una planificación por lotes
+MAX_SOLICITUDES_LOTE = 500
+
+
+def palabras_lugar(lugar):
+    """
+    Palabras que identifican el destino (sin tildes ni palabras comunes).
+    """
+    normalizado = unicodedata.normalize('NFKD', lugar or '').encode('ascii', 'ignore').decode()
+    return sorted({
+        palabra for palabra in re.findall(r'\w+', normalizado.lower())
+        if len(palabra) >= 4 and palabra not in PALABRAS_COMUNES_LUGAR
+    })
+
+
+class AgendaPerito:
+    """
+    Intervalos ocupados de un perito como dos arreglos ordenados
+    (inicios y fines, en días ordinales) sin solapamientos entre sí.
+    """
+
+    __slots__ = ('id', 'nombre', 'inicios', 'fines')
+
+    def __init__(self, id, nombre, intervalos=()):
+        self.id = id
+        self.nombre = nombre
+        fusionados = fusionar_intervalos(sorted(intervalos))
+        self.inicios = [inicio for inicio, _ in fusionados]
+        self.fines = [fin for _, fin in fusionados]
+
+    def libre(self, inicio, fin):
+        """
+        True si [inicio, fin] no se solapa con ningún intervalo ocupado.
+        """
+        # Último intervalo que empieza antes del fin solicitado
+        posicion = bisect_right(self.inicios, fin)
+        return posicion == 0 or self.fines[posicion - 1] < inicio
+
+    def dias_ocupados(self, inicio, fin):
+        """
+        Días ocupados dentro de [inicio, fin].
+        """
+        total = 0
+        posicion = bisect_left(self.fines, inicio)
+        while posicion < len(self.inicios) and self.inicios[posicion] <= fin:
+            total += min(self.fines[posicion], fin) - max(self.inicios[posicion], inicio) + 1
+            posicion += 1
+        return total
+
+    def reservar(self, inicio, fin):
+        """
+        Añade un intervalo libre (usado al planificar por lotes).
+        """
+        posicion = bisect_right(self.inicios, inicio)
+        self.inicios.insert(posicion, inicio)
+        self.fines.insert(posicion, fin)
+
+
+class Planificador:
+    """
+    Agendas de los peritos activos de un tipo en torno a una ventana.
+    """
+
+    def __init__(self, conn, tipo, desde, hasta):
+        """
+        Args:
+            conn: Conexión SQLite
+            tipo: Tipo de perito
+            desde, hasta: date, ventana que cubre todas las solicitudes
+        """
+        self.conn = conn
+        self.tipo = tipo
+        entorno = timedelta(weeks=SEMANAS_ENTORNO)
+        inicio_carga = desde - entorno
+        fin_carga = hasta + entorno
+
+        peritos = conn.execute('''
+            SELECT id, nombre_completo FROM peritos
+            WHERE estado = 'Activo' AND tipo = ?
+            ORDER BY nombre_completo
+        ''', (tipo,)).fetchall()
+        ids = [perito_id for perito_id, _ in peritos]
+
+        intervalos = {perito_id: [] for perito_id in ids}
+        if ids:
+            query, extra = consulta_solapadas(
+                ['a.perito_id', 'a.dia_inicio', 'a.dia_fin'],
+                incluir_canceladas=False, peritos=ids
+            )
+            parametros = parametros_ventana(conn, inicio_carga, fin_carga)
+            for perito_id, inicio, fin in conn.execute(query, [*parametros, *extra]):
+                intervalos[perito_id].append((inicio, fin))
+
+        self.agendas = [
+            AgendaPerito(perito_id, nombre, intervalos[perito_id])
+            for perito_id, nombre in peritos
+        ]
+        self._viajes = {}
+
+    def viajes_lugar(self, lugar):
+        """
+        Asignaciones previas de cada perito en el mismo lugar (índice FTS).
+
+        Returns:
+            dict: perito_id -> número de asignaciones
+        """
+        palabras = palabras_lugar(lugar)
+        clave = tuple(palabras)
+        if clave not in self._viajes:
+            conteos = {}
+            if palabras and self.agendas:
+                ids = [agenda.id for agenda in self.agendas]
+                cursor = self.conn.execute(f'''
+                    SELECT a.perito_id, COUNT(*)
+                    FROM asignaciones_fts
+                    JOIN asignaciones a ON a.id = asignaciones_fts.rowid
+                    WHERE asignaciones_fts MATCH ?
+                      AND a.perito_id IN ({', '.join('?' * len(ids))})
+                      AND a.estado != 'Cancelado'
+                    GROUP BY a.perito_id
+                ''', [construir_match(' '.join(palabras), 'lugar', 'OR'), *ids])
+                conteos = dict(cursor.fetchall())
+            self._viajes[clave] = conteos
+        return self._viajes[clave]
+
+    def sugerir(self, fecha_inicio, fecha_fin, lugar=''):
+        """
+        Ordena a los peritos para una solicitud.
+
+        Args:
+            fecha_inicio, fecha_fin: date
+            lugar: Texto del lugar / ruta
+
+        Returns:
+            list: Un dict por perito; primero los disponibles con menor
+            puntaje (carga en días menos la bonificación por lugar)
+        """
+        inicio = fecha_inicio.toordinal()
+        fin = fecha_fin.toordinal()
+        dias_entorno = SEMANAS_ENTORNO * 7
+        viajes = self.viajes_lugar(lugar)
+
+        candidatos = []
+        for agenda in self.agendas:
+            carga = agenda.dias_ocupados(inicio - dias_entorno, fin + dias_entorno)
+            viajes_perito = viajes.get(agenda.id, 0)
+            candidatos.append({
+                'perito_id': agenda.id,
+                'nombre': agenda.nombre,
+                'disponible': agenda.libre(inicio, fin),
+                'carga_dias': carga,
+                'viajes_lugar': viajes_perito,
+                'puntaje': carga - PESO_LUGAR * min(viajes_perito, MAX_VIAJES_LUGAR),
+            })
+
+        candidatos.sort(key=lambda c: (not c['disponible'], c['puntaje'], c['nombre']))
+        return candidatos
+
+    def agenda(self, perito_id):
+        return next((a for a in self.agendas if a.id == perito_id), None)
+
+
+def planificar_lote(conn, solicitudes, alternativas=3):
+    """
+    Propone un perito para cada solicitud de una lista, teniendo en cuenta
+    las asignaciones ya propuestas para las solicitudes anteriores.
+
+    Las solicitudes se atienden en orden de fecha de inicio; cada perito
+    elegido queda reservado en su agenda para las siguientes.
+
+    Args:
+        conn: Conexión SQLite
+        solicitudes: Lista de dicts con tipo, fecha_inicio y fecha_fin
+            (date) y lugar opcional
+        alternativas: Otros peritos disponibles a incluir por solicitud
+
+    Returns:
+        list: Un dict por solicitud, en el orden recibido
+    """
+    # Un planificador por tipo, cubriendo todas las fechas de ese tipo
+    ventanas = {}
+    for solicitud in solicitudes:
+        desde, hasta = ventanas.get(
+            solicitud['tipo'], (solicitud['fecha_inicio'], solicitud['fecha_fin'])
+        )
+        ventanas[solicitud['tipo']] = (
+            min(desde, solicitud['fecha_inicio']), max(hasta, solicitud['fecha_fin'])
+        )
+    planificadores = {
+        tipo: Planificador(conn, tipo, desde, hasta)
+        for tipo, (desde, hasta) in ventanas.items()
+    }
+
+    resultados = [None] * len(solicitudes)
+    orden = sorted(range(len(solicitudes)), key=lambda i: solicitudes[i]['fecha_inicio'])
+    for indice in orden:
+        solicitud = solicitudes[indice]
+        planificador = planificadores[solicitud['tipo']]
+        candidatos = [
+            c for c in planificador.sugerir(
+                solicitud['fecha_inicio'], solicitud['fecha_fin'], solicitud.get('lugar', '')
+            )
+            if c['disponible']
+        ]
+
+        resultado = {'indice': indice, 'perito': None, 'alternativas': []}
+        if candidatos:
+            elegido = candidatos[0]
+            planificador.agenda(elegido['perito_id']).reservar(
+                solicitud['fecha_inicio'].toordinal(), solicitud['fecha_fin'].toordinal()
+            )
+            resultado['perito'] = elegido
+            resultado['alternativas'] = candidatos[1:alternativas + 1]
+        else:
+            resultado['error'] = 'Ningún perito del tipo está libre en esas fechas'
+        resultados[indice] = resultado
+
+    return resultados
@@ -0,0 +1,301 @@
+"""
+SistemaPerito - Trabajos de exportación en segundo plano
+Descripción: Cola acotada de exportaciones Excel/PDF que se ejecutan en un
+pool de procesos, fuera del hilo de la petición. Los reportes generados se
+guardan en ``exports/`` con una clave derivada de (formato, filtros, versión
+de datos), por lo que una exportación idéntica se sirve al instante hasta
+que los datos cambian. Los archivos antiguos se eliminan según una política
+de edad y tamaño total.
+"""
+
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+
+from exportacion import FORMATOS, generar_reporte
+
+# Valores por defecto (configurables en app.config)
+EXPORTS_DIR_DEFAULT = 'exports'
+WORKERS_DEFAULT = 2
+COLA_MAX_DEFAULT = 8
+MAX_BYTES_DEFAULT = 500 * 1024 * 1024
+MAX_EDAD_DEFAULT = 24 * 3600
+
+# Tiempo que se conserva un reporte de una versión de datos ya superada,
+# para que quien lo encoló alcance a descargarlo
+GRACIA_VERSION_ANTIGUA = 15 * 60
+
+# Trabajos terminados que se recuerdan en memoria
+TRABAJOS_RETENIDOS = 200
+
+# reporte_<formato>_v<version>_<clave>.<extensión>
+_PATRON_ARCHIVO = re.compile(r'^reporte_(excel|pdf)_v(\d+)_([0-9a-f]{20})\.(xlsx|pdf)$')
+
+
+class ColaLlena(Exception):
+    """
+    No hay cupo en la cola de exportaciones.
+    """
+
+
+class Trabajo:
+    """
+    Exportación encolada o terminada.
+    """
+
+    def __init__(self, formato, filtros, clave, archivo, future=None):
+        self.id = uuid.uuid4().hex
+        self.formato = formato
+        self.filtros = filtros
+        self.clave = clave
+        self.archivo = archivo
+        self.future = future
+        self.creado = datetime.now()
+        self.desde_cache = future is None
+        self.filas = None
+        self.error = None
+
+    @property
+    def estado(self):
+        if self.future is None:
+            return 'completado'
+        if not self.future.done():
+            return 'en_proceso' if self.future.running() else 'pendiente'
+        if self.filas is None and self.error is None:
+            return 'en_proceso'  # Terminado, pero _al_terminar aún no registra el resultado
+        return 'error' if self.error else 'completado'
+
+    @property
+    def activo(self):
+        return self.estado in ('pendiente', 'en_proceso')
+
+    @property
+    def nombre_descarga(self):
+        prefijo = 'asignaciones' if self.formato == 'excel' else 'reporte'
+        return f'{prefijo}_{self.creado.strftime("%Y%m%d_%H%M%S")}{FORMATOS[self.formato]}'
+
+    def a_dict(self):
+        return {
+            'id': self.id,
+            'formato': self.formato,
+            'filtros': self.filtros,
+            'estado': self.estado,
+            'desde_cache': self.desde_cache,
+            'filas': self.filas,
+            'error': self.error,
+            'creado': self.creado.isoformat(timespec='seconds'),
+        }
+
+
+class GestorTrabajos:
+    """
+    Cola de exportaciones con caché de resultados en disco.
+    """
+
+    def __init__(self, directorio, workers=WORKERS_DEFAULT, cola_max=COLA_MAX_DEFAULT,
+                 max_bytes=MAX_BYTES_DEFAULT, max_edad=MAX_EDAD_DEFAULT):
+        self.directorio = directorio
+        self.workers = workers
+        self.cola_max = cola_max
+        self.max_bytes = max_bytes
+        self.max_edad = max_edad
+        self._executor = None
+        self._trabajos = OrderedDict()
+        self._lock = threading.Lock()
+        self._ultima_version = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: los procesos no heredan conexiones ni hilos de Flask
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    @staticmethod
+    def clave(formato, filtros, version):
+        """
+        Clave de caché de un reporte.
+        """
+        crudo = json.dumps([formato, filtros, version], sort_keys=True)
+        return hashlib.sha256(crudo.encode('utf-8')).hexdigest()[:20]
+
+    def ruta_archivo(self, formato, version, clave):
+        return os.path.join(
+            self.directorio, f'reporte_{formato}_v{version}_{clave}{FORMATOS[formato]}'
+        )
+
+    def encolar(self, ruta_db, formato, filtros, version):
+        """
+        Encola una exportación o devuelve un resultado ya disponible.
+
+        Args:
+            ruta_db: Ruta de la base de datos
+            formato: 'excel' o 'pdf'
+            filtros: Filtros ya validados
+            version: Versión de datos actual
+
+        Returns:
+            Trabajo
+
+        Raises:
+            ColaLlena: Si ya hay ``cola_max`` trabajos pendientes o en proceso
+        """
+        clave = self.clave(formato, filtros, version)
+        archivo = self.ruta_archivo(formato, version, clave)
+        os.makedirs(self.directorio, exist_ok=True)
+
+        with self._lock:
+            self._ultima_version = version
+
+            # Reporte idéntico ya generado con la misma versión de datos
+            if os.path.exists(archivo):
+                os.utime(archivo)  # Marca de uso reciente para la política LRU
+                trabajo = Trabajo(formato, filtros, clave, archivo)
+                self._registrar(trabajo)
+                return trabajo
+
+            # Reporte idéntico en curso: se reutiliza el mismo trabajo
+            for trabajo in self._trabajos.values():
+                if trabajo.clave == clave and trabajo.archivo == archivo and trabajo.activo:
+                    return trabajo
+
+            activos = sum(1 for t in self._trabajos.values() if t.activo)
+            if activos >= self.cola_max:
+                raise ColaLlena()
+
+            future = self._get_executor().submit(
+                generar_reporte, os.path.abspath(ruta_db), formato, filtros, archivo
+            )
+            trabajo = Trabajo(formato, filtros, clave, archivo, future)
+            self._registrar(trabajo)
+
+        future.add_done_callback(lambda f: self._al_terminar(trabajo, f))
+        return trabajo
+
+    def _registrar(self, trabajo):
+        self._trabajos[trabajo.id] = trabajo
+        # Olvidar los trabajos terminados más antiguos
+        while len(self._trabajos) > TRABAJOS_RETENIDOS:
+            antiguo = next(
+                (t for t in self._trabajos.values() if not t.activo), None
+            )
+            if antiguo is None:
+                break
+            del self._trabajos[antiguo.id]
+
+    def _al_terminar(self, trabajo, future):
+        try:
+            trabajo.filas = future.result()
+        except Exception as e:
+            trabajo.error = str(e) or e.__class__.__name__
+        self.limpiar()
+
+    def obtener(self, id):
+        with self._lock:
+            return self._trabajos.get(id)
+
+    def limpiar(self):
+        """
+        Aplica la política de retención de ``exports/``:
+        1. Reportes con más de ``max_edad`` segundos sin usarse.
+        2. Reportes de versiones de datos superadas, tras un margen de gracia.
+        3. Los menos usados recientemente mientras el total supere ``max_bytes``.
+        Solo se tocan archivos generados por este módulo.
+
+        Returns:
+            int: Número de archivos eliminados
+        """
+        if not os.path.isdir(self.directorio):
+            return 0
+
+        with self._lock:
+            en_uso = {t.archivo for t in self._trabajos.values() if t.activo}
+            ultima_version = self._ultima_version
+
+        ahora = time.time()
+        archivos = []
+        for nombre in os.listdir(self.directorio):
+            coincidencia = _PATRON_ARCHIVO.match(nombre)
+            ruta = os.path.join(self.directorio, nombre)
+            if not coincidencia or ruta in en_uso:
+                continue
+            try:
+                stat = os.stat(ruta)
+            except OSError:
+                continue
+            archivos.append((stat.st_mtime, stat.st_size, int(coincidencia.group(2)), ruta))
+
+        eliminar = []
+        conservar = []
+        for mtime, tamano, version, ruta in archivos:
+            edad = ahora - mtime
+            antigua = ultima_version is not None and version != ultima_version
+            if edad > self.max_edad or (antigua and edad > GRACIA_VERSION_ANTIGUA):
+                eliminar.append(ruta)
+            else:
+                conservar.append((mtime, tamano, ruta))
+
+        # Menos usados primero hasta respetar el tamaño máximo
+        total = sum(tamano for _, tamano, _ in conservar)
+        for mtime, tamano, ruta in sorted(conservar):
+            if total <= self.max_bytes:
+                break
+            eliminar.append(ruta)
+            total -= tamano
+
+        eliminados = 0
+        for ruta in eliminar:
+            try:
+                os.remove(ruta)
+                eliminados += 1
+            except OSError:
+                pass
+        return eliminados
+
+    def cerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def get_gestor():
+    """
+    Devuelve el gestor de trabajos de la aplicación activa.
+    """
+    app = current_app._get_current_object()
+    gestor = app.extensions.get('sistemaperito_trabajos')
+    if gestor is None:
+        gestor = GestorTrabajos(
+            app.config['EXPORTS_DIR'],
+            workers=app.config['EXPORTACION_WORKERS'],
+            cola_max=app.config['EXPORTACION_COLA_MAX'],
+            max_bytes=app.config['EXPORTS_MAX_BYTES'],
+            max_edad=app.config['EXPORTS_MAX_EDAD'],
+        )
+        app.extensions['sistemaperito_trabajos'] = gestor
+        atexit.register(gestor.cerrar)
+    return gestor
+
+
+def init_app(app):
+    """
+    Registra la configuración de los trabajos de exportación.
+    """
+    app.config.setdefault('EXPORTS_DIR', EXPORTS_DIR_DEFAULT)
+    app.config.setdefault('EXPORTACION_WORKERS', WORKERS_DEFAULT)
+    app.config.setdefault('EXPORTACION_COLA_MAX', COLA_MAX_DEFAULT)
+    app.config.setdefault('EXPORTS_MAX_BYTES', MAX_BYTES_DEFAULT)
+    app.config.setdefault('EXPORTS_MAX_EDAD', MAX_EDAD_DEFAULT)